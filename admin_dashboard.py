@@ -1,5 +1,7 @@
 from PyQt6 import QtWidgets, QtCore
 from styles import COMMON_STYLES
+from virtual_list import CardData, CardDelegate, ListAction, RecordListModel, RecordListView
+from search_index import ROSTER_CACHE_LIMIT, IndexFilterProxyModel, RosterSearch, escape_like
 
 class AdminDashboard(QtWidgets.QWidget):
     def __init__(self, main_window):
@@ -56,6 +58,38 @@ class AdminDashboard(QtWidgets.QWidget):
     def logout(self):
         self.main_window.stackedWidget.setCurrentWidget(self.main_window.login_page)
         
+    def format_user_card(self, user):
+        """Card content for a student or teacher row"""
+        return CardData(f"Username: {user['username']}")
+    
+    def fetch_roster(self, supabase, user_type):
+        """
+        Fetch the users of one type, up to ROSTER_CACHE_LIMIT rows
+
+        Returns:
+            tuple: (records, total number of users of that type)
+        """
+        response = supabase.table('users') \
+            .select('username', count='exact') \
+            .eq('user_type', user_type) \
+            .order('username') \
+            .range(0, ROSTER_CACHE_LIMIT - 1) \
+            .execute()
+        data = response.data or []
+        return data, max(response.count or 0, len(data))
+    
+    def fetch_roster_page(self, supabase, user_type, offset, limit, search_text=None):
+        """Fetch one page of users of a type, optionally matching a search text"""
+        query = supabase.table('users') \
+            .select('username') \
+            .eq('user_type', user_type)
+        if search_text:
+            query = query.ilike('username', f"%{escape_like(search_text)}%")
+        response = query.order('username') \
+            .range(offset, offset + limit - 1) \
+            .execute()
+        return response.data or []
+    
     def manage_students(self):
         # Create a new widget to display all students
         self.students_widget = QtWidgets.QWidget()
@@ -100,13 +134,8 @@ class AdminDashboard(QtWidgets.QWidget):
             if not supabase:
                 raise Exception("Failed to connect to Supabase")
             
-            # Fetch all students
-            response = supabase.table('users') \
-                .select('username') \
-                .eq('user_type', 'Student') \
-                .execute()
-            
-            data = response.data
+            # Fetch the students, up to the local cache limit
+            data, total_students = self.fetch_roster(supabase, 'Student')
             if not data:
                 no_students_label = QtWidgets.QLabel("No students found in the system.")
                 no_students_label.setStyleSheet("font-size: 16px; color: #666; margin: 20px;")
@@ -119,7 +148,6 @@ class AdminDashboard(QtWidgets.QWidget):
             search_box = QtWidgets.QLineEdit()
             search_box.setPlaceholderText("Search students...")
             search_box.setStyleSheet("padding: 8px; border: 1px solid #ccc; border-radius: 4px;")
-            search_box.textChanged.connect(lambda text: self.filter_students(text, data))
             
             search_layout.addWidget(search_box)
             self.students_container_layout.addLayout(search_layout)
@@ -129,8 +157,6 @@ class AdminDashboard(QtWidgets.QWidget):
             stats_widget.setStyleSheet("background: #F8F9FA; border-radius: 8px; padding: 15px; margin-top: 10px;")
             stats_layout = QtWidgets.QHBoxLayout(stats_widget)
             
-            total_students = len(data)
-            
             students_count = QtWidgets.QLabel(f"Total Students: {total_students}")
             students_count.setStyleSheet("font-size: 14px; font-weight: bold;")
             
@@ -139,113 +165,39 @@ class AdminDashboard(QtWidgets.QWidget):
             
             self.students_container_layout.addWidget(stats_widget)
             
-            # Create a scroll area for the students
-            scroll_area = QtWidgets.QScrollArea()
-            scroll_area.setWidgetResizable(True)
-            scroll_widget = QtWidgets.QWidget()
-            scroll_layout = QtWidgets.QVBoxLayout(scroll_widget)
-            scroll_layout.setSpacing(10)
-            
-            # Store the scroll layout and data for filtering
-            self.students_scroll_layout = scroll_layout
+            # Virtualized list of students; only the rows on screen are painted
             self.students_data = data
-            
-            self.display_students(data, scroll_layout)
-            
-            scroll_area.setWidget(scroll_widget)
-            self.students_container_layout.addWidget(scroll_area)
+            partial = total_students > len(data)
+            self.students_model = RecordListModel(
+                self.format_user_card, data,
+                fetch_page=(lambda offset, limit: self.fetch_roster_page(supabase, 'Student', offset, limit)) if partial else None)
+            self.students_proxy = IndexFilterProxyModel()
+            self.students_proxy.setSourceModel(self.students_model)
+            self.students_view = RecordListView(self.students_proxy, CardDelegate(actions=[
+                ListAction("Edit", self.edit_student),
+                ListAction("Remove", self.remove_student, background='#FF5252', foreground='#FFFFFF')
+            ]), uniform_rows=True)
+            self.students_proxy.setParent(self.students_view)
+            self.students_view.setMinimumHeight(300)
+            self.students_container_layout.addWidget(self.students_view)
+            
+            # Searches use a local index, or the server when only part of the roster is cached
+            self.students_search = RosterSearch(
+                search_box, self.students_model, self.students_proxy,
+                server_search=(lambda text, offset, limit: self.fetch_roster_page(supabase, 'Student', offset, limit, text)) if partial else None)
+            
+            # Add "Add Student" button at the bottom
+            add_student_btn = QtWidgets.QPushButton("+ Add New Student")
+            add_student_btn.setStyleSheet(COMMON_STYLES['primary_button'])
+            add_student_btn.setMinimumHeight(40)
+            add_student_btn.clicked.connect(self.add_new_student)
+            self.students_container_layout.addWidget(add_student_btn)
             
         except Exception as e:
             error_label = QtWidgets.QLabel(f"Failed to fetch students: {str(e)}")
             error_label.setStyleSheet("font-size: 14px; color: red; margin: 20px;")
             self.students_container_layout.addWidget(error_label)
     
-    def display_students(self, students_data, layout):
-        """Display the student cards in the layout"""
-        # Clear the layout first
-        while layout.count():
-            item = layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        for student in students_data:
-            student_card = QtWidgets.QWidget()
-            student_card.setStyleSheet('''
-                QWidget {
-                    background: white;
-                    border-radius: 10px;
-                    padding: 15px;
-                    margin: 5px;
-                    border: 1px solid #E0E0E0;
-                }
-                QWidget:hover {
-                    background: #F5F5F5;
-                }
-            ''')
-            card_layout = QtWidgets.QHBoxLayout(student_card)
-            
-            # Student info
-            info_layout = QtWidgets.QVBoxLayout()
-            username_label = QtWidgets.QLabel(f"Username: {student['username']}")
-            username_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #333;")
-            info_layout.addWidget(username_label)
-            
-            # Action buttons
-            buttons_layout = QtWidgets.QHBoxLayout()
-            
-            edit_btn = QtWidgets.QPushButton("Edit")
-            edit_btn.setStyleSheet(COMMON_STYLES['secondary_button'])
-            edit_btn.clicked.connect(lambda checked, s=student: self.edit_student(s))
-            
-            remove_btn = QtWidgets.QPushButton("Remove")
-            remove_btn.setStyleSheet('''
-                QPushButton {
-                    background-color: #FF5252;
-                    color: white;
-                    border: none;
-                    padding: 5px 10px;
-                    border-radius: 4px;
-                }
-                QPushButton:hover {
-                    background-color: #FF0000;
-                }
-            ''')
-            remove_btn.clicked.connect(lambda checked, s=student: self.remove_student(s))
-            
-            buttons_layout.addWidget(edit_btn)
-            buttons_layout.addWidget(remove_btn)
-            
-            card_layout.addLayout(info_layout)
-            card_layout.addStretch()
-            card_layout.addLayout(buttons_layout)
-            
-            layout.addWidget(student_card)
-        
-        # Add "Add Student" button at the bottom
-        add_student_btn = QtWidgets.QPushButton("+ Add New Student")
-        add_student_btn.setStyleSheet(COMMON_STYLES['primary_button'])
-        add_student_btn.setMinimumHeight(40)
-        add_student_btn.clicked.connect(self.add_new_student)
-        layout.addWidget(add_student_btn)
-    
-    def filter_students(self, search_text, students_data):
-        """Filter students based on search text"""
-        if not search_text:
-            # If search text is empty, show all students
-            self.display_students(students_data, self.students_scroll_layout)
-            return
-        
-        # Filter students based on search text
-        filtered_students = []
-        search_text = search_text.lower()
-        
-        for student in students_data:
-            if search_text in student['username'].lower():
-                filtered_students.append(student)
-        
-        # Display filtered students
-        self.display_students(filtered_students, self.students_scroll_layout)
-    
     def add_new_student(self):
         """Add a new student to the system"""
         # Create a dialog for adding a new student
@@ -516,13 +468,8 @@ class AdminDashboard(QtWidgets.QWidget):
             if not supabase:
                 raise Exception("Failed to connect to Supabase")
             
-            # Fetch only teachers
-            response = supabase.table('users') \
-                .select('username') \
-                .eq('user_type', 'Teacher') \
-                .execute()
-            
-            data = response.data
+            # Fetch the teachers, up to the local cache limit
+            data, total_teachers = self.fetch_roster(supabase, 'Teacher')
             if not data:
                 no_teachers_label = QtWidgets.QLabel("No teachers found in the system.")
                 no_teachers_label.setStyleSheet("font-size: 16px; color: #666; margin: 20px;")
@@ -535,7 +482,6 @@ class AdminDashboard(QtWidgets.QWidget):
             search_box = QtWidgets.QLineEdit()
             search_box.setPlaceholderText("Search teachers...")
             search_box.setStyleSheet("padding: 8px; border: 1px solid #ccc; border-radius: 4px;")
-            search_box.textChanged.connect(lambda text: self.filter_teachers(text, data))
             
             search_layout.addWidget(search_box)
             self.teachers_container_layout.addLayout(search_layout)
@@ -560,113 +506,39 @@ class AdminDashboard(QtWidgets.QWidget):
             
             self.teachers_container_layout.addWidget(stats_widget)
             
-            # Create a scroll area for the teachers
-            scroll_area = QtWidgets.QScrollArea()
-            scroll_area.setWidgetResizable(True)
-            scroll_widget = QtWidgets.QWidget()
-            scroll_layout = QtWidgets.QVBoxLayout(scroll_widget)
-            scroll_layout.setSpacing(10)
-            
-            # Store the scroll layout and data for filtering
-            self.teachers_scroll_layout = scroll_layout
+            # Virtualized list of teachers; only the rows on screen are painted
             self.teachers_data = data
-            
-            self.display_teachers(data, scroll_layout)
-            
-            scroll_area.setWidget(scroll_widget)
-            self.teachers_container_layout.addWidget(scroll_area)
+            partial = total_teachers > len(data)
+            self.teachers_model = RecordListModel(
+                self.format_user_card, data,
+                fetch_page=(lambda offset, limit: self.fetch_roster_page(supabase, 'Teacher', offset, limit)) if partial else None)
+            self.teachers_proxy = IndexFilterProxyModel()
+            self.teachers_proxy.setSourceModel(self.teachers_model)
+            self.teachers_view = RecordListView(self.teachers_proxy, CardDelegate(actions=[
+                ListAction("Edit", self.edit_teacher),
+                ListAction("Remove", self.remove_teacher, background='#FF5252', foreground='#FFFFFF')
+            ]), uniform_rows=True)
+            self.teachers_proxy.setParent(self.teachers_view)
+            self.teachers_view.setMinimumHeight(300)
+            self.teachers_container_layout.addWidget(self.teachers_view)
+            
+            # Searches use a local index, or the server when only part of the roster is cached
+            self.teachers_search = RosterSearch(
+                search_box, self.teachers_model, self.teachers_proxy,
+                server_search=(lambda text, offset, limit: self.fetch_roster_page(supabase, 'Teacher', offset, limit, text)) if partial else None)
+            
+            # Add "Add Teacher" button at the bottom
+            add_teacher_btn = QtWidgets.QPushButton("+ Add New Teacher")
+            add_teacher_btn.setStyleSheet(COMMON_STYLES['primary_button'])
+            add_teacher_btn.setMinimumHeight(40)
+            add_teacher_btn.clicked.connect(self.add_new_teacher)
+            self.teachers_container_layout.addWidget(add_teacher_btn)
             
         except Exception as e:
             error_label = QtWidgets.QLabel(f"Failed to fetch teachers: {str(e)}")
             error_label.setStyleSheet("font-size: 14px; color: red; margin: 20px;")
             self.teachers_container_layout.addWidget(error_label)
     
-    def display_teachers(self, teachers_data, layout):
-        """Display the teacher cards in the layout"""
-        # Clear the layout first
-        while layout.count():
-            item = layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        for teacher in teachers_data:
-            teacher_card = QtWidgets.QWidget()
-            teacher_card.setStyleSheet('''
-                QWidget {
-                    background: white;
-                    border-radius: 10px;
-                    padding: 15px;
-                    margin: 5px;
-                    border: 1px solid #E0E0E0;
-                }
-                QWidget:hover {
-                    background: #F5F5F5;
-                }
-            ''')
-            card_layout = QtWidgets.QHBoxLayout(teacher_card)
-            
-            # Teacher info
-            info_layout = QtWidgets.QVBoxLayout()
-            username_label = QtWidgets.QLabel(f"Username: {teacher['username']}")
-            username_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #333;")
-            info_layout.addWidget(username_label)
-            
-            # Action buttons
-            buttons_layout = QtWidgets.QHBoxLayout()
-            
-            edit_btn = QtWidgets.QPushButton("Edit")
-            edit_btn.setStyleSheet(COMMON_STYLES['secondary_button'])
-            edit_btn.clicked.connect(lambda checked, t=teacher: self.edit_teacher(t))
-            
-            remove_btn = QtWidgets.QPushButton("Remove")
-            remove_btn.setStyleSheet('''
-                QPushButton {
-                    background-color: #FF5252;
-                    color: white;
-                    border: none;
-                    padding: 5px 10px;
-                    border-radius: 4px;
-                }
-                QPushButton:hover {
-                    background-color: #FF0000;
-                }
-            ''')
-            remove_btn.clicked.connect(lambda checked, t=teacher: self.remove_teacher(t))
-            
-            buttons_layout.addWidget(edit_btn)
-            buttons_layout.addWidget(remove_btn)
-            
-            card_layout.addLayout(info_layout)
-            card_layout.addStretch()
-            card_layout.addLayout(buttons_layout)
-            
-            layout.addWidget(teacher_card)
-        
-        # Add "Add Teacher" button at the bottom
-        add_teacher_btn = QtWidgets.QPushButton("+ Add New Teacher")
-        add_teacher_btn.setStyleSheet(COMMON_STYLES['primary_button'])
-        add_teacher_btn.setMinimumHeight(40)
-        add_teacher_btn.clicked.connect(self.add_new_teacher)
-        layout.addWidget(add_teacher_btn)
-    
-    def filter_teachers(self, search_text, teachers_data):
-        """Filter teachers based on search text"""
-        if not search_text:
-            # If search text is empty, show all teachers
-            self.display_teachers(teachers_data, self.teachers_scroll_layout)
-            return
-        
-        # Filter teachers based on search text
-        filtered_teachers = []
-        search_text = search_text.lower()
-        
-        for teacher in teachers_data:
-            if search_text in teacher['username'].lower():
-                filtered_teachers.append(teacher)
-        
-        # Display filtered teachers
-        self.display_teachers(filtered_teachers, self.teachers_scroll_layout)
-    
     def add_new_teacher(self):
         """Add a new teacher to the system"""
         # Create a dialog for adding a new teacher
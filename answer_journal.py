@@ -0,0 +1,237 @@
+import logging
+import datetime
+from supabase_connection import create_connection
+from write_behind import WriteBehindQueue
+
+
+class AnswerJournal(WriteBehindQueue):
+    """
+    Write-behind buffer for a student's answers during an exam.
+
+    Answer changes are recorded in memory and coalesced per question, so
+    clicking through several options only ever writes the last one. A
+    background thread flushes the buffer as one bulk upsert on
+    `student_answers` (plus one upsert of the running score) either every
+    `flush_interval` seconds or as soon as `max_pending` questions are
+    waiting. Nothing here runs on the Qt GUI thread except `record()`.
+
+    If an AnswerLog is given, every change is also appended to it before
+    being buffered, and events are marked synced once their batch lands.
+    """
+
+    item_name = "answers"
+
+    def __init__(self, exam_id, student_username, answer_key, log=None, flush_interval=2.0, max_pending=10):
+        """
+        Args:
+            exam_id (int): Exam being taken
+            student_username (str): Student taking the exam
+            answer_key (AnswerKey): Answer key used to score answers
+            log (AnswerLog): Optional local crash-recovery log
+            flush_interval (float): Seconds between background flushes
+            max_pending (int): Number of changed questions that triggers an early flush
+        """
+        self.exam_id = exam_id
+        self.student_username = student_username
+        self.answer_key = answer_key
+        self.log = log
+
+        # All answers recorded so far, and the ones not yet written
+        self.answers = {}
+        self.pending = {}
+        self.last_seq = 0
+
+        super().__init__(flush_interval, max_pending)
+
+    def restore(self):
+        """
+        Rebuild the answers of an interrupted attempt
+
+        The server copy in `student_answers` is loaded first, then the local
+        log is replayed over it. Events the server never received are queued
+        again, so they are written as soon as the database is reachable.
+
+        Returns:
+            dict: Map of question id to selected option index
+        """
+        answers = {}
+
+        try:
+            supabase = create_connection()
+            if not supabase:
+                raise Exception("Failed to connect to Supabase")
+
+            response = supabase.table('student_answers') \
+                .select('question_id, selected_answer') \
+                .eq('exam_id', self.exam_id) \
+                .eq('student_username', self.student_username) \
+                .execute()
+
+            for row in response.data or []:
+                if row['question_id'] in self.answer_key:
+                    option_index = self.answer_key.option_index(row['question_id'], row['selected_answer'])
+                    if option_index is not None:
+                        answers[row['question_id']] = option_index
+            server_available = True
+        except Exception as e:
+            logging.error(f"Error loading saved answers: {e}")
+            server_available = False
+
+        replayed = {}
+        if self.log is not None:
+            try:
+                replayed = self.log.replay(self.exam_id, self.student_username)
+            except Exception as e:
+                logging.error(f"Error replaying answer log: {e}")
+
+        with self._lock:
+            for question_id, (option_index, synced, seq) in replayed.items():
+                if question_id not in self.answer_key:
+                    continue
+                # Unsynced local events are newer than anything on the server
+                if not synced:
+                    answers[question_id] = option_index
+                    self.pending[question_id] = option_index
+                    self.last_seq = max(self.last_seq, seq)
+                elif not server_available:
+                    answers[question_id] = option_index
+            self.answers.update(answers)
+
+        if replayed:
+            logging.info(f"Restored {len(answers)} answers for exam {self.exam_id}, {len(self.pending)} not yet saved")
+        return dict(answers)
+
+    def record(self, question_id, option_index):
+        """
+        Record an answer change; it is written on the next flush
+
+        Args:
+            question_id (int): Question being answered
+            option_index (int): Selected option (0-3)
+        """
+        seq = None
+        if self.log is not None:
+            try:
+                seq = self.log.append(self.exam_id, self.student_username, question_id, option_index)
+            except Exception as e:
+                logging.error(f"Error writing answer log: {e}")
+
+        with self._lock:
+            self.answers[question_id] = option_index
+            self.pending[question_id] = option_index
+            if seq is not None:
+                self.last_seq = seq
+            pending_count = len(self.pending)
+
+        self._item_added(pending_count)
+
+    def _after_cycle(self):
+        if self.log is not None:
+            self.log.sync()
+
+    def _take_batch(self):
+        if not self.pending:
+            return None
+        batch = (self.pending, self.last_seq, self.answer_key.score(self.answers))
+        self.pending = {}
+        return batch
+
+    def _write_batch(self, batch):
+        """Write a batch of answers and the running score"""
+        answers, batch_seq, score = batch
+        rows = [{
+            'exam_id': self.exam_id,
+            'question_id': question_id,
+            'student_username': self.student_username,
+            'selected_answer': self.answer_key.option_text(question_id, option_index),
+            'is_correct': self.answer_key.is_correct(question_id, option_index)
+        } for question_id, option_index in answers.items()]
+
+        supabase = create_connection()
+        if not supabase:
+            raise Exception("Failed to connect to Supabase")
+
+        supabase.table('student_answers') \
+            .upsert(rows, on_conflict='exam_id,question_id,student_username') \
+            .execute()
+
+        # Keep the in-progress score up to date. completed_at stays NULL until
+        # the exam is fully submitted; left out, the column default would fill it in
+        supabase.table('exam_results') \
+            .upsert({
+                'exam_id': self.exam_id,
+                'student_username': self.student_username,
+                'score': score,
+                'completed_at': None
+            }, on_conflict='exam_id,student_username') \
+            .execute()
+
+        if self.log is not None and batch_seq:
+            self.log.mark_synced(self.exam_id, self.student_username, batch_seq)
+
+        logging.debug(f"Flushed {len(rows)} answers for exam {self.exam_id}")
+
+    def _requeue(self, batch):
+        # Put the batch back, unless a newer answer was recorded meanwhile
+        answers, _, _ = batch
+        for question_id, option_index in answers.items():
+            self.pending.setdefault(question_id, option_index)
+
+    def submit(self):
+        """
+        Stop background writes and submit the full answer set
+
+        All answers go to the `submit_exam_answers` database function in a
+        single call, which stores them, scores them server-side and completes
+        the exam result. If the function is not installed, the answers are
+        written with one bulk upsert and the locally computed score with one
+        result upsert instead.
+
+        Returns:
+            int: Final score
+        """
+        # Waits for a batch already in flight, so its running score (with
+        # completed_at NULL) can't land after the completed result
+        self.close(flush=False)
+
+        with self._lock:
+            answers = dict(self.answers)
+
+        supabase = create_connection()
+        if not supabase:
+            raise Exception("Failed to connect to Supabase")
+
+        try:
+            response = supabase.rpc('submit_exam_answers', {
+                'p_exam_id': self.exam_id,
+                'p_student_username': self.student_username,
+                'p_answers': [{'question_id': question_id, 'option_index': option_index}
+                              for question_id, option_index in answers.items()]
+            }).execute()
+            return int(response.data)
+        except Exception as e:
+            logging.warning(f"submit_exam_answers RPC unavailable, falling back to bulk upsert: {e}")
+
+        score = self.answer_key.score(answers)
+        rows = [{
+            'exam_id': self.exam_id,
+            'question_id': question_id,
+            'student_username': self.student_username,
+            'selected_answer': self.answer_key.option_text(question_id, option_index),
+            'is_correct': self.answer_key.is_correct(question_id, option_index)
+        } for question_id, option_index in answers.items()]
+
+        if rows:
+            supabase.table('student_answers') \
+                .upsert(rows, on_conflict='exam_id,question_id,student_username') \
+                .execute()
+
+        supabase.table('exam_results') \
+            .upsert({
+                'exam_id': self.exam_id,
+                'student_username': self.student_username,
+                'score': score,
+                'completed_at': datetime.datetime.now().isoformat()
+            }, on_conflict='exam_id,student_username') \
+            .execute()
+        return score
@@ -0,0 +1,117 @@
+from array import array
+import logging
+
+# Map from the "Option N" format stored in questions.correct_answer to an option index
+OPTION_INDEX_MAP = {"Option 1": 0, "Option 2": 1, "Option 3": 2, "Option 4": 3}
+OPTION_COLUMNS = ('option1', 'option2', 'option3', 'option4')
+
+
+class AnswerKey:
+    """
+    In-memory answer key for a single exam.
+
+    The key is built once from the exam's question rows and stores, for every
+    question, a bitmask of the option indexes that count as correct. Scoring
+    is then a pure lookup with no database round trips.
+    """
+
+    def __init__(self, question_ids, correct_masks, option_texts):
+        """
+        Args:
+            question_ids (list): Question ids in display order
+            correct_masks (array): One bitmask of correct option indexes per question
+            option_texts (list): Tuple of the four option texts per question
+        """
+        self.question_ids = list(question_ids)
+        self.correct_masks = correct_masks
+        self.option_texts = option_texts
+        self.positions = {question_id: i for i, question_id in enumerate(self.question_ids)}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build an answer key from `questions` rows
+
+        Args:
+            rows (list): Dicts with id, correct_answer and option1..option4
+
+        Returns:
+            AnswerKey: The answer key for those questions
+        """
+        question_ids = []
+        correct_masks = array('B')
+        option_texts = []
+
+        for row in rows:
+            options = tuple(row.get(column) for column in OPTION_COLUMNS)
+            correct_answer = row.get('correct_answer')
+
+            # Convert from "Option X" format to the text of that option,
+            # falling back to a direct match if the text itself is stored
+            if correct_answer in OPTION_INDEX_MAP:
+                correct_text = options[OPTION_INDEX_MAP[correct_answer]]
+            else:
+                correct_text = correct_answer
+
+            # Every option with the correct text is accepted, matching the
+            # text comparison the exam has always used
+            mask = 0
+            for i, option in enumerate(options):
+                if option is not None and option == correct_text:
+                    mask |= 1 << i
+
+            if mask == 0:
+                logging.warning(f"Question {row.get('id')} has no option matching its correct answer")
+
+            question_ids.append(row['id'])
+            correct_masks.append(mask)
+            option_texts.append(options)
+
+        return cls(question_ids, correct_masks, option_texts)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def __contains__(self, question_id):
+        return question_id in self.positions
+
+    def option_text(self, question_id, option_index):
+        """Return the text of an option, as stored in student_answers.selected_answer"""
+        return self.option_texts[self.positions[question_id]][option_index]
+
+    def option_index(self, question_id, option_text):
+        """Return the index of the option with the given text, or None"""
+        options = self.option_texts[self.positions[question_id]]
+        for i, option in enumerate(options):
+            if option == option_text:
+                return i
+        return None
+
+    def is_correct(self, question_id, option_index):
+        """
+        Check a single answer
+
+        Args:
+            question_id (int): Question being answered
+            option_index (int): Selected option (0-3)
+
+        Returns:
+            bool: True if the selected option is correct
+        """
+        position = self.positions.get(question_id)
+        if position is None or option_index is None:
+            return False
+        return bool(self.correct_masks[position] >> option_index & 1)
+
+    def score(self, answers):
+        """
+        Count the correct answers in an answer set
+
+        Args:
+            answers (dict): Map of question id to selected option index
+
+        Returns:
+            int: Number of correct answers
+        """
+        return sum(1 for question_id, option_index in answers.items()
+                   if self.is_correct(question_id, option_index))
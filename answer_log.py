@@ -0,0 +1,133 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+# Location of the local answer log, overridable from the .env file
+DEFAULT_LOG_PATH = os.getenv(
+    "ANSWER_LOG_PATH",
+    os.path.join(os.path.expanduser("~"), ".proctor_prime", "answer_log.db")
+)
+
+
+class AnswerLog:
+    """
+    Durable, append-only local log of answer events.
+
+    Every answer selection is appended with a sequence number to a SQLite
+    database in WAL mode. Commits only append to the write-ahead log; the
+    fsync is batched into a checkpoint every `sync_every` events (or when
+    `sync()` is called), so logging an answer is much cheaper than a
+    network round trip while still surviving an application crash.
+    """
+
+    def __init__(self, path=DEFAULT_LOG_PATH, sync_every=20):
+        """
+        Args:
+            path (str): SQLite database file
+            sync_every (int): Number of appended events between forced fsyncs
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.sync_every = sync_every
+        self.unsynced_events = 0
+        self._lock = threading.Lock()
+
+        # The log is written from the GUI thread and marked from the journal thread
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS answer_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                exam_id INTEGER NOT NULL,
+                student_username TEXT NOT NULL,
+                question_id INTEGER NOT NULL,
+                option_index INTEGER NOT NULL,
+                recorded_at REAL NOT NULL,
+                synced INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        self.conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_answer_events_exam
+            ON answer_events (exam_id, student_username, seq)
+        ''')
+        self.conn.commit()
+
+    def append(self, exam_id, student_username, question_id, option_index):
+        """
+        Append an answer event
+
+        Returns:
+            int: Sequence number of the event
+        """
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT INTO answer_events (exam_id, student_username, question_id, option_index, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (exam_id, student_username, question_id, option_index, time.time())
+            )
+            self.conn.commit()
+            self.unsynced_events += 1
+            seq = cursor.lastrowid
+
+        if self.unsynced_events >= self.sync_every:
+            self.sync()
+        return seq
+
+    def sync(self):
+        """Force appended events to disk"""
+        with self._lock:
+            if not self.unsynced_events:
+                return
+            try:
+                self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+                self.unsynced_events = 0
+            except sqlite3.Error as e:
+                logging.error(f"Error syncing answer log: {e}")
+
+    def replay(self, exam_id, student_username):
+        """
+        Replay the log for one exam attempt
+
+        Returns:
+            dict: Map of question id to (option_index, synced, seq) for the latest event per question
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT question_id, option_index, synced, seq FROM answer_events "
+                "WHERE exam_id = ? AND student_username = ? ORDER BY seq",
+                (exam_id, student_username)
+            ).fetchall()
+
+        # Later events overwrite earlier ones
+        return {question_id: (option_index, bool(synced), seq) for question_id, option_index, synced, seq in rows}
+
+    def mark_synced(self, exam_id, student_username, up_to_seq):
+        """Mark every event up to and including a sequence number as written to the database"""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE answer_events SET synced = 1 "
+                "WHERE exam_id = ? AND student_username = ? AND seq <= ? AND synced = 0",
+                (exam_id, student_username, up_to_seq)
+            )
+            self.conn.commit()
+
+    def clear(self, exam_id, student_username):
+        """Drop the log of a finished exam attempt"""
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM answer_events WHERE exam_id = ? AND student_username = ?",
+                (exam_id, student_username)
+            )
+            self.conn.commit()
+
+    def close(self):
+        """Sync and close the log"""
+        self.sync()
+        with self._lock:
+            self.conn.close()
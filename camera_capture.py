@@ -0,0 +1,190 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+import cv2
+import numpy as np
+
+# Capture settings, overridable from the .env file
+CAMERA_INDEX = int(os.getenv("CAMERA_INDEX", "0"))
+CAMERA_WIDTH = int(os.getenv("CAMERA_WIDTH", "640"))
+CAMERA_HEIGHT = int(os.getenv("CAMERA_HEIGHT", "480"))
+CAMERA_FPS = int(os.getenv("CAMERA_FPS", "15"))
+
+
+class CameraCapture:
+    """
+    Capture stage that keeps only the newest camera frame.
+
+    A background thread reads from cv2.VideoCapture as fast as the camera
+    delivers, so frames never pile up in the driver queue. Frames rotate
+    through three preallocated buffers: the thread reads into a back buffer,
+    publishes it as the latest frame, and `read_latest()` hands the latest
+    frame to the consumer by swapping buffers, without copying pixels.
+    Frames the consumer never picked up are counted as dropped.
+    """
+
+    def __init__(self, camera_index=CAMERA_INDEX, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=CAMERA_FPS):
+        """
+        Args:
+            camera_index (int): OpenCV camera index
+            width (int): Requested capture width
+            height (int): Requested capture height
+            fps (int): Requested capture frame rate
+        """
+        self.camera_index = camera_index
+        self.width = width
+        self.height = height
+        self.fps = fps
+
+        self._cap = None
+        self._thread = None
+        self._running = False
+        self._frame_ready = threading.Condition()
+
+        # Triple buffer: written by the capture thread, latest published, held by the consumer
+        self._back = None
+        self._latest = None
+        self._front = None
+        self._seq = 0
+        self._consumed_seq = 0
+        self._captured_at = 0.0
+
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+        self.latencies = deque(maxlen=300)
+
+    @property
+    def running(self):
+        """True while the camera is open and frames are being captured"""
+        return self._running
+
+    def start(self):
+        """
+        Open the camera and start the capture thread
+
+        Returns:
+            bool: True if the camera was opened
+        """
+        self._cap = cv2.VideoCapture(self.camera_index)
+        if not self._cap.isOpened():
+            logging.error("Failed to open camera")
+            self._cap.release()
+            self._cap = None
+            return False
+
+        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self._cap.set(cv2.CAP_PROP_FPS, self.fps)
+        # Keep the driver queue as short as the backend allows
+        self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        logging.info(f"Camera opened at {int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x"
+                     f"{int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))} @ {self._cap.get(cv2.CAP_PROP_FPS):.0f} FPS")
+
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+        return True
+
+    def _allocate(self, frame):
+        """Allocate the three frame buffers once the frame shape is known"""
+        self._back = frame
+        self._latest = np.empty_like(frame)
+        self._front = np.empty_like(frame)
+
+    def _capture_loop(self):
+        """Drain the camera continuously, publishing each frame as the latest"""
+        while self._running:
+            ok, frame = self._cap.read(self._back)
+            if not ok or frame is None:
+                self.read_failures += 1
+                if self.read_failures % 50 == 1:
+                    logging.error("Failed to capture frame")
+                time.sleep(0.01)
+                continue
+
+            captured_at = time.monotonic()
+            with self._frame_ready:
+                if self._latest is None or self._latest.shape != frame.shape:
+                    self._allocate(frame)
+                elif frame is not self._back:
+                    # The backend returned a new array instead of filling ours
+                    self._back = frame
+
+                if self._seq > self._consumed_seq:
+                    self.frames_dropped += 1
+                self._back, self._latest = self._latest, self._back
+                self._seq += 1
+                self._captured_at = captured_at
+                self.frames_captured += 1
+                self._frame_ready.notify_all()
+
+    def read_latest(self, last_seq=0, timeout=1.0):
+        """
+        Take the newest frame, waiting for one newer than `last_seq`
+
+        The returned array stays valid until the next call; the consumer
+        must be done with it (or copy it) before asking for another frame.
+
+        Args:
+            last_seq (int): Sequence number of the frame the caller already has
+            timeout (float): Seconds to wait for a new frame
+
+        Returns:
+            tuple: (seq, captured_at, frame), or None if no new frame arrived in time
+        """
+        with self._frame_ready:
+            if not self._frame_ready.wait_for(lambda: self._seq > last_seq or not self._running, timeout):
+                return None
+            if self._seq <= last_seq:
+                return None
+            self._front, self._latest = self._latest, self._front
+            self._consumed_seq = self._seq
+            return self._seq, self._captured_at, self._front
+
+    def record_decision(self, captured_at):
+        """
+        Record that a decision was made on a frame
+
+        Args:
+            captured_at (float): Capture timestamp returned by read_latest()
+
+        Returns:
+            float: Capture-to-decision latency in milliseconds
+        """
+        latency_ms = (time.monotonic() - captured_at) * 1000
+        self.latencies.append(latency_ms)
+        return latency_ms
+
+    def latency_stats(self):
+        """
+        Summarize recent capture-to-decision latencies
+
+        Returns:
+            dict: p50, p95 and max latency in milliseconds, plus frame counters
+        """
+        stats = {
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped,
+        }
+        if self.latencies:
+            values = np.fromiter(self.latencies, dtype=np.float64)
+            stats["p50_ms"] = float(np.percentile(values, 50))
+            stats["p95_ms"] = float(np.percentile(values, 95))
+            stats["max_ms"] = float(values.max())
+        return stats
+
+    def stop(self):
+        """Stop the capture thread and release the camera"""
+        self._running = False
+        with self._frame_ready:
+            self._frame_ready.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
@@ -0,0 +1,177 @@
+import os
+import time
+import logging
+
+# Share of one CPU core the proctoring worker may use, overridable from the .env file
+CPU_BUDGET = float(os.getenv("PROCTORING_CPU_BUDGET", "0.15"))
+
+
+class CpuGovernor:
+    """
+    Adapts how often and at what resolution the proctoring worker detects.
+
+    The interval the governor aims for depends on the proctoring state:
+    `alert_interval` while a violation timer is running,
+    `relaxed_interval` once the student has been compliant for
+    `relax_after` seconds, and `normal_interval` otherwise. Two
+    measurements keep that within the CPU budget:
+
+    - The cost of each detection (thread CPU time, smoothed) gives the
+      shortest interval at which detection alone stays within budget.
+      This reacts within a frame, e.g. when a violation starts.
+    - The CPU time of the whole process (capture thread included) is
+      compared with the budget every `window` seconds. Overshoot raises a
+      backoff factor on the interval; once the interval is at
+      `max_interval`, the detection resolution is lowered instead. Both are
+      undone when the process is comfortably under budget.
+
+    While a violation timer runs, the budget is multiplied by `alert_boost`
+    so violations are timed accurately; violation timers are short, so
+    this is bounded.
+    """
+
+    SCALES = (1.0, 0.75, 0.6)  # Detection resolutions, as fractions of the camera frame
+
+    def __init__(self, budget=CPU_BUDGET, alert_interval=0.1, normal_interval=0.2, relaxed_interval=0.5,
+                 max_interval=1.0, relax_after=30.0, alert_boost=2.0, window=2.0):
+        """
+        Args:
+            budget (float): Share of one core the worker may use (0.15 = 15%)
+            alert_interval (float): Seconds between detections while a violation timer runs
+            normal_interval (float): Seconds between detections normally
+            relaxed_interval (float): Seconds between detections after a compliant stretch
+            max_interval (float): Longest interval the budget may push detections to
+            relax_after (float): Seconds of compliance before relaxing
+            alert_boost (float): Budget multiplier while a violation timer runs
+            window (float): Seconds over which process CPU usage is measured
+        """
+        self.budget = budget
+        self.alert_interval = alert_interval
+        self.normal_interval = normal_interval
+        self.relaxed_interval = relaxed_interval
+        self.max_interval = max_interval
+        self.relax_after = relax_after
+        self.alert_boost = alert_boost
+        self.window = window
+
+        self.frame_cost = None
+        self.backoff = 1.0
+        self.scale_level = 0
+        self.interval = normal_interval
+        self.alert = False
+        self.compliant_since = None
+        self.cpu_share = 0.0
+
+        self._window_started = None
+        self._window_cpu = 0.0
+
+        # Statistics
+        self.frames = 0
+        self.alert_frames = 0
+        self.relaxed_frames = 0
+        self.scale_changes = 0
+        self.windows_over_budget = 0
+        self.windows = 0
+
+    @property
+    def scale(self):
+        """Current detection resolution as a fraction of the camera frame"""
+        return self.SCALES[self.scale_level]
+
+    def update(self, result, cpu_seconds, now=None):
+        """
+        Account for one processed frame and decide the next interval
+
+        Args:
+            result (dict): GazeDetection.process_frame result of the frame
+            cpu_seconds (float): CPU time spent processing the frame
+            now (float): Current time, defaults to time.monotonic()
+
+        Returns:
+            float: Seconds from the start of this frame to the start of the next
+        """
+        now = time.monotonic() if now is None else now
+        self.frames += 1
+
+        # Smoothed per-frame cost; motion-gated frames bring it down naturally
+        if self.frame_cost is None:
+            self.frame_cost = cpu_seconds
+        else:
+            self.frame_cost += 0.2 * (cpu_seconds - self.frame_cost)
+
+        # Proctoring state: any violation type means a violation timer is running
+        self.alert = result["violation_type"] is not None or result["is_timeout"]
+        if self.alert:
+            self.compliant_since = None
+            self.alert_frames += 1
+            target = self.alert_interval
+        else:
+            if self.compliant_since is None:
+                self.compliant_since = now
+            if now - self.compliant_since >= self.relax_after:
+                self.relaxed_frames += 1
+                target = self.relaxed_interval
+            else:
+                target = self.normal_interval
+
+        budget = self.budget * (self.alert_boost if self.alert else 1.0)
+        self._measure_process(now, budget)
+
+        # Never detect so often that detection alone would exceed the budget
+        cost_floor = self.frame_cost / budget if budget > 0 else self.max_interval
+        self.interval = min(self.max_interval, max(target, cost_floor) * self.backoff)
+        return self.interval
+
+    def _measure_process(self, now, budget):
+        """Compare the process's CPU usage over the last window with the budget"""
+        cpu = time.process_time()
+        if self._window_started is None:
+            self._window_started = now
+            self._window_cpu = cpu
+            return
+
+        elapsed = now - self._window_started
+        if elapsed < self.window:
+            return
+
+        self.cpu_share = (cpu - self._window_cpu) / elapsed
+        self._window_started = now
+        self._window_cpu = cpu
+        self.windows += 1
+
+        if self.cpu_share > budget:
+            self.windows_over_budget += 1
+            if self.interval < self.max_interval:
+                # Back off proportionally to the overshoot, at most doubling per window
+                self.backoff = min(self.backoff * min(2.0, self.cpu_share / budget), self.max_interval / self.alert_interval)
+            elif self.scale_level < len(self.SCALES) - 1:
+                self.scale_level += 1
+                self.scale_changes += 1
+                logging.info(f"CPU use {self.cpu_share:.0%} over budget {budget:.0%}, "
+                             f"detecting at {self.scale:.0%} resolution")
+        elif self.cpu_share < 0.7 * budget:
+            if self.scale_level > 0 and self.cpu_share < 0.5 * budget:
+                self.scale_level -= 1
+                self.scale_changes += 1
+                logging.info(f"CPU use {self.cpu_share:.0%} under budget, detecting at {self.scale:.0%} resolution")
+            else:
+                self.backoff = max(1.0, self.backoff * 0.8)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Budget, last measured CPU share, current settings and state counts
+        """
+        return {
+            "budget": self.budget,
+            "cpu_share": round(self.cpu_share, 3),
+            "frame_cost_ms": round((self.frame_cost or 0.0) * 1000, 2),
+            "interval": round(self.interval, 3),
+            "scale": self.scale,
+            "frames": self.frames,
+            "alert_frames": self.alert_frames,
+            "relaxed_frames": self.relaxed_frames,
+            "scale_changes": self.scale_changes,
+            "windows_over_budget": self.windows_over_budget,
+            "windows": self.windows,
+        }
@@ -10,7 +10,7 @@ def create_connection():
     was written for MySQL but has been migrated to Supabase.
     
     Returns:
-        A Supabase client connection instead of a MySQL connection
+        The shared, pooled Supabase client instead of a MySQL connection
     """
     return supabase_create_connection()
 
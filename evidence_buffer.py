@@ -0,0 +1,349 @@
+import os
+import time
+import queue
+import logging
+import datetime
+import tempfile
+import threading
+import cv2
+import numpy as np
+
+# Evidence settings, overridable from the .env file
+EVIDENCE_SECONDS = float(os.getenv("EVIDENCE_SECONDS", "15"))
+EVIDENCE_FPS = float(os.getenv("EVIDENCE_FPS", "5"))
+EVIDENCE_FORMAT = os.getenv("EVIDENCE_FORMAT", "strip")  # "strip" (one JPEG) or "clip" (MJPEG video)
+EVIDENCE_BUCKET = os.getenv("EVIDENCE_BUCKET", "proctoring-evidence")
+EVIDENCE_DIR = os.getenv("EVIDENCE_DIR")  # local stand-in for the storage bucket
+
+# Size of the stored frames
+EVIDENCE_WIDTH = 160
+EVIDENCE_HEIGHT = 120
+
+# Frames in a keyframe strip, and how they are laid out
+STRIP_FRAMES = 8
+STRIP_COLUMNS = 4
+JPEG_QUALITY = 70
+
+# Share of the sampling interval a frame may arrive early and still be stored, so
+# frames that arrive at the sampling rate with a little jitter aren't skipped
+SAMPLING_TOLERANCE = 0.1
+
+# Most clips waiting for encoding/upload; further captures are dropped
+MAX_PENDING_CLIPS = 4
+UPLOAD_ATTEMPTS = 3
+
+
+class EvidenceRing:
+    """
+    Fixed-size ring of recent downscaled grayscale frames.
+
+    All memory is allocated up front: `capacity` frames plus their
+    timestamps. Pushing a frame is a single resize into the next slot, so
+    keeping the pre-roll costs no allocation and no encoding. Frames are
+    sampled at about `fps` per second (a frame up to SAMPLING_TOLERANCE of
+    an interval early still counts), so the ring spans about
+    capacity / fps seconds.
+    """
+
+    def __init__(self, seconds=EVIDENCE_SECONDS, fps=EVIDENCE_FPS, width=EVIDENCE_WIDTH, height=EVIDENCE_HEIGHT):
+        """
+        Args:
+            seconds (float): Length of history to keep
+            fps (float): Most frames stored per second
+            width (int): Stored frame width
+            height (int): Stored frame height
+        """
+        self.capacity = max(1, int(seconds * fps))
+        self.min_interval = (1.0 - SAMPLING_TOLERANCE) / fps
+        self.size = (width, height)
+        self.frames = np.zeros((self.capacity, height, width), dtype=np.uint8)
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.count = 0
+        self._next = 0
+        self._last_push = -np.inf
+
+    def push(self, gray, now=None):
+        """
+        Store a frame if the sampling interval has passed
+
+        Args:
+            gray: Grayscale image of any size
+            now (float): Timestamp of the frame, defaults to time.time()
+
+        Returns:
+            bool: True if the frame was stored
+        """
+        now = time.time() if now is None else now
+        if now - self._last_push < self.min_interval:
+            return False
+        self._last_push = now
+
+        slot = self._next
+        cv2.resize(gray, self.size, dst=self.frames[slot], interpolation=cv2.INTER_AREA)
+        self.timestamps[slot] = now
+        self._next = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return True
+
+    def snapshot(self, since=None):
+        """
+        Copy the stored frames out of the ring, oldest first
+
+        Args:
+            since (float): Only include frames from this timestamp on
+
+        Returns:
+            tuple: (frames array, timestamps array), both copies
+        """
+        if self.count < self.capacity:
+            order = np.arange(self.count)
+        else:
+            order = (np.arange(self.capacity) + self._next) % self.capacity
+        if since is not None:
+            order = order[self.timestamps[order] >= since]
+        return self.frames[order], self.timestamps[order]
+
+    def clear(self):
+        """Forget all stored frames"""
+        self.count = 0
+        self._next = 0
+        self._last_push = -np.inf
+
+
+def _stamp(frame, timestamp):
+    """Draw the wall-clock time of a frame onto it (in place)"""
+    text = datetime.datetime.fromtimestamp(timestamp).strftime("%H:%M:%S.%f")[:-4]
+    cv2.putText(frame, text, (3, frame.shape[0] - 4), cv2.FONT_HERSHEY_PLAIN, 0.8, 255, 1, cv2.LINE_AA)
+
+
+def encode_strip(frames, timestamps, max_frames=STRIP_FRAMES, columns=STRIP_COLUMNS, quality=JPEG_QUALITY):
+    """
+    Encode evenly spaced keyframes as one JPEG grid
+
+    Args:
+        frames (numpy.ndarray): (n, height, width) grayscale frames, oldest first
+        timestamps (numpy.ndarray): Timestamps of the frames
+        max_frames (int): Most keyframes in the grid
+        columns (int): Keyframes per row
+        quality (int): JPEG quality
+
+    Returns:
+        bytes: JPEG image
+    """
+    picks = np.unique(np.linspace(0, len(frames) - 1, min(max_frames, len(frames))).round().astype(int))
+    rows = -(-len(picks) // columns)
+    height, width = frames.shape[1:]
+    grid = np.zeros((rows * height, columns * width), dtype=np.uint8)
+    for position, index in enumerate(picks):
+        row, column = divmod(position, columns)
+        cell = grid[row * height:(row + 1) * height, column * width:(column + 1) * width]
+        cell[:] = frames[index]
+        _stamp(cell, timestamps[index])
+
+    ok, encoded = cv2.imencode(".jpg", grid, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("JPEG encoding failed")
+    return encoded.tobytes()
+
+
+def encode_clip(frames, timestamps, fps=EVIDENCE_FPS):
+    """
+    Encode frames as an MJPEG video
+
+    Args:
+        frames (numpy.ndarray): (n, height, width) grayscale frames, oldest first
+        timestamps (numpy.ndarray): Timestamps of the frames
+        fps (float): Playback frame rate
+
+    Returns:
+        bytes: AVI file contents
+    """
+    height, width = frames.shape[1:]
+    handle, path = tempfile.mkstemp(suffix=".avi")
+    os.close(handle)
+    try:
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height), False)
+        if not writer.isOpened():
+            raise ValueError("MJPEG encoder not available")
+        for frame, timestamp in zip(frames, timestamps):
+            _stamp(frame, timestamp)
+            writer.write(frame)
+        writer.release()
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+ENCODERS = {
+    "strip": (encode_strip, ".jpg", "image/jpeg"),
+    "clip": (encode_clip, ".avi", "video/x-msvideo"),
+}
+
+
+class SupabaseEvidenceStore:
+    """Uploads evidence files to a Supabase Storage bucket"""
+
+    def __init__(self, bucket=EVIDENCE_BUCKET):
+        self.bucket = bucket
+
+    def save(self, path, data, content_type):
+        from supabase_connection import create_connection
+
+        supabase = create_connection()
+        if not supabase:
+            raise Exception("Failed to connect to Supabase")
+
+        supabase.storage.from_(self.bucket).upload(path, data, {"content-type": content_type})
+
+
+class LocalEvidenceStore:
+    """Local stand-in for the storage bucket: writes evidence files under a directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def save(self, path, data, content_type):
+        target = os.path.join(self.directory, *path.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(data)
+
+
+def create_evidence_store(directory=None):
+    """
+    Choose where evidence is stored
+
+    Args:
+        directory (str): Local directory to use instead of Supabase Storage; defaults to EVIDENCE_DIR
+
+    Returns:
+        SupabaseEvidenceStore or LocalEvidenceStore
+    """
+    directory = directory or EVIDENCE_DIR
+    return LocalEvidenceStore(directory) if directory else SupabaseEvidenceStore()
+
+
+class EvidenceRecorder:
+    """
+    Keeps a pre-roll of frames and turns violations into stored evidence.
+
+    `push()` runs on every processed frame and only fills the EvidenceRing.
+    `capture()` runs when a violation fires: it copies the relevant frames
+    out of the ring and queues them. A background thread encodes each
+    capture (a keyframe strip or an MJPEG clip) and uploads it. The queue
+    is bounded, so memory never exceeds the ring plus MAX_PENDING_CLIPS
+    copies of it; captures beyond that are dropped.
+    """
+
+    def __init__(self, prefix, store=None, ring=None, encoding=EVIDENCE_FORMAT, max_pending=MAX_PENDING_CLIPS):
+        """
+        Args:
+            prefix (str): Storage path prefix, e.g. "<exam id>/<student>"
+            store: Object with a `save(path, data, content_type)` method; defaults to create_evidence_store()
+            ring (EvidenceRing): Frame history; defaults to a new EvidenceRing
+            encoding (str): "strip" or "clip"
+            max_pending (int): Most captures waiting for encoding/upload
+        """
+        if encoding not in ENCODERS:
+            raise ValueError(f"Unknown evidence format '{encoding}', expected one of: {', '.join(ENCODERS)}")
+
+        self.prefix = prefix.strip("/")
+        self.store = store if store is not None else create_evidence_store()
+        self.ring = ring if ring is not None else EvidenceRing()
+        self.encoding = encoding
+        self.captures_saved = 0
+        self.captures_dropped = 0
+        self.captures_failed = 0
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def push(self, gray, now=None):
+        """Add a frame to the pre-roll (cheap; no encoding)"""
+        self.ring.push(gray, now)
+
+    def capture(self, label, since=None, now=None):
+        """
+        Queue the recent frames as evidence
+
+        Args:
+            label (str): Short name for the file, e.g. the violation type
+            since (float): Timestamp of the first frame to include; defaults to the whole ring
+            now (float): Time of the capture, defaults to time.time()
+
+        Returns:
+            str: Storage path the evidence will be saved under, or None if it was dropped
+        """
+        now = time.time() if now is None else now
+        frames, timestamps = self.ring.snapshot(since)
+        if len(frames) == 0:
+            return None
+
+        _, extension, _ = ENCODERS[self.encoding]
+        stamp = datetime.datetime.fromtimestamp(now).strftime("%Y%m%d-%H%M%S-%f")[:-3]
+        path = f"{self.prefix}/{stamp}-{label}{extension}"
+        try:
+            self._queue.put_nowait((path, frames, timestamps))
+        except queue.Full:
+            self.captures_dropped += 1
+            logging.warning(f"Evidence queue full, dropping capture {path}")
+            return None
+        return path
+
+    def _worker(self):
+        """Encode and upload queued captures"""
+        encode, _, content_type = ENCODERS[self.encoding]
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            path, frames, timestamps = job
+            try:
+                data = encode(frames, timestamps)
+            except Exception as e:
+                self.captures_failed += 1
+                logging.error(f"Error encoding evidence {path}: {e}")
+                continue
+
+            for attempt in range(1, UPLOAD_ATTEMPTS + 1):
+                try:
+                    self.store.save(path, data, content_type)
+                    self.captures_saved += 1
+                    logging.info(f"Saved evidence {path} ({len(data)} bytes)")
+                    break
+                except Exception as e:
+                    logging.error(f"Error uploading evidence {path} (attempt {attempt}): {e}")
+                    if attempt < UPLOAD_ATTEMPTS:
+                        time.sleep(attempt * 2)
+            else:
+                self.captures_failed += 1
+
+    def close(self, timeout=10.0):
+        """
+        Finish queued captures and stop the background thread
+
+        Args:
+            timeout (float): Most seconds to wait for pending uploads in total
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logging.warning("Evidence queue still full at close, abandoning pending captures")
+            return
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        if self._thread.is_alive():
+            logging.warning("Evidence uploads still running at close, abandoning them")
+
+    def stats(self):
+        """
+        Returns:
+            dict: Captures saved, dropped and failed
+        """
+        return {
+            "captures_saved": self.captures_saved,
+            "captures_dropped": self.captures_dropped,
+            "captures_failed": self.captures_failed,
+        }
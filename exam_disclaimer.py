@@ -1,5 +1,6 @@
 from PyQt6 import QtWidgets, QtCore, QtGui
 from styles import COMMON_STYLES
+import proctoring_warmup
 
 class ExamDisclaimerPage(QtWidgets.QWidget):
     def __init__(self, main_window, exam_id):
@@ -83,8 +84,9 @@ class ExamDisclaimerPage(QtWidgets.QWidget):
         
         privacy_text = QtWidgets.QLabel(
             "Camera data is processed locally on your device for gaze detection. "
-            "No video or images are stored or transmitted to external servers. "
-            "Only proctoring alerts and test results will be recorded in the system."
+            "No continuous video is recorded. When a violation is detected, a few low-resolution "
+            "grayscale snapshots from the seconds around it are stored as evidence for your teacher, "
+            "together with the proctoring alerts and test results."
         )
         privacy_text.setWordWrap(True)
         privacy_text.setStyleSheet("font-size: 14px; margin: 5px 0px;color: black;")
@@ -118,10 +120,17 @@ class ExamDisclaimerPage(QtWidgets.QWidget):
         
         layout.addLayout(button_layout)
         
+    def showEvent(self, event):
+        """Open the camera while the student reads the disclaimer"""
+        super().showEvent(event)
+        proctoring_warmup.probe_camera()
+        
     def toggle_continue_button(self):
         self.continue_button.setEnabled(self.agreement_checkbox.isChecked())
         
     def go_back(self):
+        # Don't keep the camera open on the dashboard
+        proctoring_warmup.release_camera()
         # Navigate back to student dashboard
         self.main_window.stackedWidget.setCurrentWidget(self.main_window.student_dashboard)
         
@@ -1,7 +1,9 @@
 from PyQt6 import QtWidgets, QtCore
 from supabase_connection import create_connection
+from answer_key import AnswerKey
+from answer_journal import AnswerJournal
+from answer_log import AnswerLog
 import logging
-import datetime
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -14,6 +16,7 @@ class ExamTaking(QtWidgets.QWidget):
         self.current_question_index = 0
         self.questions = []
         self.answers = {}
+        self.answer_key = AnswerKey([], [], [])
         self.exam_duration = 0  # Duration in minutes
         self.remaining_time = 0  # Remaining time in seconds
         
@@ -146,6 +149,17 @@ class ExamTaking(QtWidgets.QWidget):
         # Fetch questions from the database
         self.fetch_questions()
 
+        # Answers are logged locally and written to the database in the background
+        try:
+            self.answer_log = AnswerLog()
+        except Exception as e:
+            logging.error(f"Local answer log unavailable: {e}")
+            self.answer_log = None
+        self.answer_journal = AnswerJournal(self.exam_id, self.main_window.current_user, self.answer_key, self.answer_log)
+
+        # Pick up where an interrupted attempt left off
+        self.answers = self.answer_journal.restore()
+
         # Display the first question
         if self.questions:
             self.display_question(self.current_question_index)
@@ -227,9 +241,9 @@ class ExamTaking(QtWidgets.QWidget):
             if not supabase:
                 raise Exception("Failed to connect to Supabase")
                 
-            # Get questions for this exam
+            # Get questions for this exam, together with the answer key
             response = supabase.table('questions') \
-                .select('id, question_text, option1, option2, option3, option4') \
+                .select('id, question_text, option1, option2, option3, option4, correct_answer') \
                 .eq('exam_id', self.exam_id) \
                 .order('id') \
                 .execute()
@@ -240,6 +254,9 @@ class ExamTaking(QtWidgets.QWidget):
             # Convert the response data to the expected format
             self.questions = [(q['id'], q['question_text'], q['option1'], q['option2'], q['option3'], q['option4']) 
                               for q in response.data]
+            
+            # Keep the answer key in memory so answers can be scored locally
+            self.answer_key = AnswerKey.from_rows(response.data)
                               
             logging.debug(f"Fetched {len(self.questions)} questions")
             
@@ -349,101 +366,8 @@ class ExamTaking(QtWidgets.QWidget):
         self.answers[question_id] = option_index
         logging.debug(f"Saved answer for question {question_id}: option {option_index}")
         
-        # Update exam_results in real-time
-        try:
-            supabase = create_connection()
-            if not supabase:
-                raise Exception("Failed to connect to Supabase")
-            
-            # Get the correct answer to check if this response is correct
-            response = supabase.table('questions') \
-                .select('correct_answer, option1, option2, option3, option4') \
-                .eq('id', question_id) \
-                .execute()
-            
-            if response.data:
-                question = response.data[0]
-                correct_answer = question['correct_answer']
-                options = [question['option1'], question['option2'], question['option3'], question['option4']]
-                selected_option = options[option_index]
-                
-                # Fixed correct answer comparison logic - compare with the actual option text
-                # The correct_answer field stores the text, like "Option X", but we need to match with actual content
-                
-                # Convert from "Option X" format to index
-                option_index_map = {"Option 1": 0, "Option 2": 1, "Option 3": 2, "Option 4": 3}
-                if correct_answer in option_index_map:
-                    correct_index = option_index_map[correct_answer]
-                    correct_option_text = options[correct_index]
-                    is_correct = (selected_option == correct_option_text)
-                else:
-                    # Fallback to direct match (if correct_answer is stored as the actual text)
-                    is_correct = (selected_option == correct_answer)
-                
-                # Log comparison details to help debug
-                logging.debug(f"Answer comparison: selected='{selected_option}', correct='{correct_answer}', is_correct={is_correct}")
-                
-                # Check if this student has already answered this question
-                existing_answer = supabase.table('student_answers') \
-                    .select('id') \
-                    .eq('exam_id', self.exam_id) \
-                    .eq('question_id', question_id) \
-                    .eq('student_username', self.main_window.current_user) \
-                    .execute()
-                
-                if existing_answer.data:
-                    # Update existing answer
-                    supabase.table('student_answers') \
-                        .update({
-                            'selected_answer': selected_option,
-                            'is_correct': is_correct
-                        }) \
-                        .eq('id', existing_answer.data[0]['id']) \
-                        .execute()
-                else:
-                    # Create new answer
-                    supabase.table('student_answers').insert({
-                        'exam_id': self.exam_id,
-                        'question_id': question_id,
-                        'student_username': self.main_window.current_user,
-                        'selected_answer': selected_option,
-                        'is_correct': is_correct
-                    }).execute()
-                
-                # Count all correct answers so far to update the score
-                correct_count_response = supabase.table('student_answers') \
-                    .select('id') \
-                    .eq('exam_id', self.exam_id) \
-                    .eq('student_username', self.main_window.current_user) \
-                    .eq('is_correct', True) \
-                    .execute()
-                
-                correct_count = len(correct_count_response.data)
-                
-                # Check if there's an existing exam result
-                result_response = supabase.table('exam_results') \
-                    .select('id') \
-                    .eq('exam_id', self.exam_id) \
-                    .eq('student_username', self.main_window.current_user) \
-                    .execute()
-                
-                if result_response.data:
-                    # Update existing result with current score
-                    supabase.table('exam_results') \
-                        .update({'score': correct_count}) \
-                        .eq('id', result_response.data[0]['id']) \
-                        .execute()
-                else:
-                    # Create new result entry with initial score
-                    supabase.table('exam_results').insert({
-                        'exam_id': self.exam_id,
-                        'student_username': self.main_window.current_user,
-                        'score': correct_count
-                        # Don't set completed_at until the exam is fully submitted
-                    }).execute()
-        except Exception as e:
-            logging.error(f"Error updating exam result in real-time: {e}")
-            # Don't show error to user to avoid interrupting the exam experience
+        # Queue the answer; the journal writes it and the running score in the background
+        self.answer_journal.record(question_id, option_index)
 
     def prev_question(self):
         if self.current_question_index > 0:
@@ -457,90 +381,16 @@ class ExamTaking(QtWidgets.QWidget):
 
     def submit_exam(self):
         try:
-            # Get current score from the database
-            supabase = create_connection()
-            if not supabase:
-                raise Exception("Failed to connect to Supabase")
-            
-            # Process any unanswered questions and ensure accurate score calculation
             total_questions = len(self.questions)
-            correct_count = 0
             
-            # Check all questions and answers
-            for question_id, _, _, _, _, _ in self.questions:
-                if question_id in self.answers:
-                    # Get the correct answer
-                    response = supabase.table('questions') \
-                        .select('correct_answer, option1, option2, option3, option4') \
-                        .eq('id', question_id) \
-                        .execute()
-                    
-                    if response.data:
-                        question = response.data[0]
-                        correct_answer = question['correct_answer']
-                        options = [question['option1'], question['option2'], question['option3'], question['option4']]
-                        selected_option = options[self.answers[question_id]]
-                        
-                        # Fixed correct answer comparison logic
-                        option_index_map = {"Option 1": 0, "Option 2": 1, "Option 3": 2, "Option 4": 3}
-                        if correct_answer in option_index_map:
-                            correct_index = option_index_map[correct_answer]
-                            correct_option_text = options[correct_index]
-                            is_correct = (selected_option == correct_option_text)
-                        else:
-                            # Fallback to direct match (if correct_answer is stored as the actual text)
-                            is_correct = (selected_option == correct_answer)
-                        
-                        if is_correct:
-                            correct_count += 1
-                        
-                        # Log comparison details to help debug
-                        logging.debug(f"Submit check: selected='{selected_option}', correct='{correct_answer}', is_correct={is_correct}")
-                        
-                        # Ensure student's answer is saved
-                        # Check if this answer already exists
-                        existing_answer = supabase.table('student_answers') \
-                            .select('id') \
-                            .eq('exam_id', self.exam_id) \
-                            .eq('question_id', question_id) \
-                            .eq('student_username', self.main_window.current_user) \
-                            .execute()
-                        
-                        if not existing_answer.data:
-                            # Save only if not already saved
-                            supabase.table('student_answers').insert({
-                                'exam_id': self.exam_id,
-                                'question_id': question_id,
-                                'student_username': self.main_window.current_user,
-                                'selected_answer': selected_option,
-                                'is_correct': is_correct
-                            }).execute()
+            # Store and score every answer in one round trip
+            correct_count = self.answer_journal.submit()
+            logging.debug(f"Exam {self.exam_id} submitted with score {correct_count}/{total_questions}")
             
-            # Get existing result or create a new one
-            result_response = supabase.table('exam_results') \
-                .select('id') \
-                .eq('exam_id', self.exam_id) \
-                .eq('student_username', self.main_window.current_user) \
-                .execute()
-            
-            if result_response.data:
-                # Update existing result with accurate score
-                result_id = result_response.data[0]['id']
-                supabase.table('exam_results') \
-                    .update({
-                        'score': correct_count,
-                        'completed_at': datetime.datetime.now().isoformat()
-                    }) \
-                    .eq('id', result_id) \
-                    .execute()
-            else:
-                # Create a new result entry
-                supabase.table('exam_results').insert({
-                    'exam_id': self.exam_id,
-                    'student_username': self.main_window.current_user,
-                    'score': correct_count,
-                    'completed_at': datetime.datetime.now().isoformat()
-                }).execute()
+            # The attempt is safely stored, so its local log is no longer needed
+            if self.answer_log is not None:
+                self.answer_log.clear(self.exam_id, self.main_window.current_user)
+                self.answer_log.close()
             
             # Show result with additional info about where to view results
             msg = QtWidgets.QMessageBox()
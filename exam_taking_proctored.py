@@ -1,29 +1,30 @@
 from PyQt6 import QtWidgets, QtCore, QtGui
 from exam_taking import ExamTaking
+from proctoring_events import ProctoringEventQueue, ProctoringEvent, instant_event, \
+    GAZE_TIMEOUT, FULLSCREEN_EXIT, FOCUS_LOST, ENGINE_ERROR, EXAM_TERMINATED
+from integrity_monitor import IntegrityMonitor
 import logging
-import threading
 import time
 import datetime
 
 # Initialize global variable
 GAZE_DETECTION_AVAILABLE = False
 
-# Import gaze detection with error handling
+# Highest camera preview refresh rate
+PREVIEW_FPS = 15
+
+# Seconds the exam window may lose focus (e.g. to a notification) before it counts as a violation
+FOCUS_LOSS_GRACE = 3
+
+# Import gaze detection with error handling. Whether the detector models
+# load is checked by the proctoring worker during warm-up
 try:
-    from gaze_detection import GazeDetection
+    import proctoring_warmup
+    from proctoring_engine import ProctoringEngine
     import cv2
     import numpy as np
-    import os
-    
-    # Verify OpenCV Haar cascade files exist
-    face_cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-    eye_cascade_path = cv2.data.haarcascades + 'haarcascade_eye.xml'
     
-    if not os.path.exists(face_cascade_path) or not os.path.exists(eye_cascade_path):
-        logging.error(f"Required OpenCV Haar cascade files not found")
-        GAZE_DETECTION_AVAILABLE = False
-    else:
-        GAZE_DETECTION_AVAILABLE = True
+    GAZE_DETECTION_AVAILABLE = True
         
 except ImportError as e:
     logging.error(f"Failed to import gaze detection modules: {e}")
@@ -31,7 +32,7 @@ except ImportError as e:
 
 class ProctoredExamTaking(QtWidgets.QWidget):
     # Signal for gaze status updates
-    gaze_status_signal = QtCore.pyqtSignal(dict)
+    gaze_status_signal = QtCore.pyqtSignal(object)
     
     def __init__(self, main_window, exam_id):
         global GAZE_DETECTION_AVAILABLE
@@ -48,9 +49,28 @@ class ProctoredExamTaking(QtWidgets.QWidget):
             # Initialize gaze detection if available
             if GAZE_DETECTION_AVAILABLE:
                 try:
-                    self.gaze_detector = GazeDetection(timeout_seconds=15)  # 15 seconds of looking away is a violation
-                    self.camera_thread = None
+                    # Capture and detection run in a separate process, warmed up since
+                    # login; only status and preview frames come back
+                    self.proctoring_engine = proctoring_warmup.take_engine()
+                    if self.proctoring_engine is None:
+                        raise Exception("Proctoring engine could not be created")
+                    if self.proctoring_engine.unavailable_reason:
+                        self.proctoring_engine.stop()
+                        raise Exception(self.proctoring_engine.unavailable_reason)
+                    
+                    # 15 seconds of looking away is a violation
+                    self.proctoring_engine.timeout_seconds = 15
+                    self.proctoring_engine.evidence_prefix = f"{exam_id}/{main_window.current_user}"
                     self.is_camera_running = False
+                    self.preview_seq = 0
+                    
+                    # Violations and other proctoring events, written in batches for teachers to review
+                    self.proctoring_events = ProctoringEventQueue(exam_id, main_window.current_user)
+                    
+                    # What the status labels currently show, so unchanged state isn't re-applied
+                    self.shown_status = None
+                    self.shown_timer_seconds = None
+                    self.shown_timer_style = None
                     
                     # Connect the gaze status signal to the update function
                     self.gaze_status_signal.connect(self.update_gaze_status)
@@ -115,8 +135,15 @@ class ProctoredExamTaking(QtWidgets.QWidget):
                 self.camera_preview.setFixedSize(120, 90)
                 self.camera_preview.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
                 self.camera_preview.setStyleSheet("border: 1px solid #666; background-color: #222;")
+                self.camera_preview.setScaledContents(True)
                 status_layout.addWidget(self.camera_preview)
                 
+                # The preview is pulled from the proctoring engine at display rate,
+                # on the GUI thread, only while it is visible
+                self.preview_timer = QtCore.QTimer(self)
+                self.preview_timer.setInterval(self.preview_interval_ms())
+                self.preview_timer.timeout.connect(self.refresh_camera_preview)
+                
                 # Status information
                 status_info = QtWidgets.QVBoxLayout()
                 
@@ -163,8 +190,10 @@ class ProctoredExamTaking(QtWidgets.QWidget):
             def submit_exam_wrapper(*args, **kwargs):
                 global GAZE_DETECTION_AVAILABLE
                 if GAZE_DETECTION_AVAILABLE:
+                    self.stop_integrity_monitor()
                     self.stop_camera()
                     self.exit_fullscreen()
+                    self.proctoring_events.close()
                 return original_submit(*args, **kwargs)
                 
             self.exam_widget.submit_exam = submit_exam_wrapper
@@ -175,10 +204,13 @@ class ProctoredExamTaking(QtWidgets.QWidget):
             self.main_layout.addWidget(self.content_widget)
             
             if GAZE_DETECTION_AVAILABLE:
-                # Set up a timer to check if we're still in fullscreen
-                self.fullscreen_timer = QtCore.QTimer(self)
-                self.fullscreen_timer.timeout.connect(self.check_fullscreen)
-                self.fullscreen_timer.start(1000)  # Check every second
+                # Fullscreen exits, focus loss and screen changes, reported as they happen.
+                # Queued, so violation dialogs don't open inside Qt's event delivery
+                self.integrity_monitor = IntegrityMonitor(self.main_window, FOCUS_LOSS_GRACE, self)
+                self.integrity_monitor.event_detected.connect(
+                    self.handle_integrity_event, QtCore.Qt.ConnectionType.QueuedConnection)
+                self.integrity_monitor.fullscreen_changed.connect(
+                    lambda fullscreen: self.fullscreen_warning.setVisible(not fullscreen and self.is_fullscreen))
         except Exception as e:
             logging.error(f"Error in initUI: {e}")
             raise
@@ -188,14 +220,19 @@ class ProctoredExamTaking(QtWidgets.QWidget):
         super().showEvent(event)
         # Start in fullscreen and enable camera if available
         global GAZE_DETECTION_AVAILABLE
-        if GAZE_DETECTION_AVAILABLE:
+        if GAZE_DETECTION_AVAILABLE and not event.spontaneous():
+            self.integrity_monitor.start()
             QtCore.QTimer.singleShot(500, self.enter_fullscreen)
-            QtCore.QTimer.singleShot(1000, self.start_camera)
+            # The engine is already warm, so detection starts right away
+            self.start_camera()
     
     def hideEvent(self, event):
         """Called when the widget is hidden"""
         global GAZE_DETECTION_AVAILABLE
-        if GAZE_DETECTION_AVAILABLE:
+        # Spontaneous hides come from the window system (e.g. minimizing); the
+        # integrity monitor reports those, and proctoring keeps running
+        if GAZE_DETECTION_AVAILABLE and not event.spontaneous():
+            self.stop_integrity_monitor()
             self.stop_camera()
             self.exit_fullscreen()
         super().hideEvent(event)
@@ -205,173 +242,140 @@ class ProctoredExamTaking(QtWidgets.QWidget):
         if not self.is_fullscreen:
             self.main_window.showFullScreen()
             self.is_fullscreen = True
+            self.integrity_monitor.expect_fullscreen(True)
     
     def exit_fullscreen(self):
         """Exit fullscreen mode"""
         if self.is_fullscreen:
+            self.integrity_monitor.expect_fullscreen(False)
             self.main_window.showNormal()
             self.is_fullscreen = False
+            self.fullscreen_warning.hide()
+    
+    def stop_integrity_monitor(self):
+        """Stop the integrity monitor, recording a focus loss still in progress"""
+        event = self.integrity_monitor.stop()
+        if event is not None and not self.proctoring_events.closed:
+            self.proctoring_events.record(event)
     
-    def check_fullscreen(self):
-        """Check if we're still in fullscreen mode"""
-        if self.is_fullscreen and not self.main_window.isFullScreen():
-            # User exited fullscreen, count as violation
-            self.record_violation("Exited fullscreen mode")
-            # Try to go back to fullscreen
-            self.enter_fullscreen()
+    def handle_integrity_event(self, event):
+        """Record an event from the integrity monitor (called in main thread)"""
+        # Events queued before the exam was submitted or terminated
+        if self.proctoring_events.closed:
+            return
+            
+        if event.event_type == FULLSCREEN_EXIT:
+            # Go back to fullscreen before the (modal) warning, and count as violation
+            if self.is_fullscreen:
+                self.main_window.showFullScreen()
+            self.record_violation("Exited fullscreen mode", event)
+        elif event.event_type == FOCUS_LOST and (event.details or {}).get("ongoing"):
+            # Reported by the monitor while the student is still away; the
+            # complete focus loss follows as a plain event once focus returns
+            self.record_violation("Switched away from the exam window", event)
+        else:
+            self.proctoring_events.record(event)
     
     def start_camera(self):
-        """Start the camera thread for gaze detection"""
+        """Start the proctoring engine for gaze detection"""
         global GAZE_DETECTION_AVAILABLE
         if not GAZE_DETECTION_AVAILABLE:
             return
         
         if not self.is_camera_running:
             self.is_camera_running = True
-            self.camera_thread = threading.Thread(target=self.camera_worker)
-            self.camera_thread.daemon = True
-            self.camera_thread.start()
+            self.preview_seq = 0
+            # Also delivers any error the engine reported while warming up
+            self.proctoring_engine.set_status_callback(self.gaze_status_signal.emit)
+            self.proctoring_engine.start()
+            self.preview_timer.start()
     
     def stop_camera(self):
-        """Stop the camera thread"""
+        """Stop the proctoring engine"""
         global GAZE_DETECTION_AVAILABLE
         if not GAZE_DETECTION_AVAILABLE:
             return
             
         self.is_camera_running = False
-        if self.camera_thread:
-            self.camera_thread.join(timeout=1.0)
-            self.camera_thread = None
+        self.preview_timer.stop()
+        self.proctoring_engine.stop()
     
-    def camera_worker(self):
-        """Worker function that runs in a separate thread to process camera frames"""
-        global GAZE_DETECTION_AVAILABLE
-        if not GAZE_DETECTION_AVAILABLE:
-            return
-            
-        try:
-            # Initialize camera
-            cap = cv2.VideoCapture(0)
-            if not cap.isOpened():
-                logging.error("Failed to open camera")
-                self.gaze_status_signal.emit({
-                    "status": "Camera not available", 
-                    "is_error": True,
-                    "is_camera_clear": False,
-                    "is_face_detected": False,
-                    "is_facing_camera": False,
-                    "is_timeout": False
-                })
-                return
-                
-            try:
-                while self.is_camera_running:
-                    # Read frame
-                    ret, frame = cap.read()
-                    if not ret:
-                        logging.error("Failed to capture frame")
-                        continue
-                    
-                    # Process frame with gaze detection
-                    result = self.gaze_detector.process_frame(frame)
-                    
-                    # Emit the status to the main thread
-                    self.gaze_status_signal.emit(result)
-                    
-                    # Update the camera preview
-                    self.update_camera_preview(frame)
-                    
-                    # Check if we need to record a violation
-                    if result["is_timeout"]:
-                        self.record_violation("Looking away for too long")
-                    
-                    # Sleep for a bit to reduce CPU usage
-                    time.sleep(0.1)
-                    
-            finally:
-                # Make sure we release the camera
-                cap.release()
-        except Exception as e:
-            logging.error(f"Camera worker error: {e}")
-            self.gaze_status_signal.emit({
-                "status": f"Camera error: {str(e)}", 
-                "is_error": True,
-                "is_camera_clear": False,
-                "is_face_detected": False,
-                "is_facing_camera": False,
-                "is_timeout": False
-            })
+    def preview_interval_ms(self):
+        """Preview refresh interval: the preview frame rate, capped at the screen refresh rate"""
+        refresh_rate = PREVIEW_FPS
+        screen = QtWidgets.QApplication.primaryScreen()
+        if screen is not None and screen.refreshRate() > 0:
+            refresh_rate = min(refresh_rate, screen.refreshRate())
+        return int(1000 / refresh_rate)
     
-    def update_camera_preview(self, frame):
-        """Update the camera preview with the current frame"""
+    def refresh_camera_preview(self):
+        """Show the newest preview frame (called by the preview timer in the main thread)"""
+        # Skip all work, including the worker's downscaling, while the preview can't be seen
+        visible = self.camera_preview.isVisible() and not self.main_window.isMinimized()
+        self.proctoring_engine.set_preview_enabled(visible)
+        if not visible:
+            return
+        
+        seq, frame = self.proctoring_engine.preview_frame(self.preview_seq)
+        if frame is None:
+            return
+        
         try:
-            # Convert the OpenCV BGR image to RGB for Qt
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Resize the frame to fit the preview
-            preview_width = self.camera_preview.width()
-            preview_height = self.camera_preview.height()
-            resized_frame = cv2.resize(rgb_frame, (preview_width, preview_height))
-            
-            # Convert to QImage
-            h, w, c = resized_frame.shape
-            bytes_per_line = c * w
-            q_img = QtGui.QImage(resized_frame.data, w, h, bytes_per_line, QtGui.QImage.Format.Format_RGB888)
-            
-            # Convert to QPixmap and set to label
+            # Wrap the shared BGR buffer directly; the pixmap is the only copy
+            h, w, _ = frame.shape
+            q_img = QtGui.QImage(frame.data, w, h, frame.strides[0], QtGui.QImage.Format.Format_BGR888)
             pixmap = QtGui.QPixmap.fromImage(q_img)
             
-            # Use signal to update UI in main thread
-            QtCore.QMetaObject.invokeMethod(
-                self, 
-                "set_camera_preview", 
-                QtCore.Qt.ConnectionType.QueuedConnection,
-                QtCore.Q_ARG(QtGui.QPixmap, pixmap)
-            )
+            # Drop the frame if the engine reused its slot while we were copying
+            if not self.proctoring_engine.preview_is_current(seq):
+                return
+            
+            self.preview_seq = seq
+            self.camera_preview.setPixmap(pixmap)
         except Exception as e:
             logging.error(f"Error updating camera preview: {e}")
     
-    @QtCore.pyqtSlot(QtGui.QPixmap)
-    def set_camera_preview(self, pixmap):
-        """Set the camera preview pixmap (called in main thread)"""
-        self.camera_preview.setPixmap(pixmap)
-        self.camera_preview.setScaledContents(True)
-    
-    def update_gaze_status(self, result):
-        """Update the UI with the current gaze status (called in main thread)"""
+    def update_gaze_status(self, status):
+        """Update the UI with a gaze status change (called in main thread)"""
         global GAZE_DETECTION_AVAILABLE
         if not GAZE_DETECTION_AVAILABLE:
             return
             
         # Update the status label
-        status_text = result["status"]
+        status_text = status.status
         status_color = "red"
         
-        if result["is_facing_camera"] and result["is_camera_clear"] and result["is_face_detected"]:
+        if status.is_facing_camera and status.is_camera_clear and status.is_face_detected:
             status_text = "Properly facing camera"
             status_color = "green"
         
-        self.status_label.setText(f"Status: {status_text}")
-        self.status_label.setStyleSheet(f"color: {status_color};")
+        if (status_text, status_color) != self.shown_status:
+            self.shown_status = (status_text, status_color)
+            self.status_label.setText(f"Status: {status_text}")
+            self.status_label.setStyleSheet(f"color: {status_color};")
         
         # Update violation timer if applicable
-        if "violation_duration" in result:
-            violation_seconds = int(result["violation_duration"])
+        violation_seconds = status.violation_seconds
+        if violation_seconds is not None and violation_seconds != self.shown_timer_seconds:
+            self.shown_timer_seconds = violation_seconds
             self.violation_timer_label.setText(f"Violation timer: {violation_seconds}s")
             
             # Change color based on how close to violation threshold
             if violation_seconds > 7:  # Close to the 10s threshold
-                self.violation_timer_label.setStyleSheet("color: red; font-weight: bold;")
+                timer_style = "color: red; font-weight: bold;"
             elif violation_seconds > 5:
-                self.violation_timer_label.setStyleSheet("color: orange; font-weight: bold;")
+                timer_style = "color: orange; font-weight: bold;"
             elif violation_seconds > 0:
-                self.violation_timer_label.setStyleSheet("color: yellow;")
+                timer_style = "color: yellow;"
             else:
-                self.violation_timer_label.setStyleSheet("color: white;")
+                timer_style = "color: white;"
+            if timer_style != self.shown_timer_style:
+                self.shown_timer_style = timer_style
+                self.violation_timer_label.setStyleSheet(timer_style)
         
         # Check for violations
-        if result.get("violation_triggered", False):
-            violation_type = result.get("violation_type", "unknown")
+        if status.violation_triggered:
+            violation_type = status.violation_type
             reason = ""
             
             if violation_type == "unclear_camera":
@@ -382,25 +386,45 @@ class ProctoredExamTaking(QtWidgets.QWidget):
                 reason = "Not facing camera directly"
             else:
                 reason = "Unknown violation"
-                
-            self.record_violation(reason)
+            
+            now = time.time()
+            event = ProctoringEvent(violation_type, now - status.violation_seconds, now,
+                                    confidence=status.violation_confidence,
+                                    details={"evidence": status.evidence} if status.evidence else None)
+            self.record_violation(reason, event)
+        
+        # Check for timeout (not facing the camera for longer than the gaze timeout)
+        if status.is_timeout:
+            now = time.time()
+            event = ProctoringEvent(GAZE_TIMEOUT, now - self.proctoring_engine.timeout_seconds, now,
+                                    details={"evidence": status.evidence} if status.evidence else None)
+            self.record_violation("Looking away for too long", event)
         
-        # Check for timeout
-        if result["is_timeout"]:
-            # This is a long-term timeout (e.g., not facing camera for 60 seconds)
-            # We may want to handle this differently than the 10-second violations
-            pass
+        if status.is_error:
+            self.proctoring_events.record(instant_event(ENGINE_ERROR, {"status": status.status}))
     
-    def record_violation(self, reason):
-        """Record a proctoring violation"""
+    def record_violation(self, reason, event=None):
+        """
+        Record a proctoring violation
+        
+        Args:
+            reason (str): Reason shown to the student
+            event (ProctoringEvent): Event to store as evidence; it is stored even
+                when the violation doesn't count because of the cooldown
+        """
         global GAZE_DETECTION_AVAILABLE
         if not GAZE_DETECTION_AVAILABLE:
             return
             
         current_time = time.time()
+        counted = current_time - self.last_violation_time >= self.VIOLATION_COOLDOWN
+        
+        if event is not None:
+            event.details = dict(event.details or {}, reason=reason, counted=counted)
+            self.proctoring_events.record(event)
         
         # Check if we're still in cooldown period
-        if current_time - self.last_violation_time < self.VIOLATION_COOLDOWN:
+        if not counted:
             return
             
         # Record the violation
@@ -448,8 +472,13 @@ class ProctoredExamTaking(QtWidgets.QWidget):
             return
             
         # Stop the camera
+        self.stop_integrity_monitor()
         self.stop_camera()
         
+        # Store the termination with the violations that caused it
+        self.proctoring_events.record(instant_event(EXAM_TERMINATED, {"violations": self.violations_count}))
+        self.proctoring_events.close()
+        
         # Show a message box
         msg = QtWidgets.QMessageBox(self)
         msg.setIcon(QtWidgets.QMessageBox.Icon.Critical)
@@ -480,13 +509,21 @@ class ProctoredExamTaking(QtWidgets.QWidget):
             # Get the current user
             student_username = self.main_window.current_user
             
+            # Stop background answer writes, waiting for one already in flight,
+            # so the running score can't overwrite the zero
+            self.exam_widget.answer_journal.close(flush=False)
+            
             # Submit a zero score using the existing schema
-            response = supabase.table('exam_results').insert({
+            response = supabase.table('exam_results').upsert({
                 'exam_id': self.exam_id,
                 'student_username': student_username,
                 'score': 0,
                 'completed_at': datetime.datetime.now().isoformat()
-            }).execute()
+            }, on_conflict='exam_id,student_username').execute()
+            
+            if self.exam_widget.answer_log is not None:
+                self.exam_widget.answer_log.clear(self.exam_id, student_username)
+                self.exam_widget.answer_log.close()
             
             logging.info(f"Submitted zero score for {student_username} due to proctoring violations")
             
@@ -0,0 +1,110 @@
+import cv2
+import numpy as np
+
+
+class FrameContext:
+    """
+    Artifacts derived from one camera frame, computed once and shared by
+    every consumer (quality check, motion gate, face detection).
+
+    The arrays are views of the pipeline's reusable buffers and are only
+    valid until the pipeline prepares the next frame.
+    """
+
+    __slots__ = ('frame', 'gray', 'frame_gray', 'small', 'scale', 'brightness', 'clarity')
+
+    def __init__(self, frame, gray, frame_gray, small, scale, brightness, clarity):
+        """
+        Args:
+            frame: Original BGR frame
+            gray: Grayscale image for detection, at the pipeline's detection scale
+            frame_gray: Grayscale image at full resolution
+            small: Grayscale image at half resolution (one pyramid level down)
+            scale (float): Size of `gray` relative to the frame
+            brightness (float): Mean brightness (0-255)
+            clarity (float): Laplacian variance of the full-resolution grayscale image
+        """
+        self.frame = frame
+        self.gray = gray
+        self.frame_gray = frame_gray
+        self.small = small
+        self.scale = scale
+        self.brightness = brightness
+        self.clarity = clarity
+
+
+class FramePipeline:
+    """
+    Per-frame preprocessing stage with preallocated output buffers.
+
+    `prepare()` converts a frame to grayscale, builds one pyramid level
+    down, measures brightness on that smaller level and sharpness on the
+    full-resolution image, all into buffers that are allocated once and
+    reused while the frame size stays the same. Sharpness depends on the
+    resolution it is measured at, so it stays at full resolution to keep
+    the clarity threshold's meaning.
+
+    `detection_scale` below 1 hands detectors a downscaled grayscale image
+    to cut their cost; detectors still report face boxes in frame
+    coordinates. Brightness and sharpness are always measured on the
+    full-resolution images, so quality thresholds don't depend on it.
+    """
+
+    def __init__(self, detection_scale=1.0):
+        """
+        Args:
+            detection_scale (float): Size of the detection image relative to the frame
+        """
+        self.detection_scale = detection_scale
+        self._shape = None
+        self._gray = None
+        self._small = None
+        self._laplacian = None
+        self._detect_gray = None
+
+    def _allocate(self, shape):
+        """Allocate the working buffers for a frame shape"""
+        height, width = shape[:2]
+        small_size = ((height + 1) // 2, (width + 1) // 2)
+        self._shape = shape
+        self._gray = np.empty((height, width), dtype=np.uint8)
+        self._small = np.empty(small_size, dtype=np.uint8)
+        self._laplacian = np.empty((height, width), dtype=np.int16)
+
+    def prepare(self, frame):
+        """
+        Compute the shared artifacts for a frame
+
+        Args:
+            frame: OpenCV BGR image frame
+
+        Returns:
+            FrameContext: Artifacts for the frame
+        """
+        if frame.shape != self._shape:
+            self._allocate(frame.shape)
+
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        cv2.pyrDown(self._gray, dst=self._small)
+
+        # pyrDown preserves the mean, so brightness can be measured on the small level
+        brightness = cv2.mean(self._small)[0]
+
+        # Sharpness as the variance of the Laplacian, in 16-bit to avoid a float image.
+        # The 3x3 Laplacian of an 8-bit image fits in 16 bits, so this equals the float result
+        cv2.Laplacian(self._gray, cv2.CV_16S, dst=self._laplacian)
+        _, stddev = cv2.meanStdDev(self._laplacian)
+        clarity = float(stddev[0][0]) ** 2
+
+        gray = self._gray
+        scale = 1.0
+        if self.detection_scale < 1.0:
+            height, width = self._gray.shape
+            size = (max(1, round(width * self.detection_scale)), max(1, round(height * self.detection_scale)))
+            if self._detect_gray is None or self._detect_gray.shape != (size[1], size[0]):
+                self._detect_gray = np.empty((size[1], size[0]), dtype=np.uint8)
+            cv2.resize(self._gray, size, dst=self._detect_gray, interpolation=cv2.INTER_AREA)
+            gray = self._detect_gray
+            scale = self.detection_scale
+
+        return FrameContext(frame, gray, self._gray, self._small, scale, brightness, clarity)
@@ -0,0 +1,544 @@
+import os
+import sys
+import abc
+import time
+import argparse
+import cv2
+import numpy as np
+
+# Detector backend used by GazeDetection, overridable from the .env file
+GAZE_BACKEND = os.getenv("GAZE_BACKEND", "haar")
+
+# Directory holding the OpenCV DNN face model files
+GAZE_MODEL_DIR = os.getenv("GAZE_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+DNN_PROTOTXT = "deploy.prototxt"
+DNN_CAFFEMODEL = "res10_300x300_ssd_iter_140000.caffemodel"
+
+
+class GazeBackend(abc.ABC):
+    """
+    Interface of a face/gaze detector.
+
+    A backend receives the shared FrameContext of a frame and decides
+    whether a face is present and whether the user is facing the camera.
+    Backends search for faces at the context's detection scale, but always
+    report face boxes in camera frame coordinates.
+    """
+
+    name = "base"
+    _scaled_frame = None
+
+    @abc.abstractmethod
+    def detect(self, context):
+        """
+        Args:
+            context (FrameContext): Preprocessed frame
+
+        Returns:
+            tuple: (face, is_facing_camera) where face is (x, y, w, h) in frame coordinates, or None
+        """
+
+    def detection_frame(self, context):
+        """
+        The BGR frame at the context's detection scale, for backends that need color
+
+        Returns:
+            numpy.ndarray: The frame itself at full scale, else a reused resized copy
+        """
+        frame = context.frame
+        if context.scale >= 1.0:
+            return frame
+        height, width = context.gray.shape
+        if self._scaled_frame is None or self._scaled_frame.shape[:2] != (height, width):
+            self._scaled_frame = np.empty((height, width, frame.shape[2]), dtype=frame.dtype)
+        cv2.resize(frame, (width, height), dst=self._scaled_frame, interpolation=cv2.INTER_AREA)
+        return self._scaled_frame
+
+    def reset(self):
+        """Forget any state carried between frames"""
+
+    def close(self):
+        """Release the backend's resources"""
+
+
+class EyePairCheck:
+    """
+    Facing check shared by the box detectors: two level eyes in the upper face.
+
+    Runs on the full-resolution grayscale image whatever the detection
+    scale, since eyes shrink below the cascade's minimum size quickly. It
+    only searches the face region, so this costs little.
+    """
+
+    EYE_REGION_HEIGHT = 0.6  # Eyes are searched for in the upper part of the face
+
+    def __init__(self):
+        eye_cascade_path = cv2.data.haarcascades + 'haarcascade_eye.xml'
+        if not os.path.exists(eye_cascade_path):
+            raise FileNotFoundError(f"Eye cascade file not found: {eye_cascade_path}")
+        self.eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
+
+    def is_facing(self, gray, face):
+        """
+        Args:
+            gray: Full-resolution grayscale image frame
+            face (tuple): (x, y, w, h) of the face in frame coordinates
+
+        Returns:
+            bool: True if two eyes at roughly the same height were found
+        """
+        x, y, w, h = face
+        roi_gray = gray[y:y + int(h * self.EYE_REGION_HEIGHT), x:x + w]
+
+        # An eye is at most about half the face width
+        eye_max = max(21, w // 2)
+        eyes = self.eye_cascade.detectMultiScale(
+            roi_gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(20, 20),
+            maxSize=(eye_max, eye_max)
+        )
+        if len(eyes) < 2:
+            return False
+
+        # Sort eyes by x-position and compare the two leftmost
+        eyes = sorted(eyes, key=lambda e: e[0])
+        eye1_y = eyes[0][1] + eyes[0][3] / 2
+        eye2_y = eyes[1][1] + eyes[1][3] / 2
+
+        # If eyes are roughly at the same height (within 10% of face height)
+        return abs(eye1_y - eye2_y) < 0.1 * h
+
+
+class HaarBackend(GazeBackend):
+    """
+    Haar cascade face detector with face tracking, plus the eye-pair check.
+
+    The face cascade scans the whole frame only every `full_scan_interval`
+    frames or when the track is lost; in between it searches a padded
+    region around the last face for a face of similar size. A tracked
+    search that comes up empty is allowed `max_track_misses` times in a row
+    before the track counts as lost, so one missed detection doesn't cost
+    a full-frame scan.
+
+    The face cascade runs on the detection image with its minimum face size
+    scaled along; the track is kept in frame coordinates, so it survives
+    changes of the detection scale.
+    """
+
+    name = "haar"
+
+    MIN_FACE_SIZE = 30  # Smallest face searched for, in frame pixels
+
+    TRACK_PADDING = 0.5  # ROI padding as a fraction of the last face size
+    TRACK_MIN_SCALE = 0.7  # Smallest face searched for, relative to the last face
+    TRACK_MAX_SCALE = 1.4  # Largest face searched for, relative to the last face
+
+    def __init__(self, full_scan_interval=15, max_track_misses=2):
+        """
+        Args:
+            full_scan_interval (int): Frames between full-frame face scans while a face is tracked
+            max_track_misses (int): Consecutive empty tracked searches before a full scan
+        """
+        face_cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        if not os.path.exists(face_cascade_path):
+            raise FileNotFoundError(f"Face cascade file not found: {face_cascade_path}")
+        self.face_cascade = cv2.CascadeClassifier(face_cascade_path)
+        self.eye_check = EyePairCheck()
+
+        self.full_scan_interval = full_scan_interval
+        self.max_track_misses = max_track_misses
+        self.last_face = None
+        self.track_misses = 0
+        self.frames_since_full_scan = 0
+        self.full_scans = 0
+        self.tracked_scans = 0
+
+    def detect(self, context):
+        face = self.find_face(context.gray, context.scale)
+        if face is None:
+            return None, False
+        return face, self.eye_check.is_facing(context.frame_gray, face)
+
+    def find_face(self, gray, scale=1.0):
+        """
+        Find the user's face, tracking it between periodic full-frame scans
+
+        Args:
+            gray: Grayscale image frame, at `scale` of the camera frame
+            scale (float): Size of `gray` relative to the camera frame
+
+        Returns:
+            tuple: (x, y, w, h) of the largest face in frame coordinates, or None
+        """
+        min_side = max(1, round(self.MIN_FACE_SIZE * scale))
+        if self.last_face is not None and self.frames_since_full_scan < self.full_scan_interval:
+            self.frames_since_full_scan += 1
+            self.tracked_scans += 1
+            face = self.scan_around_face(gray, scale_box(self.last_face, scale), min_side)
+            if face is not None:
+                face = scale_box(face, 1.0 / scale)
+                self.last_face = face
+                self.track_misses = 0
+                return face
+            self.track_misses += 1
+            if self.track_misses <= self.max_track_misses:
+                # Probably a missed detection; keep the track for the next frame
+                return None
+            # Track lost, fall back to a full scan of this frame
+
+        self.full_scans += 1
+        self.frames_since_full_scan = 0
+        self.track_misses = 0
+        faces = self.face_cascade.detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(min_side, min_side)
+        )
+
+        # Get the largest face (assuming it's the user)
+        self.last_face = scale_box(max(faces, key=lambda face: face[2] * face[3]), 1.0 / scale) if len(faces) > 0 else None
+        return self.last_face
+
+    def scan_around_face(self, gray, last_face, min_face_size=MIN_FACE_SIZE):
+        """
+        Search for a face near where it was in the previous frame
+
+        Args:
+            gray: Grayscale image frame
+            last_face (tuple): (x, y, w, h) of the previous detection, in `gray` coordinates
+            min_face_size (int): Smallest face searched for, in `gray` pixels
+
+        Returns:
+            tuple: (x, y, w, h) of the largest face found, or None
+        """
+        x, y, w, h = last_face
+        pad = int(self.TRACK_PADDING * max(w, h))
+        frame_h, frame_w = gray.shape[:2]
+        x0, y0 = max(0, x - pad), max(0, y - pad)
+        x1, y1 = min(frame_w, x + w + pad), min(frame_h, y + h + pad)
+
+        # The face can only have moved or scaled a little since the last frame
+        min_side = max(min_face_size, int(min(w, h) * self.TRACK_MIN_SCALE))
+        max_side = int(max(w, h) * self.TRACK_MAX_SCALE)
+        if x1 - x0 < min_side or y1 - y0 < min_side:
+            return None
+
+        faces = self.face_cascade.detectMultiScale(
+            gray[y0:y1, x0:x1],
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(min_side, min_side),
+            maxSize=(max_side, max_side)
+        )
+        if len(faces) == 0:
+            return None
+
+        fx, fy, fw, fh = max(faces, key=lambda face: face[2] * face[3])
+        return (x0 + int(fx), y0 + int(fy), int(fw), int(fh))
+
+    def reset(self):
+        self.last_face = None
+        self.track_misses = 0
+        self.frames_since_full_scan = 0
+
+
+class DnnBackend(GazeBackend):
+    """
+    OpenCV DNN face detector (ResNet-10 SSD, 300x300, CPU), plus the eye-pair check.
+
+    Needs deploy.prototxt and res10_300x300_ssd_iter_140000.caffemodel in
+    GAZE_MODEL_DIR.
+    """
+
+    name = "dnn"
+
+    def __init__(self, model_dir=GAZE_MODEL_DIR, confidence=0.6):
+        """
+        Args:
+            model_dir (str): Directory with the model files
+            confidence (float): Minimum detection confidence
+        """
+        prototxt = os.path.join(model_dir, DNN_PROTOTXT)
+        caffemodel = os.path.join(model_dir, DNN_CAFFEMODEL)
+        for path in (prototxt, caffemodel):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"DNN face model file not found: {path}")
+
+        self.net = cv2.dnn.readNetFromCaffe(prototxt, caffemodel)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.confidence = confidence
+        self.eye_check = EyePairCheck()
+
+    def detect(self, context):
+        frame_h, frame_w = context.frame.shape[:2]
+        # The net always runs at 300x300; a smaller source only makes the blob cheaper
+        blob = cv2.dnn.blobFromImage(self.detection_frame(context), 1.0, (300, 300), (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        detections = self.net.forward()[0, 0]
+
+        # Rows are (image_id, label, confidence, x0, y0, x1, y1), coordinates relative
+        detections = detections[detections[:, 2] >= self.confidence]
+        if len(detections) == 0:
+            return None, False
+
+        boxes = np.clip(detections[:, 3:7], 0.0, 1.0) * [frame_w, frame_h, frame_w, frame_h]
+        areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        x0, y0, x1, y1 = boxes[int(np.argmax(areas))].astype(int)
+        if x1 - x0 < 30 or y1 - y0 < 30:
+            return None, False
+
+        face = (int(x0), int(y0), int(x1 - x0), int(y1 - y0))
+        return face, self.eye_check.is_facing(context.frame_gray, face)
+
+
+class MediaPipeBackend(GazeBackend):
+    """
+    MediaPipe FaceMesh landmarks with a head-pose estimate.
+
+    The user counts as facing the camera while the head's yaw and pitch,
+    solved from six landmarks against a generic 3D face model, stay within
+    `max_yaw` and `max_pitch` degrees.
+    """
+
+    name = "mediapipe"
+
+    # FaceMesh landmark ids: nose tip, chin, eye outer corners, mouth corners
+    LANDMARK_IDS = (1, 152, 33, 263, 61, 291)
+    MODEL_POINTS = np.array([
+        (0.0, 0.0, 0.0),
+        (0.0, -63.6, -12.5),
+        (-43.3, 32.7, -26.0),
+        (43.3, 32.7, -26.0),
+        (-28.9, -28.9, -24.1),
+        (28.9, -28.9, -24.1),
+    ], dtype=np.float64)
+
+    def __init__(self, max_yaw=25.0, max_pitch=20.0):
+        """
+        Args:
+            max_yaw (float): Largest left/right head turn in degrees still counted as facing
+            max_pitch (float): Largest up/down head tilt in degrees still counted as facing
+        """
+        import mediapipe as mp
+
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=False,
+            max_num_faces=1,
+            refine_landmarks=False,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        self.max_yaw = max_yaw
+        self.max_pitch = max_pitch
+        self._rgb = None
+
+    def detect(self, context):
+        frame_h, frame_w = context.frame.shape[:2]
+        # Landmarks are relative to the image, so the detection scale doesn't change them
+        frame = self.detection_frame(context)
+        if self._rgb is None or self._rgb.shape != frame.shape:
+            self._rgb = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+
+        results = self.face_mesh.process(self._rgb)
+        if not results.multi_face_landmarks:
+            return None, False
+
+        landmarks = results.multi_face_landmarks[0].landmark
+        xs = np.fromiter((lm.x for lm in landmarks), dtype=np.float64) * frame_w
+        ys = np.fromiter((lm.y for lm in landmarks), dtype=np.float64) * frame_h
+        x0, y0 = int(max(0, xs.min())), int(max(0, ys.min()))
+        face = (x0, y0, int(min(frame_w, xs.max()) - x0), int(min(frame_h, ys.max()) - y0))
+
+        image_points = np.array([(xs[i], ys[i]) for i in self.LANDMARK_IDS], dtype=np.float64)
+        yaw, pitch = self.head_pose(image_points, frame_w, frame_h)
+        if yaw is None:
+            return face, False
+        return face, abs(yaw) <= self.max_yaw and abs(pitch) <= self.max_pitch
+
+    def head_pose(self, image_points, frame_w, frame_h):
+        """
+        Estimate head yaw and pitch from 2D landmarks
+
+        Returns:
+            tuple: (yaw, pitch) in degrees, or (None, None) if the pose could not be solved
+        """
+        focal = float(frame_w)
+        camera_matrix = np.array([[focal, 0, frame_w / 2], [0, focal, frame_h / 2], [0, 0, 1]], dtype=np.float64)
+        ok, rotation, _ = cv2.solvePnP(self.MODEL_POINTS, image_points, camera_matrix, np.zeros((4, 1)),
+                                       flags=cv2.SOLVEPNP_ITERATIVE)
+        if not ok:
+            return None, None
+
+        rotation_matrix, _ = cv2.Rodrigues(rotation)
+        angles, _, _, _, _, _ = cv2.RQDecomp3x3(rotation_matrix)
+        pitch, yaw = angles[0], angles[1]
+        # Wrap pitch into [-90, 90]; the model's y axis points up, the image's down
+        if pitch > 90:
+            pitch -= 180
+        elif pitch < -90:
+            pitch += 180
+        return yaw, pitch
+
+    def close(self):
+        self.face_mesh.close()
+
+
+def scale_box(box, scale):
+    """
+    Scale a face box between frame and detection image coordinates
+
+    Args:
+        box (tuple): (x, y, w, h)
+        scale (float): Factor to apply
+
+    Returns:
+        tuple: Scaled (x, y, w, h) as ints
+    """
+    return tuple(int(round(v * scale)) for v in box)
+
+
+BACKENDS = {
+    HaarBackend.name: HaarBackend,
+    DnnBackend.name: DnnBackend,
+    MediaPipeBackend.name: MediaPipeBackend,
+}
+
+
+def create_backend(name=None):
+    """
+    Create a detector backend by name
+
+    Args:
+        name (str): "haar", "dnn" or "mediapipe"; defaults to GAZE_BACKEND
+
+    Returns:
+        GazeBackend: The backend
+    """
+    name = (name or GAZE_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown gaze backend '{name}', expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def read_clip_frames(path, max_frames=None):
+    """Yield the frames of a video file, or of the images in a directory"""
+    if os.path.isdir(path):
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')))
+        for count, name in enumerate(names):
+            if max_frames is not None and count >= max_frames:
+                return
+            frame = cv2.imread(os.path.join(path, name))
+            if frame is not None:
+                yield frame
+        return
+
+    cap = cv2.VideoCapture(path)
+    try:
+        count = 0
+        while max_frames is None or count < max_frames:
+            ok, frame = cap.read()
+            if not ok:
+                return
+            count += 1
+            yield frame
+    finally:
+        cap.release()
+
+
+def benchmark(clips, backend_names, max_frames=None):
+    """
+    Run every backend over recorded clips
+
+    Args:
+        clips (list): Video files or image directories
+        backend_names (list): Backends to compare
+        max_frames (int): Optional limit of frames per clip
+
+    Returns:
+        dict: Per-backend latency/CPU summary and pairwise verdict agreement
+    """
+    from frame_pipeline import FramePipeline
+
+    backends = {}
+    for name in backend_names:
+        try:
+            backends[name] = create_backend(name)
+        except Exception as e:
+            print(f"Skipping backend '{name}': {e}")
+
+    pipeline = FramePipeline()
+    latencies = {name: [] for name in backends}
+    cpu_times = {name: [] for name in backends}
+    verdicts = {name: [] for name in backends}
+
+    for clip in clips:
+        for backend in backends.values():
+            backend.reset()
+        for frame in read_clip_frames(clip, max_frames):
+            context = pipeline.prepare(frame)
+            for name, backend in backends.items():
+                wall_start, cpu_start = time.perf_counter(), time.process_time()
+                face, facing = backend.detect(context)
+                cpu_times[name].append(time.process_time() - cpu_start)
+                latencies[name].append(time.perf_counter() - wall_start)
+                verdicts[name].append((face is not None, bool(facing)))
+
+    summary = {}
+    for name in backends:
+        values = np.array(latencies[name]) * 1000
+        if len(values) == 0:
+            continue
+        faces = sum(1 for face, _ in verdicts[name] if face)
+        facing = sum(1 for _, is_facing in verdicts[name] if is_facing)
+        summary[name] = {
+            "frames": len(values),
+            "p50_ms": float(np.percentile(values, 50)),
+            "p95_ms": float(np.percentile(values, 95)),
+            "cpu_ms_per_frame": float(np.mean(cpu_times[name]) * 1000),
+            "face_rate": faces / len(values),
+            "facing_rate": facing / len(values),
+        }
+
+    agreement = {}
+    names = list(summary)
+    for i, first in enumerate(names):
+        for second in names[i + 1:]:
+            pairs = list(zip(verdicts[first], verdicts[second]))
+            agreement[f"{first}/{second}"] = {
+                "face": sum(a[0] == b[0] for a, b in pairs) / len(pairs),
+                "facing": sum(a[1] == b[1] for a, b in pairs) / len(pairs),
+            }
+
+    for backend in backends.values():
+        backend.close()
+    return {"backends": summary, "agreement": agreement}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare gaze detector backends on recorded clips")
+    parser.add_argument("clips", nargs="+", help="Video files or directories of frames")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Comma-separated backends to compare")
+    parser.add_argument("--max-frames", type=int, default=None, help="Frames to use per clip")
+    args = parser.parse_args()
+
+    report = benchmark(args.clips, [name.strip() for name in args.backends.split(",") if name.strip()], args.max_frames)
+    if not report["backends"]:
+        print("No backend could be run")
+        return 1
+
+    print(f"{'backend':<10} {'frames':>7} {'p50 ms':>8} {'p95 ms':>8} {'cpu ms':>8} {'face':>6} {'facing':>7}")
+    for name, stats in report["backends"].items():
+        print(f"{name:<10} {stats['frames']:>7} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+              f"{stats['cpu_ms_per_frame']:>8.2f} {stats['face_rate']:>6.0%} {stats['facing_rate']:>7.0%}")
+    for pair, stats in report["agreement"].items():
+        print(f"Agreement {pair}: face {stats['face']:.0%}, facing {stats['facing']:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,34 @@
-import cv2
-import numpy as np
 import time
 import logging
-import os
+from frame_pipeline import FramePipeline
+from motion_gate import MotionGate
+from gaze_backends import GazeBackend, create_backend
+from gaze_window import DECISION_WINDOW, FeatureWindow, Hysteresis
 
 class GazeDetection:
-    def __init__(self, timeout_seconds=60):
+    def __init__(self, timeout_seconds=60, backend=None):
         """
         Initialize the gaze detection system using OpenCV
         
         Args:
             timeout_seconds (int): Number of seconds before triggering a timeout alert
+            backend: Detector backend name ("haar", "dnn", "mediapipe") or GazeBackend
+                instance; defaults to the GAZE_BACKEND setting
         """
         try:
-            # Initialize OpenCV face and eye cascade classifiers
-            face_cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            eye_cascade_path = cv2.data.haarcascades + 'haarcascade_eye.xml'
+            # Face and facing-camera detector
+            self.backend = backend if isinstance(backend, GazeBackend) else create_backend(backend)
             
-            # Verify that the cascade files exist
-            if not os.path.exists(face_cascade_path):
-                raise FileNotFoundError(f"Face cascade file not found: {face_cascade_path}")
-            if not os.path.exists(eye_cascade_path):
-                raise FileNotFoundError(f"Eye cascade file not found: {eye_cascade_path}")
+            logging.info(f"Gaze detector backend '{self.backend.name}' initialized successfully")
             
-            # Load the cascades
-            self.face_cascade = cv2.CascadeClassifier(face_cascade_path)
-            self.eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
+            # Shared per-frame preprocessing (grayscale, pyramid level, quality stats)
+            self.pipeline = FramePipeline()
             
-            logging.info("OpenCV face and eye detectors initialized successfully")
+            # Artifacts of the most recent frame, for consumers such as evidence recording
+            self.last_context = None
+            
+            # Reuses the last face/eye verdict while the scene is unchanged
+            self.motion_gate = MotionGate()
             
             # State variables
             self.last_facing_camera_time = time.time()
@@ -36,128 +37,123 @@ class GazeDetection:
             self.is_face_detected = False
             self.is_facing_camera = False
             
+            # Per-frame detector output, before smoothing
+            self.face_seen = False
+            self.facing_seen = False
+            self.face_box = None
+            
+            # Recent per-frame features; the states above are decided from them with
+            # hysteresis, so a single flickering frame can't start or reset a violation
+            self.window = FeatureWindow()
+            self.clear_state = Hysteresis(initial=True)
+            self.face_state = Hysteresis(initial=False)
+            self.facing_state = Hysteresis(initial=False)
+            
             # Violation tracking
             self.violation_start_time = None
             self.violation_duration = 0
             self.violation_threshold = 10  # 10 seconds threshold for violations
+            self.violation_frames = 0
+            self.violation_type_frames = {}
             
             # Constants
             self.GAZE_TIMEOUT = timeout_seconds
+            # Minimum Laplacian variance of the full-resolution grayscale image
+            self.CLARITY_THRESHOLD = 100
+            self.BRIGHTNESS_THRESHOLD = 30
         except Exception as e:
-            logging.error(f"Failed to initialize OpenCV detectors: {e}")
+            logging.error(f"Failed to initialize gaze detector: {e}")
             raise
     
-    def check_image_quality(self, frame):
+    def check_image_quality(self, frame, context=None):
         """
         Check if the camera image is clear
         
         Args:
             frame: OpenCV image frame
+            context (FrameContext): Precomputed artifacts for the frame, if available
             
         Returns:
             bool: True if image is clear enough
         """
-        # Convert to grayscale for analysis
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if context is None:
+            context = self.pipeline.prepare(frame)
         
-        # Calculate image clarity - Laplacian variance method
-        clarity = cv2.Laplacian(gray, cv2.CV_64F).var()
-        
-        # Check if image is too dark
-        brightness = np.mean(gray)
-        
-        # Return True if image is clear enough
-        return clarity > 100 and brightness > 30
+        # Image clarity (Laplacian variance) and brightness are computed once per frame
+        return context.clarity > self.CLARITY_THRESHOLD and context.brightness > self.BRIGHTNESS_THRESHOLD
     
-    def detect_face_and_gaze(self, frame):
+    def detect_face_and_gaze(self, frame, context=None):
         """
-        Detect face and determine if user is facing the camera using OpenCV
+        Detect face and determine if user is facing the camera using the detector backend
+        
+        Sets the per-frame `face_seen`, `facing_seen` and `face_box`.
         
         Args:
             frame: OpenCV image frame
+            context (FrameContext): Precomputed artifacts for the frame, if available
             
         Returns:
             frame: Processed frame with annotations (optional)
         """
         # Reset detection flags
-        self.is_face_detected = False
-        self.is_facing_camera = False
+        self.face_seen = False
+        self.facing_seen = False
+        self.face_box = None
         
         try:
-            # Convert frame to grayscale for detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            # Artifacts shared with the quality check
+            if context is None:
+                context = self.pipeline.prepare(frame)
             
-            # Detect faces
-            faces = self.face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30)
-            )
-            
-            if len(faces) > 0:
-                self.is_face_detected = True
-                
-                # Get the largest face (assuming it's the user)
-                largest_face = max(faces, key=lambda face: face[2] * face[3])
-                x, y, w, h = largest_face
-                
-                # Draw face rectangle (for debugging)
-                # cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
-                
-                # Extract face region and detect eyes
-                roi_gray = gray[y:y+h, x:x+w]
-                roi_color = frame[y:y+h, x:x+w]
-                
-                eyes = self.eye_cascade.detectMultiScale(
-                    roi_gray,
-                    scaleFactor=1.1,
-                    minNeighbors=5,
-                    minSize=(20, 20)
-                )
-                
-                # Check if both eyes are detected
-                if len(eyes) >= 2:
-                    # Sort eyes by x-position
-                    eyes = sorted(eyes, key=lambda e: e[0])
-                    
-                    # Draw eye rectangles (for debugging)
-                    # for (ex, ey, ew, eh) in eyes:
-                    #     cv2.rectangle(roi_color, (ex, ey), (ex+ew, ey+eh), (0, 255, 0), 2)
-                    
-                    # If we have at least two eyes and they're roughly at the same height,
-                    # consider the user to be facing the camera
-                    if len(eyes) >= 2:
-                        eye1_y = eyes[0][1] + eyes[0][3]/2
-                        eye2_y = eyes[1][1] + eyes[1][3]/2
-                        
-                        # If eyes are roughly at the same height (within 10% of face height)
-                        if abs(eye1_y - eye2_y) < 0.1 * h:
-                            self.is_facing_camera = True
+            face, is_facing = self.backend.detect(context)
+            self.face_seen = face is not None
+            self.facing_seen = bool(is_facing)
+            self.face_box = face
             
             return frame
         except Exception as e:
             logging.error(f"Error in face/eye detection: {e}")
             return frame
     
-    def process_frame(self, frame):
+    def process_frame(self, frame, now=None):
         """
         Process a frame and check gaze status
         
         Args:
             frame: OpenCV image frame
+            now (float): Timestamp of the frame in seconds; defaults to time.time().
+                Replays pass a simulated clock here
             
         Returns:
-            dict: Status information
+            dict: Status information. When a violation is triggered,
+                `violation_duration` is the duration that triggered it
         """
+        # Preprocess the frame once for every check below
+        context = self.pipeline.prepare(frame)
+        self.last_context = context
+        
         # Check if camera image is clear
-        self.is_camera_clear = self.check_image_quality(frame)
+        clear_seen = self.check_image_quality(frame, context)
+        
+        # Detect face and gaze, unless nothing moved since the last evaluation
+        # (the detection flags then keep their previous values)
+        current_time = time.time() if now is None else now
+        detection_skipped = not self.motion_gate.should_evaluate(context.small, now)
+        processed_frame = frame
+        if not detection_skipped:
+            started = time.thread_time()
+            processed_frame = self.detect_face_and_gaze(frame, context)
+            self.motion_gate.mark_evaluated(time.thread_time() - started, now)
         
-        # Detect face and gaze
-        processed_frame = self.detect_face_and_gaze(frame)
+        # Decide the states from the recent frames rather than this one alone
+        self.window.push(current_time, self.face_seen, self.facing_seen, clear_seen,
+                         context.clarity, context.brightness, self.face_box)
+        fractions = self.window.fractions(DECISION_WINDOW, current_time)
+        self.is_camera_clear = self.clear_state.update(fractions.get('clear'))
+        self.is_face_detected = self.face_state.update(fractions.get('face'))
+        self.is_facing_camera = self.facing_state.update(fractions.get('facing'))
         
         # Update status and check timeout
-        current_time = time.time()
         status = ""
         is_timeout = False
         violation_triggered = False
@@ -185,8 +181,7 @@ class GazeDetection:
             self.last_facing_camera_time = current_time
             self.warning_shown = False
             # Reset violation tracking when everything is fine
-            self.violation_start_time = None
-            self.violation_duration = 0
+            self.reset_violation()
             return {
                 "frame": processed_frame,
                 "status": status,
@@ -196,7 +191,9 @@ class GazeDetection:
                 "is_facing_camera": self.is_facing_camera,
                 "violation_triggered": False,
                 "violation_type": None,
-                "violation_duration": 0
+                "violation_duration": 0,
+                "violation_confidence": None,
+                "detection_skipped": detection_skipped
             }
         
         # Track violation duration
@@ -204,13 +201,18 @@ class GazeDetection:
             self.violation_start_time = current_time
         
         self.violation_duration = current_time - self.violation_start_time
+        self.violation_frames += 1
+        self.violation_type_frames[violation_type] = self.violation_type_frames.get(violation_type, 0) + 1
+        violation_duration = self.violation_duration
+        violation_confidence = None
         
         # Check if violation duration exceeds threshold
         if self.violation_duration >= self.violation_threshold:
             violation_triggered = True
+            # Share of the violation's frames that showed the reported kind of violation
+            violation_confidence = self.violation_type_frames[violation_type] / self.violation_frames
             # Reset for next violation
-            self.violation_start_time = None
-            self.violation_duration = 0
+            self.reset_violation()
         
         return {
             "frame": processed_frame,
@@ -221,15 +223,50 @@ class GazeDetection:
             "is_facing_camera": self.is_facing_camera,
             "violation_triggered": violation_triggered,
             "violation_type": violation_type,
-            "violation_duration": self.violation_duration
+            "violation_duration": violation_duration,
+            "violation_confidence": violation_confidence,
+            "detection_skipped": detection_skipped
         }
 
-    def reset(self):
-        """Reset the gaze detection state"""
-        self.last_facing_camera_time = time.time()
+    @property
+    def detection_scale(self):
+        """Resolution of the detection image as a fraction of the camera frame"""
+        return self.pipeline.detection_scale
+    
+    def set_detection_scale(self, scale):
+        """
+        Change the resolution face/eye detection runs at
+        
+        Args:
+            scale (float): Fraction of the camera frame size (1.0 = full resolution)
+        """
+        if scale == self.pipeline.detection_scale:
+            return
+        self.pipeline.detection_scale = scale
+    
+    def reset(self, now=None):
+        """
+        Reset the gaze detection state
+        
+        Args:
+            now (float): Current timestamp; defaults to time.time()
+        """
+        self.last_facing_camera_time = time.time() if now is None else now
+        self.backend.reset()
+        self.motion_gate.reset()
+        self.window.clear()
+        self.clear_state.reset()
+        self.face_state.reset()
+        self.facing_state.reset()
         self.warning_shown = False
+        self.reset_violation()
+    
+    def reset_violation(self):
+        """Forget the violation being tracked"""
         self.violation_start_time = None
         self.violation_duration = 0
+        self.violation_frames = 0
+        self.violation_type_frames = {}
 
 # Example usage with OpenCV window
 def main():
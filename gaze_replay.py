@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import cv2
+import numpy as np
+from gaze_backends import read_clip_frames
+from gaze_detection import GazeDetection
+
+# Frame rate assumed for image directories and videos that don't report one
+DEFAULT_REPLAY_FPS = 10.0
+
+# Allowed slowdown of p95 frame time against a baseline before it counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+def clip_fps(path):
+    """Frame rate of a video file, or None for image directories and unknown rates"""
+    if os.path.isdir(path):
+        return None
+    cap = cv2.VideoCapture(path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+    finally:
+        cap.release()
+    return fps if fps and fps > 0 else None
+
+
+def replay(path, fps=None, backend=None, timeout_seconds=15, max_frames=None):
+    """
+    Feed a recorded clip through GazeDetection on a simulated clock
+
+    Frame i is stamped i / fps seconds after the start, so violation timers
+    behave exactly as they would live, however fast the frames are processed.
+
+    Args:
+        path (str): Video file or directory of frames
+        fps (float): Simulated frame rate; defaults to the video's own rate
+        backend (str): Detector backend name; defaults to GAZE_BACKEND
+        timeout_seconds (int): Gaze timeout passed to GazeDetection
+        max_frames (int): Optional limit of frames to replay
+
+    Returns:
+        dict: Timings, throughput, motion gate stats and the violation event sequence
+    """
+    fps = fps or clip_fps(path) or DEFAULT_REPLAY_FPS
+    detector = GazeDetection(timeout_seconds=timeout_seconds, backend=backend)
+    detector.reset(now=0.0)
+
+    timings = []
+    events = []
+    for index, frame in enumerate(read_clip_frames(path, max_frames)):
+        now = index / fps
+        started = time.perf_counter()
+        result = detector.process_frame(frame, now=now)
+        timings.append(time.perf_counter() - started)
+
+        if result["violation_triggered"]:
+            events.append({"frame": index, "time": round(now, 3), "event": result["violation_type"]})
+        if result["is_timeout"]:
+            events.append({"frame": index, "time": round(now, 3), "event": "timeout"})
+
+    if not timings:
+        raise ValueError(f"No frames could be read from {path}")
+
+    values = np.array(timings) * 1000
+    return {
+        "clip": os.path.basename(os.path.normpath(path)),
+        "backend": detector.backend.name,
+        "frames": len(values),
+        "simulated_fps": fps,
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "mean_ms": float(values.mean()),
+        "throughput_fps": float(len(values) / (values.sum() / 1000)) if values.sum() else 0.0,
+        "motion_gate": detector.motion_gate.stats(),
+        "events": events,
+    }
+
+
+def compare_with_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare a replay report with a stored baseline
+
+    Args:
+        report (dict): Result of replay()
+        baseline (dict): Earlier result of replay() for the same clip
+        tolerance (float): Allowed relative p95 slowdown
+
+    Returns:
+        list: Descriptions of the regressions found (empty if none)
+    """
+    regressions = []
+    if report["frames"] != baseline.get("frames"):
+        regressions.append(f"frame count changed: {baseline.get('frames')} -> {report['frames']}")
+
+    expected = [(e["frame"], e["event"]) for e in baseline.get("events", [])]
+    actual = [(e["frame"], e["event"]) for e in report["events"]]
+    if actual != expected:
+        regressions.append(f"violation events changed: {expected} -> {actual}")
+
+    limit = baseline.get("p95_ms", 0) * (1 + tolerance)
+    if baseline.get("p95_ms") and report["p95_ms"] > limit:
+        regressions.append(f"p95 frame time {report['p95_ms']:.2f} ms exceeds baseline "
+                           f"{baseline['p95_ms']:.2f} ms by more than {tolerance:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded clips through GazeDetection without a camera")
+    parser.add_argument("clips", nargs="+", help="Video files or directories of frames")
+    parser.add_argument("--fps", type=float, default=None, help="Simulated frame rate")
+    parser.add_argument("--backend", default=None, help="Detector backend (haar, dnn, mediapipe)")
+    parser.add_argument("--max-frames", type=int, default=None, help="Frames to replay per clip")
+    parser.add_argument("--baseline", help="JSON file of earlier reports to compare against")
+    parser.add_argument("--save-baseline", help="Write this run's reports to a JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative p95 slowdown")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    baselines = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    reports = {}
+    failed = False
+    for clip in args.clips:
+        report = replay(clip, args.fps, args.backend, max_frames=args.max_frames)
+        reports[report["clip"]] = report
+
+        print(f"{report['clip']} [{report['backend']}]: {report['frames']} frames, "
+              f"p50 {report['p50_ms']:.2f} ms, p95 {report['p95_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, "
+              f"{report['throughput_fps']:.0f} frames/s, "
+              f"{report['motion_gate']['skip_rate']:.0%} detections skipped")
+        for event in report["events"]:
+            print(f"  {event['time']:>8.2f}s  frame {event['frame']:>6}  {event['event']}")
+
+        if report["clip"] in baselines:
+            regressions = compare_with_baseline(report, baselines[report["clip"]], args.tolerance)
+            for regression in regressions:
+                print(f"  REGRESSION: {regression}")
+            failed = failed or bool(regressions)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(reports, f, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
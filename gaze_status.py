@@ -0,0 +1,160 @@
+import time
+
+# Most status changes per second sent to the UI (events are never held back)
+STATUS_MAX_RATE = 5.0
+
+# Seconds without any message after which the worker sends a heartbeat
+STATUS_KEEPALIVE = 2.0
+
+
+class GazeStatus:
+    """
+    Compact gaze status sent from the proctoring engine to the UI.
+
+    Holds only what the UI displays or acts on; no pixel data. The
+    violation duration is kept in whole seconds, because that is how it
+    is shown, so that it only changes once per second.
+    """
+
+    __slots__ = ('status', 'is_error', 'is_timeout', 'is_camera_clear', 'is_face_detected',
+                 'is_facing_camera', 'violation_triggered', 'violation_type', 'violation_seconds',
+                 'violation_confidence', 'evidence', 'capture_latency_ms')
+
+    def __init__(self, status, is_error=False, is_timeout=False, is_camera_clear=False,
+                 is_face_detected=False, is_facing_camera=False, violation_triggered=False,
+                 violation_type=None, violation_seconds=None, violation_confidence=None,
+                 evidence=None, capture_latency_ms=None):
+        """
+        Args:
+            status (str): Human readable status
+            is_error (bool): True if the status reports an engine or camera error
+            is_timeout (bool): True if the student looked away for longer than the gaze timeout
+            is_camera_clear (bool): Camera image quality check result
+            is_face_detected (bool): Face detection result
+            is_facing_camera (bool): Gaze check result
+            violation_triggered (bool): True if a violation was just triggered
+            violation_type (str): Kind of the current violation, if any
+            violation_seconds (int): Whole seconds of the current violation (None if unknown)
+            violation_confidence (float): Confidence of a triggered violation (0-1)
+            evidence (str): Storage path of the evidence captured for a violation or timeout
+            capture_latency_ms (float): Capture-to-decision latency; not compared
+        """
+        self.status = status
+        self.is_error = is_error
+        self.is_timeout = is_timeout
+        self.is_camera_clear = is_camera_clear
+        self.is_face_detected = is_face_detected
+        self.is_facing_camera = is_facing_camera
+        self.violation_triggered = violation_triggered
+        self.violation_type = violation_type
+        self.violation_seconds = violation_seconds
+        self.violation_confidence = violation_confidence
+        self.evidence = evidence
+        self.capture_latency_ms = capture_latency_ms
+
+    @classmethod
+    def from_result(cls, result, capture_latency_ms=None):
+        """Build a status from a GazeDetection.process_frame result"""
+        return cls(
+            result["status"],
+            is_timeout=result["is_timeout"],
+            is_camera_clear=result["is_camera_clear"],
+            is_face_detected=result["is_face_detected"],
+            is_facing_camera=result["is_facing_camera"],
+            violation_triggered=result["violation_triggered"],
+            violation_type=result["violation_type"],
+            violation_seconds=int(result["violation_duration"]),
+            violation_confidence=result.get("violation_confidence"),
+            capture_latency_ms=capture_latency_ms
+        )
+
+    @classmethod
+    def error(cls, message):
+        """Build an error status"""
+        return cls(message, is_error=True)
+
+    @property
+    def is_event(self):
+        """True if the status carries a one-off event that must never be dropped"""
+        return self.violation_triggered or self.is_timeout or self.is_error
+
+    def same_state(self, other):
+        """True if `other` would display the same as this status"""
+        return other is not None and all(
+            getattr(self, name) == getattr(other, name)
+            for name in self.__slots__ if name != 'capture_latency_ms'
+        )
+
+    def __repr__(self):
+        return f"GazeStatus({self.status!r}, violation_seconds={self.violation_seconds})"
+
+
+class StatusThrottle:
+    """
+    Decides which statuses are worth sending to the UI.
+
+    A status goes out when it differs from the last one sent, but no
+    more often than `max_rate` per second; events (violations, timeouts,
+    errors) always go out. Since statuses are compared with the last one
+    sent, a change held back by the rate cap is sent on the next frame
+    after the cap allows it.
+    """
+
+    def __init__(self, max_rate=STATUS_MAX_RATE, keepalive=STATUS_KEEPALIVE):
+        """
+        Args:
+            max_rate (float): Most state changes sent per second
+            keepalive (float): Seconds of silence after which `needs_keepalive()` is True
+        """
+        self.min_interval = 1.0 / max_rate
+        self.keepalive = keepalive
+        self.last_sent = None
+        self.last_sent_at = 0.0
+        self.last_message_at = 0.0
+        self.statuses_seen = 0
+        self.statuses_sent = 0
+
+    def should_send(self, status, now=None):
+        """
+        Check whether a status should be sent, and record it as sent if so
+
+        Args:
+            status (GazeStatus): Newest status
+            now (float): Current time, defaults to time.monotonic()
+
+        Returns:
+            bool: True if the status should be sent
+        """
+        now = time.monotonic() if now is None else now
+        self.statuses_seen += 1
+
+        if not status.is_event:
+            if status.same_state(self.last_sent):
+                return False
+            if self.last_sent is not None and now - self.last_sent_at < self.min_interval:
+                return False
+
+        self.last_sent = status
+        self.last_sent_at = now
+        self.last_message_at = now
+        self.statuses_sent += 1
+        return True
+
+    def needs_keepalive(self, now=None):
+        """True if nothing was sent for `keepalive` seconds"""
+        now = time.monotonic() if now is None else now
+        return now - self.last_message_at >= self.keepalive
+
+    def mark_keepalive(self, now=None):
+        """Record that a heartbeat was sent instead of a status"""
+        self.last_message_at = time.monotonic() if now is None else now
+
+    def stats(self):
+        """
+        Returns:
+            dict: Statuses seen and sent
+        """
+        return {
+            "statuses_seen": self.statuses_seen,
+            "statuses_sent": self.statuses_sent,
+        }
@@ -0,0 +1,171 @@
+import numpy as np
+
+# Seconds of recent frames the smoothed gaze states are decided from
+DECISION_WINDOW = 1.0
+
+# Fewest frames a decision is based on, however slowly frames arrive
+MIN_DECISION_FRAMES = 3
+
+
+class FeatureWindow:
+    """
+    Fixed-size ring of per-frame gaze features.
+
+    Each processed frame adds one row: its timestamp, whether a face was
+    present, whether the user was facing the camera, whether the image was
+    clear, the raw clarity and brightness, and the face box. All arrays
+    are allocated once; aggregates are vectorized over the fixed-size
+    ring, so every call costs the same however long the exam runs.
+    """
+
+    FLAGS = ('face', 'facing', 'clear')
+    VALUES = ('clarity', 'brightness')
+
+    def __init__(self, capacity=64):
+        """
+        Args:
+            capacity (int): Frames kept; should cover the longest window asked for
+        """
+        self.capacity = capacity
+        self.timestamps = np.full(capacity, -np.inf)
+        self.flags = {name: np.zeros(capacity, dtype=bool) for name in self.FLAGS}
+        self.values = {name: np.zeros(capacity, dtype=np.float32) for name in self.VALUES}
+        self.boxes = np.zeros((capacity, 4), dtype=np.int32)
+        self.count = 0
+        self._next = 0
+
+    def push(self, now, face, facing, clear, clarity, brightness, box=None):
+        """
+        Add the features of one frame
+
+        Args:
+            now (float): Timestamp of the frame
+            face (bool): A face was detected
+            facing (bool): The user was facing the camera
+            clear (bool): The image passed the quality check
+            clarity (float): Laplacian variance of the frame
+            brightness (float): Mean brightness of the frame
+            box (tuple): (x, y, w, h) of the face, if any
+        """
+        slot = self._next
+        self.timestamps[slot] = now
+        self.flags['face'][slot] = face
+        self.flags['facing'][slot] = facing
+        self.flags['clear'][slot] = clear
+        self.values['clarity'][slot] = clarity
+        self.values['brightness'][slot] = brightness
+        self.boxes[slot] = box if box is not None else (0, 0, 0, 0)
+        self._next = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def recent(self, seconds, now, min_frames=MIN_DECISION_FRAMES):
+        """
+        Mask of the frames in the last `seconds`, widened to at least `min_frames` frames
+
+        Returns:
+            numpy.ndarray: Boolean mask over the ring slots
+        """
+        mask = self.timestamps >= now - seconds
+        if np.count_nonzero(mask) < min(min_frames, self.count):
+            # Too few frames in the time window: use the newest `min_frames` instead
+            newest = (self._next - 1 - np.arange(min(min_frames, self.count))) % self.capacity
+            mask = np.zeros(self.capacity, dtype=bool)
+            mask[newest] = True
+        return mask
+
+    def fraction(self, flag, seconds, now, min_frames=MIN_DECISION_FRAMES):
+        """
+        Share of recent frames where a flag was set
+
+        Args:
+            flag (str): 'face', 'facing' or 'clear'
+            seconds (float): Length of the window
+            now (float): Current time
+            min_frames (int): Fewest frames to base the result on
+
+        Returns:
+            float: Fraction between 0 and 1, or None if there are no frames
+        """
+        mask = self.recent(seconds, now, min_frames)
+        frames = np.count_nonzero(mask)
+        if frames == 0:
+            return None
+        return float(np.count_nonzero(self.flags[flag] & mask)) / frames
+
+    def fractions(self, seconds, now, min_frames=MIN_DECISION_FRAMES):
+        """
+        Share of recent frames where each flag was set, sharing one window mask
+
+        Returns:
+            dict: Flag name to fraction, empty if there are no frames
+        """
+        mask = self.recent(seconds, now, min_frames)
+        frames = np.count_nonzero(mask)
+        if frames == 0:
+            return {}
+        return {name: float(np.count_nonzero(flags & mask)) / frames for name, flags in self.flags.items()}
+
+    def mean(self, value, seconds, now, min_frames=MIN_DECISION_FRAMES):
+        """Mean of 'clarity' or 'brightness' over recent frames, or None if there are none"""
+        mask = self.recent(seconds, now, min_frames)
+        if not mask.any():
+            return None
+        return float(self.values[value][mask].mean())
+
+    def face_boxes(self, seconds, now):
+        """
+        Face boxes of recent frames that had a face, oldest first
+
+        Returns:
+            numpy.ndarray: (n, 4) array of (x, y, w, h)
+        """
+        mask = self.recent(seconds, now, 0) & self.flags['face']
+        order = np.argsort(self.timestamps[mask], kind='stable')
+        return self.boxes[mask][order]
+
+    def clear(self):
+        """Forget all frames"""
+        self.timestamps[:] = -np.inf
+        self.count = 0
+        self._next = 0
+
+
+class Hysteresis:
+    """
+    Boolean state that only flips when a fraction clearly crosses over.
+
+    The state turns off when the fraction drops below `low` and back on
+    when it rises above `high`; in between it keeps its value, so a single
+    flickering frame can't flip it.
+    """
+
+    def __init__(self, initial=True, low=0.3, high=0.7):
+        """
+        Args:
+            initial (bool): Starting state
+            low (float): Fraction below which the state turns off
+            high (float): Fraction above which the state turns on
+        """
+        self.initial = initial
+        self.low = low
+        self.high = high
+        self.state = initial
+
+    def update(self, fraction):
+        """
+        Args:
+            fraction (float): Share of recent frames in favour of the state (None keeps it)
+
+        Returns:
+            bool: New state
+        """
+        if fraction is None:
+            return self.state
+        if self.state and fraction < self.low:
+            self.state = False
+        elif not self.state and fraction > self.high:
+            self.state = True
+        return self.state
+
+    def reset(self):
+        self.state = self.initial
@@ -0,0 +1,175 @@
+import time
+import logging
+from PyQt6 import QtCore, QtGui
+from proctoring_events import ProctoringEvent, FULLSCREEN_EXIT, FOCUS_LOST, SCREEN_CHANGED
+
+
+class IntegrityMonitor(QtCore.QObject):
+    """
+    Watches the exam window for fullscreen exits, focus loss and screen changes.
+
+    Everything is driven by Qt events and signals, with no polling: the
+    window's WindowStateChange events, the application's state changes
+    (alt-tab or clicking another application makes it inactive) and the
+    screens being added, removed or the window moving between them. Each
+    finding is emitted as a ProctoringEvent through `event_detected`.
+
+    Focus loss is reported twice. If focus stays away for `focus_loss_grace`
+    seconds, a single-shot timer emits a FOCUS_LOST event marked "ongoing"
+    right away, while the student is still elsewhere. Once focus comes back,
+    the complete FOCUS_LOST event with its full duration is emitted; one
+    still in progress when the monitor stops is returned by `stop()`.
+    """
+
+    # ProctoringEvent for each integrity finding
+    event_detected = QtCore.pyqtSignal(object)
+    # Whether the window is in fullscreen, on every change
+    fullscreen_changed = QtCore.pyqtSignal(bool)
+
+    def __init__(self, window, focus_loss_grace=3.0, parent=None):
+        """
+        Args:
+            window (QWidget): Top-level exam window to watch
+            focus_loss_grace (float): Seconds focus may be away before an ongoing focus loss is reported
+            parent (QObject): Owner of the monitor
+        """
+        super().__init__(parent)
+        self.window = window
+        self.active = False
+        self.fullscreen_expected = False
+        self._focus_lost_at = None
+        self._window_handle = None
+
+        # Fires once per focus loss that outlasts the grace period
+        self._focus_loss_timer = QtCore.QTimer(self)
+        self._focus_loss_timer.setSingleShot(True)
+        self._focus_loss_timer.setInterval(int(focus_loss_grace * 1000))
+        self._focus_loss_timer.timeout.connect(self._on_focus_loss_grace)
+
+    def start(self):
+        """Start watching (idempotent)"""
+        if self.active:
+            return
+        self.active = True
+        self._focus_lost_at = None
+
+        app = QtGui.QGuiApplication.instance()
+        self.window.installEventFilter(self)
+        app.applicationStateChanged.connect(self._on_application_state)
+        app.screenAdded.connect(self._on_screen_added)
+        app.screenRemoved.connect(self._on_screen_removed)
+
+        self._window_handle = self.window.windowHandle()
+        if self._window_handle is not None:
+            self._window_handle.screenChanged.connect(self._on_window_screen_changed)
+
+        # Focus may already be elsewhere when the exam opens
+        if app.applicationState() != QtCore.Qt.ApplicationState.ApplicationActive:
+            self._start_focus_loss()
+
+    def stop(self):
+        """
+        Stop watching
+
+        A focus loss still in progress is returned instead of emitted: the
+        exam page's connection is queued, so an emitted event would only
+        arrive after the page has closed its event queue.
+
+        Returns:
+            ProctoringEvent: The focus loss in progress, ending now, or None
+        """
+        if not self.active:
+            return None
+        self.active = False
+        self.fullscreen_expected = False
+
+        app = QtGui.QGuiApplication.instance()
+        self.window.removeEventFilter(self)
+        app.applicationStateChanged.disconnect(self._on_application_state)
+        app.screenAdded.disconnect(self._on_screen_added)
+        app.screenRemoved.disconnect(self._on_screen_removed)
+        if self._window_handle is not None:
+            self._window_handle.screenChanged.disconnect(self._on_window_screen_changed)
+            self._window_handle = None
+
+        return self._end_focus_loss()
+
+    def expect_fullscreen(self, expected):
+        """
+        Tell the monitor whether the window is supposed to be fullscreen
+
+        Leaving fullscreen only counts while it is expected, so the exam
+        page's own exit (on submit) is not reported.
+
+        Args:
+            expected (bool): True once the exam page has asked for fullscreen
+        """
+        self.fullscreen_expected = expected
+
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QtCore.QEvent.Type.WindowStateChange:
+            self._on_window_state(event.oldState(), self.window.windowState())
+        return False
+
+    def _on_window_state(self, old_state, new_state):
+        fullscreen = bool(new_state & QtCore.Qt.WindowState.WindowFullScreen)
+        was_fullscreen = bool(old_state & QtCore.Qt.WindowState.WindowFullScreen)
+        if fullscreen == was_fullscreen:
+            return
+
+        self.fullscreen_changed.emit(fullscreen)
+        if was_fullscreen and self.fullscreen_expected:
+            state = "minimized" if new_state & QtCore.Qt.WindowState.WindowMinimized else "windowed"
+            logging.warning(f"Exam window left fullscreen ({state})")
+            self.event_detected.emit(ProctoringEvent(FULLSCREEN_EXIT, time.time(), details={"state": state}))
+
+    def _on_application_state(self, state):
+        if state == QtCore.Qt.ApplicationState.ApplicationActive:
+            event = self._end_focus_loss()
+            if event is not None:
+                self.event_detected.emit(event)
+        elif self._focus_lost_at is None:
+            self._start_focus_loss()
+
+    def _start_focus_loss(self):
+        self._focus_lost_at = time.time()
+        self._focus_loss_timer.start()
+
+    def _on_focus_loss_grace(self):
+        if not self.active or self._focus_lost_at is None:
+            return
+        logging.warning("Exam window has lost focus beyond the grace period")
+        self.event_detected.emit(ProctoringEvent(FOCUS_LOST, self._focus_lost_at, time.time(),
+                                                 details={"ongoing": True}))
+
+    def _end_focus_loss(self):
+        """
+        End the focus loss in progress, if any
+
+        Returns:
+            ProctoringEvent: The focus loss, ending now, or None
+        """
+        self._focus_loss_timer.stop()
+        if self._focus_lost_at is None:
+            return None
+        event = ProctoringEvent(FOCUS_LOST, self._focus_lost_at, time.time())
+        self._focus_lost_at = None
+        logging.warning(f"Exam window lost focus for {event.duration:.1f}s")
+        return event
+
+    def _on_screen_added(self, screen):
+        self._emit_screen_change("screen_added", screen)
+
+    def _on_screen_removed(self, screen):
+        self._emit_screen_change("screen_removed", screen)
+
+    def _on_window_screen_changed(self, screen):
+        self._emit_screen_change("window_moved", screen)
+
+    def _emit_screen_change(self, change, screen):
+        app = QtGui.QGuiApplication.instance()
+        self.event_detected.emit(ProctoringEvent(SCREEN_CHANGED, time.time(), details={
+            "change": change,
+            "screen": screen.name() if screen is not None else None,
+            "screens": len(app.screens())
+        }))
@@ -2,6 +2,7 @@ from PyQt6 import QtCore, QtWidgets, QtGui
 import hashlib
 from db_connection import create_connection
 from styles import COMMON_STYLES
+import proctoring_warmup
 
 class LoginPage(QtWidgets.QWidget):
     def __init__(self, main_window):
@@ -143,6 +144,10 @@ class LoginPage(QtWidgets.QWidget):
                 self.main_window.current_user = username
                 self.main_window.current_user_type = user_type
                 
+                # Students will likely take a proctored exam: load the detector models meanwhile
+                if user_type == 'Student':
+                    proctoring_warmup.warm_up()
+                
                 msg = QtWidgets.QMessageBox()
                 msg.setStyleSheet(COMMON_STYLES['message_box'])
                 msg.setWindowTitle("Success")
@@ -1,3 +1,4 @@
+import multiprocessing
 from PyQt6 import QtWidgets, QtCore, QtGui
 from signup_page import SignupPage
 from login_page import LoginPage
@@ -6,6 +7,7 @@ from teacher_dashboard import TeacherDashboard
 from admin_dashboard import AdminDashboard
 from styles import COMMON_STYLES
 from exam_creation import ExamCreation
+from supabase_connection import close_connection
 
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -55,7 +57,11 @@ class MainWindow(QtWidgets.QMainWindow):
         self.stackedWidget.setCurrentWidget(self.login_page)
 
 if __name__ == "__main__":
+    # The proctoring engine runs in a spawned process
+    multiprocessing.freeze_support()
     app = QtWidgets.QApplication([])
+    # Release the shared Supabase connection pool on shutdown
+    app.aboutToQuit.connect(close_connection)
     window = MainWindow()
     window.show()
     app.exec()
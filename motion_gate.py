@@ -0,0 +1,114 @@
+import time
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap scene-change detector in front of face/eye detection.
+
+    Each frame's grayscale pyramid level is shrunk to a tiny thumbnail and
+    compared with the thumbnail of the last frame that was fully evaluated.
+    If the mean absolute difference stays under `threshold`, the previous
+    verdict is reused. A full evaluation is forced on motion, after
+    `max_stale_frames` reused frames, or after `max_stale_seconds`.
+    Because the comparison is against the last evaluated frame, slow drift
+    adds up and eventually forces a re-evaluation too.
+    """
+
+    def __init__(self, threshold=4.0, max_stale_frames=10, max_stale_seconds=1.0, size=(80, 60)):
+        """
+        Args:
+            threshold (float): Mean absolute pixel difference (0-255) that counts as motion
+            max_stale_frames (int): Most consecutive frames that may reuse a verdict
+            max_stale_seconds (float): Oldest verdict that may be reused
+            size (tuple): Thumbnail (width, height) used for the comparison
+        """
+        self.threshold = threshold
+        self.max_stale_frames = max_stale_frames
+        self.max_stale_seconds = max_stale_seconds
+        self.size = size
+
+        width, height = size
+        self._current = np.empty((height, width), dtype=np.uint8)
+        self._reference = np.empty((height, width), dtype=np.uint8)
+        self._diff = np.empty((height, width), dtype=np.uint8)
+        self._has_reference = False
+
+        self.stale_frames = 0
+        self.evaluated_at = 0.0
+        self.last_score = 0.0
+
+        # Statistics
+        self.frames_seen = 0
+        self.frames_skipped = 0
+        self.detection_cpu_seconds = 0.0
+        self.gate_cpu_seconds = 0.0
+
+    def should_evaluate(self, small, now=None):
+        """
+        Decide whether a frame needs a full evaluation
+
+        Args:
+            small: Downscaled grayscale image of the frame
+            now (float): Current time, defaults to time.monotonic()
+
+        Returns:
+            bool: True if detection must run, False if the previous verdict can be reused
+        """
+        started = time.thread_time()
+        now = time.monotonic() if now is None else now
+        self.frames_seen += 1
+
+        cv2.resize(small, self.size, dst=self._current, interpolation=cv2.INTER_AREA)
+
+        if not self._has_reference:
+            evaluate = True
+        elif self.stale_frames >= self.max_stale_frames or now - self.evaluated_at >= self.max_stale_seconds:
+            evaluate = True
+        else:
+            cv2.absdiff(self._current, self._reference, dst=self._diff)
+            self.last_score = cv2.mean(self._diff)[0]
+            evaluate = self.last_score > self.threshold
+
+        if not evaluate:
+            self.stale_frames += 1
+            self.frames_skipped += 1
+
+        self.gate_cpu_seconds += time.thread_time() - started
+        return evaluate
+
+    def mark_evaluated(self, cpu_seconds, now=None):
+        """
+        Record that the current frame was fully evaluated
+
+        Args:
+            cpu_seconds (float): CPU time the evaluation took
+            now (float): Current time, defaults to time.monotonic()
+        """
+        self._current, self._reference = self._reference, self._current
+        self._has_reference = True
+        self.stale_frames = 0
+        self.evaluated_at = time.monotonic() if now is None else now
+        self.detection_cpu_seconds += cpu_seconds
+
+    def reset(self):
+        """Force a full evaluation of the next frame"""
+        self._has_reference = False
+        self.stale_frames = 0
+
+    def stats(self):
+        """
+        Summarize how much detection work the gate avoided
+
+        Returns:
+            dict: Frames seen and skipped, skip rate, and estimated CPU seconds saved
+        """
+        evaluated = self.frames_seen - self.frames_skipped
+        average_detection = self.detection_cpu_seconds / evaluated if evaluated else 0.0
+        return {
+            "frames_seen": self.frames_seen,
+            "frames_skipped": self.frames_skipped,
+            "skip_rate": self.frames_skipped / self.frames_seen if self.frames_seen else 0.0,
+            "cpu_saved_seconds": max(0.0, self.frames_skipped * average_detection - self.gate_cpu_seconds),
+        }
@@ -1,5 +1,8 @@
+import logging
 from PyQt6 import QtWidgets, QtCore, QtGui
 from supabase_connection import create_connection
+from result_aggregates import fetch_exam_stats, format_stats_lines
+from proctoring_events import EXAM_TERMINATED
 from PyQt6.QtCore import QDateTime
 
 class ExamManagement(QtWidgets.QWidget):
@@ -215,15 +218,10 @@ class ExamManagement(QtWidgets.QWidget):
         self.exams_layout.addWidget(card)
     
     def view_exam_results(self, exam_id):
-        # Placeholder for viewing exam results
         try:
+            # The summary comes from the precomputed per-exam aggregates
             supabase = create_connection()
-            results_response = supabase.table('exam_results') \
-                .select('student_username, score, max_score, submission_time, violation_termination') \
-                .eq('exam_id', exam_id) \
-                .execute()
-                
-            results = results_response.data
+            stats = fetch_exam_stats(supabase, [exam_id]).get(exam_id)
             
             # Create a dialog to display results
             dialog = QtWidgets.QDialog(self)
@@ -233,40 +231,28 @@ class ExamManagement(QtWidgets.QWidget):
             
             dialog_layout = QtWidgets.QVBoxLayout(dialog)
             
-            # Results table
-            table = QtWidgets.QTableWidget()
-            table.setColumnCount(5)
-            table.setHorizontalHeaderLabels(["Student", "Score", "Submission Time", "Violations", "Status"])
-            table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
+            # Summary statistics
+            for line in format_stats_lines(stats):
+                line_label = QtWidgets.QLabel(line)
+                line_label.setStyleSheet("color: #333; font-size: 14px;")
+                dialog_layout.addWidget(line_label)
             
-            if not results:
-                dialog_layout.addWidget(QtWidgets.QLabel("No results available for this exam."))
-            else:
-                table.setRowCount(len(results))
+            # Individual results are only downloaded on request
+            if stats and stats.result_count:
+                table = QtWidgets.QTableWidget()
+                table.setColumnCount(5)
+                table.setHorizontalHeaderLabels(["Student", "Score", "Submission Time", "Violations", "Status"])
+                table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
+                table.hide()
                 
-                for i, result in enumerate(results):
-                    # Student username
-                    table.setItem(i, 0, QtWidgets.QTableWidgetItem(result['student_username']))
-                    
-                    # Score
-                    score_text = f"{result['score']}/{result['max_score']}"
-                    table.setItem(i, 1, QtWidgets.QTableWidgetItem(score_text))
-                    
-                    # Submission time
-                    table.setItem(i, 2, QtWidgets.QTableWidgetItem(result['submission_time']))
-                    
-                    # Violations
-                    violation_status = "Terminated" if result.get('violation_termination', False) else "None"
-                    table.setItem(i, 3, QtWidgets.QTableWidgetItem(violation_status))
-                    
-                    # Status
-                    status = "Failed" if result['score'] < result['max_score'] / 2 else "Passed"
-                    status_item = QtWidgets.QTableWidgetItem(status)
-                    status_item.setForeground(QtGui.QColor("#dc3545" if status == "Failed" else "#28a745"))
-                    table.setItem(i, 4, status_item)
+                show_results_btn = QtWidgets.QPushButton(f"Show Individual Results ({stats.result_count})")
+                show_results_btn.clicked.connect(lambda: self.load_individual_results(exam_id, stats, table, show_results_btn))
                 
+                dialog_layout.addWidget(show_results_btn)
                 dialog_layout.addWidget(table)
             
+            dialog_layout.addStretch()
+            
             # Close button
             close_btn = QtWidgets.QPushButton("Close")
             close_btn.clicked.connect(dialog.accept)
@@ -277,6 +263,71 @@ class ExamManagement(QtWidgets.QWidget):
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Error", f"Failed to load exam results: {str(e)}")
     
+    def load_individual_results(self, exam_id, stats, table, show_results_btn):
+        try:
+            supabase = create_connection()
+            # Submitted attempts only, matching the summary
+            results_response = supabase.table('exam_results') \
+                .select('student_username, score, completed_at') \
+                .eq('exam_id', exam_id) \
+                .not_.is_('completed_at', 'null') \
+                .order('completed_at') \
+                .execute()
+                
+            results = results_response.data or []
+            total = stats.total_questions
+            terminated = self.load_terminated_students(supabase, exam_id)
+            table.setRowCount(len(results))
+            
+            for i, result in enumerate(results):
+                # Student username
+                table.setItem(i, 0, QtWidgets.QTableWidgetItem(result['student_username']))
+                
+                # Score
+                score_text = f"{result['score']}/{total}"
+                table.setItem(i, 1, QtWidgets.QTableWidgetItem(score_text))
+                
+                # Submission time
+                submitted = QDateTime.fromString(result['completed_at'][:19], "yyyy-MM-ddTHH:mm:ss")
+                table.setItem(i, 2, QtWidgets.QTableWidgetItem(submitted.toString("yyyy-MM-dd HH:mm")))
+                
+                # Violations
+                if terminated is None:
+                    violation_status = "Unknown"
+                else:
+                    violation_status = "Terminated" if result['student_username'] in terminated else "None"
+                table.setItem(i, 3, QtWidgets.QTableWidgetItem(violation_status))
+                
+                # Status
+                status = "Failed" if result['score'] * 2 < total else "Passed"
+                status_item = QtWidgets.QTableWidgetItem(status)
+                status_item.setForeground(QtGui.QColor("#dc3545" if status == "Failed" else "#28a745"))
+                table.setItem(i, 4, status_item)
+            
+            show_results_btn.hide()
+            table.show()
+            
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to load exam results: {str(e)}")
+    
+    def load_terminated_students(self, supabase, exam_id):
+        """
+        Find the students whose attempt was ended for proctoring violations
+        
+        Returns:
+            set: Usernames, or None if the proctoring events can't be read
+        """
+        try:
+            response = supabase.table('proctoring_events') \
+                .select('student_username') \
+                .eq('exam_id', exam_id) \
+                .eq('event_type', EXAM_TERMINATED) \
+                .execute()
+            return {row['student_username'] for row in response.data or []}
+        except Exception as e:
+            logging.warning(f"Could not load proctoring events for exam {exam_id}: {e}")
+            return None
+    
     def edit_exam(self, exam_id):
         try:
             # Get exam details
@@ -1,5 +1,6 @@
 from PyQt6 import QtWidgets
 from supabase_connection import create_connection
+from result_aggregates import fetch_teacher_exam_stats, format_stats_lines
 
 class StudentResults(QtWidgets.QWidget):
     def __init__(self, main_window):
@@ -12,26 +13,16 @@ class StudentResults(QtWidgets.QWidget):
 
         try:
             supabase = create_connection()
-            exams_resp = supabase.table('exams') \
-                .select('id, name') \
-                .eq('teacher_username', self.main_window.current_user) \
-                .execute()
+            exam_stats = fetch_teacher_exam_stats(supabase, self.main_window.current_user)
 
-            exam_ids = [e['id'] for e in exams_resp.data]
-            exam_names = {e['id']: e['name'] for e in exams_resp.data}
-
-            results_resp = supabase.table('exam_results') \
-                .select('exam_id, student_username, score, total_marks') \
-                .in_('exam_id', exam_ids) \
-                .execute()
-
-            if not results_resp.data:
+            if not any(stats and stats.result_count for _, _, stats in exam_stats):
                 layout.addWidget(QtWidgets.QLabel("No student results available."))
                 return
 
-            for result in results_resp.data:
-                name = exam_names.get(result['exam_id'], 'Unknown')
-                label = QtWidgets.QLabel(f"{result['student_username']} - {name}: {result['score']} / {result['total_marks']}")
+            for exam_id, name, stats in exam_stats:
+                if not (stats and stats.result_count):
+                    continue
+                label = QtWidgets.QLabel(f"{name}: " + " | ".join(format_stats_lines(stats)))
                 layout.addWidget(label)
 
         except Exception as e:
@@ -0,0 +1,541 @@
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from gaze_status import GazeStatus, StatusThrottle
+
+# Size of the preview frames the worker publishes (the size of the preview label)
+PREVIEW_WIDTH = 120
+PREVIEW_HEIGHT = 90
+
+# Seconds between detections in the worker, before the CPU governor adapts it
+DETECTION_INTERVAL = 0.2
+
+# Frames from before a violation started that are included in its evidence
+EVIDENCE_PRE_ROLL = 3.0
+
+# Seconds a stopping worker spends finishing queued evidence uploads, and how
+# long a graceful stop waits for the worker before terminating it. The stop
+# has to outlast the drain, or the evidence of the violation that ended the
+# exam is lost while its event row already points at the file
+EVIDENCE_DRAIN_TIMEOUT = 10.0
+STOP_TIMEOUT = EVIDENCE_DRAIN_TIMEOUT + 2.0
+
+# Supervision: restart delays after successive crashes, and how long the
+# worker may stay silent before it is considered hung. A fresh worker sends
+# nothing until its imports and models are loaded, which can take well over
+# the heartbeat timeout on a slow machine, so it gets STARTUP_TIMEOUT for that
+RESTART_BACKOFF = (1, 2, 5, 10, 30)
+HEARTBEAT_TIMEOUT = 10.0
+STARTUP_TIMEOUT = 120.0
+
+
+class SharedPreview:
+    """
+    Double-buffered preview frames in a shared memory block.
+
+    The block holds a write counter followed by two BGR frame slots, used
+    as a seqlock. Frame `seq` goes into slot `seq % 2`: the worker sets the
+    counter to the odd value `2 * seq - 1` before touching the slot and to
+    `2 * seq` once the frame is complete. The newest complete frame is
+    therefore always `counter // 2`, and its slot is only touched again
+    when the counter passes `2 * seq + 2`. Readers take the sequence number
+    before copying and call `is_intact()` afterwards; a frame whose slot
+    was reused during the copy must be dropped.
+    """
+
+    HEADER_BYTES = 64
+
+    def __init__(self, buffer, width=PREVIEW_WIDTH, height=PREVIEW_HEIGHT):
+        """
+        Args:
+            buffer: Buffer of a SharedMemory block of at least size(width, height) bytes
+            width (int): Preview width
+            height (int): Preview height
+        """
+        self.width = width
+        self.height = height
+        self.header = np.ndarray((1,), dtype=np.int64, buffer=buffer, offset=0)
+        self.slots = np.ndarray((2, height, width, 3), dtype=np.uint8, buffer=buffer, offset=self.HEADER_BYTES)
+
+    @classmethod
+    def size(cls, width=PREVIEW_WIDTH, height=PREVIEW_HEIGHT):
+        """Bytes needed for the shared block"""
+        return cls.HEADER_BYTES + 2 * width * height * 3
+
+    @property
+    def seq(self):
+        """Sequence number of the newest complete frame (0 if none yet)"""
+        return int(self.header[0]) // 2
+
+    def is_intact(self, seq):
+        """True if the writer has not started reusing the slot of frame `seq`"""
+        return int(self.header[0]) <= 2 * seq + 2
+
+    def write(self, frame):
+        """
+        Publish a frame, downscaling it straight into the next slot
+
+        Returns:
+            int: Sequence number of the published frame
+        """
+        import cv2
+
+        seq = self.seq + 1
+        slot = self.slots[seq % 2]
+        # Odd counter: the slot is being written
+        self.header[0] = 2 * seq - 1
+        if frame.shape == slot.shape:
+            np.copyto(slot, frame)
+        else:
+            cv2.resize(frame, (self.width, self.height), dst=slot, interpolation=cv2.INTER_AREA)
+        self.header[0] = 2 * seq
+        return seq
+
+    def release(self):
+        """Drop the views so the shared memory block can be closed"""
+        self.header = None
+        self.slots = None
+
+
+def _attach_shared_memory(name):
+    """Attach to the block created by the UI process, which owns and unlinks it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 the attachment is registered with the resource
+        # tracker, which spawned workers share with the UI process; the UI
+        # process's unlink() clears that registration
+        return shared_memory.SharedMemory(name=name)
+
+
+def _put(status_queue, message):
+    """Send a message to the UI process, dropping it if the queue is full"""
+    try:
+        status_queue.put_nowait(message)
+    except queue.Full:
+        pass
+
+
+def engine_main(shm_name, status_queue, control_queue, stop_event, preview_event, detection_interval):
+    """
+    Worker process entry point: capture, detect and publish until stopped
+
+    The worker starts in standby. It loads the detector models right away,
+    opens the camera when it receives a "camera" command and starts
+    detecting on a "start" command (which opens the camera too if needed).
+    Each stage is reported with a "ready" message.
+
+    Args:
+        shm_name (str): Name of the shared preview block
+        status_queue (multiprocessing.Queue): Compact status messages for the UI process
+        control_queue (multiprocessing.Queue): (command, options) tuples from the UI process
+        stop_event (multiprocessing.Event): Set by the UI process to stop the worker
+        preview_event (multiprocessing.Event): Set while the UI shows the preview
+        detection_interval (float): Normal seconds between detections (adapted by the CPU governor)
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [proctoring-engine] %(levelname)s %(message)s")
+
+    from gaze_detection import GazeDetection
+    from camera_capture import CameraCapture
+    from evidence_buffer import EvidenceRecorder
+    from cpu_governor import CpuGovernor
+
+    shm = _attach_shared_memory(shm_name)
+    preview = SharedPreview(shm.buf)
+    capture = CameraCapture()
+    throttle = StatusThrottle()
+    governor = CpuGovernor(normal_interval=detection_interval)
+    detector = None
+    recorder = None
+    try:
+        # Parse the detector models before anyone waits for them
+        try:
+            detector = GazeDetection()
+        except Exception as e:
+            # Not worth restarting for; the worker exits cleanly
+            _put(status_queue, {"type": "unavailable", "reason": str(e)})
+            return
+        _put(status_queue, {"type": "ready", "stage": "models", "backend": detector.backend.name})
+
+        # Standby until detection is requested, opening the camera when asked to
+        settings = None
+        while settings is None and not stop_event.is_set():
+            try:
+                command, options = control_queue.get(timeout=1.0)
+            except queue.Empty:
+                _put(status_queue, {"type": "heartbeat"})
+                continue
+            except (EOFError, OSError):
+                return
+
+            if command == "start":
+                settings = options
+            if command in ("camera", "start") and not capture.running:
+                if not capture.start():
+                    _put(status_queue, GazeStatus.error("Camera not available"))
+                    return
+                _put(status_queue, {"type": "ready", "stage": "camera"})
+        if settings is None:
+            return
+
+        # Timers start now, not when the models were loaded
+        detector.GAZE_TIMEOUT = settings["timeout_seconds"]
+        detector.reset()
+        if settings.get("evidence_prefix"):
+            try:
+                recorder = EvidenceRecorder(settings["evidence_prefix"])
+            except Exception as e:
+                logging.error(f"Evidence recording disabled: {e}")
+
+        _put(status_queue, {"type": "heartbeat"})
+        last_seq = 0
+        while not stop_event.is_set():
+            latest = capture.read_latest(last_seq)
+            if latest is not None:
+                last_seq, captured_at, frame = latest
+                frame_started = time.monotonic()
+                cpu_started = time.thread_time()
+
+                now = time.time()
+                result = detector.process_frame(frame, now=now)
+                latency = capture.record_decision(captured_at)
+                if preview_event.is_set():
+                    preview.write(frame)
+
+                # Keep a pre-roll of small gray frames; only violations are encoded
+                evidence = None
+                if recorder is not None:
+                    recorder.push(detector.last_context.small, now)
+                    if result["violation_triggered"]:
+                        since = now - result["violation_duration"] - EVIDENCE_PRE_ROLL
+                        evidence = recorder.capture(result["violation_type"], since, now)
+                    elif result["is_timeout"]:
+                        evidence = recorder.capture("gaze_timeout", now=now)
+
+                # Only changes (at a capped rate) and events go to the UI
+                status = GazeStatus.from_result(result, latency)
+                status.evidence = evidence
+                if throttle.should_send(status):
+                    _put(status_queue, status)
+
+                # Pace detection to the CPU budget and the proctoring state
+                interval = governor.update(result, time.thread_time() - cpu_started)
+                detector.set_detection_scale(governor.scale)
+
+            if throttle.needs_keepalive():
+                _put(status_queue, {"type": "heartbeat"})
+                throttle.mark_keepalive()
+
+            if latest is not None:
+                stop_event.wait(max(0.0, interval - (time.monotonic() - frame_started)))
+    finally:
+        capture.stop()
+        if recorder is not None:
+            recorder.close(timeout=EVIDENCE_DRAIN_TIMEOUT)
+        _put(status_queue, {
+            "type": "stats",
+            "capture": capture.latency_stats(),
+            "status": throttle.stats(),
+            "evidence": recorder.stats() if recorder is not None else {},
+            "governor": governor.stats(),
+            "motion_gate": detector.motion_gate.stats() if detector is not None else {}
+        })
+        preview.release()
+        shm.close()
+
+
+class ProctoringEngine:
+    """
+    Runs camera capture and gaze detection in a separate process.
+
+    Detection then never competes with the Qt GUI thread for the GIL.
+    Preview frames come back through a SharedPreview block that the GUI
+    reads directly with `preview_frame()`; status changes arrive as compact
+    GazeStatus records on a queue, which a listener thread in this process
+    hands to the `on_status` callback. The same thread supervises
+    the worker: if it crashes or stops sending messages, it is restarted
+    after an increasing delay.
+
+    The worker can be started ahead of time with `warm_up()` (loads the
+    detector models) and `probe_camera()` (opens the camera), so that
+    `start()` only has to tell it to begin detecting.
+    """
+
+    def __init__(self, on_status=None, timeout_seconds=15, detection_interval=DETECTION_INTERVAL, evidence_prefix=None):
+        """
+        Args:
+            on_status (callable): Called with each GazeStatus (from the listener thread);
+                can be set later with `set_status_callback()`
+            timeout_seconds (int): Gaze timeout for GazeDetection
+            detection_interval (float): Normal seconds between detections (adapted by the CPU governor)
+            evidence_prefix (str): Storage path prefix for violation evidence; None disables evidence
+        """
+        self.on_status = on_status
+        self.timeout_seconds = timeout_seconds
+        self.detection_interval = detection_interval
+        self.evidence_prefix = evidence_prefix
+
+        # Spawn instead of fork: forking a process running Qt is not safe
+        self._context = multiprocessing.get_context("spawn")
+        self._shm = None
+        self._preview = None
+        self._queue = None
+        self._control = None
+        self._commands = []
+        self._stop_event = None
+        self._preview_event = self._context.Event()
+        self._process = None
+        self._listener = None
+        self._running = False
+        self._wakeup = threading.Event()
+        self._status_lock = threading.Lock()
+        # Held while the worker process is started or stopped; the listener checks
+        # `_running` under it before a restart, so stop() can't race a restart
+        self._process_lock = threading.Lock()
+        self._undelivered = None
+        self.restarts = 0
+
+        # Warm-up state reported by the worker
+        self.detecting = False
+        self.models_ready = False
+        self.camera_ready = False
+        self.backend_name = None
+        self.unavailable_reason = None
+
+    def warm_up(self):
+        """Start the worker in standby so it loads the detector models; returns immediately"""
+        if self._running:
+            return
+
+        self._shm = shared_memory.SharedMemory(create=True, size=SharedPreview.size())
+        self._preview = SharedPreview(self._shm.buf)
+        self._preview.header[0] = 0
+        self._queue = self._context.Queue(maxsize=100)
+        self._control = self._context.Queue()
+        self._commands = []
+        self._running = True
+        self._wakeup.clear()
+        self.restarts = 0
+        self.detecting = False
+        self.models_ready = False
+        self.camera_ready = False
+        self.unavailable_reason = None
+
+        self._spawn_worker()
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    def probe_camera(self):
+        """Have the (warming up) worker open the camera ahead of detection"""
+        self.warm_up()
+        if not self._commands:
+            self._send("camera")
+
+    def start(self):
+        """Start detection, warming up the worker first if that hasn't happened yet"""
+        self.warm_up()
+        if not self.detecting:
+            self.detecting = True
+            self._send("start", {"timeout_seconds": self.timeout_seconds, "evidence_prefix": self.evidence_prefix})
+
+    def set_status_callback(self, on_status):
+        """
+        Set the status callback, delivering the latest status received without one
+
+        Args:
+            on_status (callable): Called with each GazeStatus (from the listener thread)
+        """
+        with self._status_lock:
+            self.on_status = on_status
+            undelivered, self._undelivered = self._undelivered, None
+        if undelivered is not None and on_status is not None:
+            on_status(undelivered)
+
+    def _deliver(self, status):
+        with self._status_lock:
+            on_status = self.on_status
+            if on_status is None:
+                # Keep errors that happen during warm-up for whoever takes over the engine
+                self._undelivered = status
+                return
+        on_status(status)
+
+    def _send(self, command, options=None):
+        """Send a command to the worker; it is replayed to restarted workers"""
+        self._commands.append((command, options))
+        self._control.put((command, options))
+
+    def _spawn_worker(self):
+        self._stop_event = self._context.Event()
+        self._process = self._context.Process(
+            target=engine_main,
+            args=(self._shm.name, self._queue, self._control, self._stop_event, self._preview_event,
+                  self.detection_interval),
+            daemon=True
+        )
+        self._process.start()
+        for command in self._commands:
+            self._control.put(command)
+        logging.info(f"Proctoring engine started (pid {self._process.pid})")
+
+    def _stop_worker(self, timeout=STOP_TIMEOUT, graceful=True):
+        """
+        Stop the worker process; called with `_process_lock` held
+
+        Args:
+            timeout (float): Seconds to wait for a graceful exit before terminating
+            graceful (bool): Ask the worker to exit; False terminates a crashed or hung worker right away
+        """
+        if self._process is None:
+            return
+        # Only signal a live worker: setting an event another process died waiting
+        # on blocks forever, because the dead waiter never acknowledges the wakeup
+        if graceful and self._process.is_alive():
+            self._stop_event.set()
+            self._process.join(timeout)
+        if self._process.is_alive():
+            if graceful:
+                logging.warning("Proctoring engine did not stop, terminating it")
+            self._process.terminate()
+            self._process.join(1.0)
+        self._process = None
+
+    def _listen(self):
+        """Deliver worker messages and restart the worker if it dies or hangs"""
+        last_message = time.monotonic()
+        # The heartbeat timeout only applies once the current worker has spoken
+        heard_from_worker = False
+
+        while self._running:
+            try:
+                message = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                message = None
+            except (EOFError, OSError):
+                break
+
+            if message is not None:
+                last_message = time.monotonic()
+                heard_from_worker = True
+                kind = "status" if isinstance(message, GazeStatus) else message.get("type")
+                if kind == "status":
+                    self._deliver(message)
+                elif kind == "ready":
+                    if message["stage"] == "models":
+                        self.models_ready = True
+                        self.backend_name = message["backend"]
+                    else:
+                        self.camera_ready = True
+                    logging.info(f"Proctoring engine ready: {message['stage']}")
+                elif kind == "unavailable":
+                    self.unavailable_reason = message["reason"]
+                    logging.error(f"Proctoring not available: {message['reason']}")
+                    self._deliver(GazeStatus.error("Proctoring not available"))
+                elif kind == "stats":
+                    logging.info(f"Proctoring engine stats: {message}")
+                continue
+
+            if not self._running:
+                break
+
+            process = self._process
+            if process is None:
+                continue
+            timeout = HEARTBEAT_TIMEOUT if heard_from_worker else STARTUP_TIMEOUT
+            if process.is_alive() and time.monotonic() - last_message < timeout:
+                continue
+            if not process.is_alive() and process.exitcode == 0:
+                # Clean exit, e.g. no camera; the worker already reported why
+                continue
+
+            if self.restarts >= len(RESTART_BACKOFF):
+                logging.error("Proctoring engine keeps failing, giving up")
+                self._deliver(GazeStatus.error("Proctoring engine stopped"))
+                with self._process_lock:
+                    self._stop_worker(graceful=False)
+                continue
+
+            reason = "stopped responding" if process.is_alive() else f"exited with code {process.exitcode}"
+            delay = RESTART_BACKOFF[self.restarts]
+            self.restarts += 1
+            logging.error(f"Proctoring engine {reason}, restarting in {delay}s")
+            self._deliver(GazeStatus.error("Proctoring engine restarting"))
+            with self._process_lock:
+                self._stop_worker(graceful=False)
+            self._wakeup.wait(delay)
+            with self._process_lock:
+                # stop() may have run during the delay
+                if not self._running:
+                    break
+                self._spawn_worker()
+            last_message = time.monotonic()
+            heard_from_worker = False
+
+    def set_preview_enabled(self, enabled):
+        """Turn publishing of preview frames on or off, e.g. while the preview is hidden"""
+        if enabled:
+            self._preview_event.set()
+        else:
+            self._preview_event.clear()
+
+    def preview_frame(self, last_seq=0):
+        """
+        Get the newest preview frame without copying it
+
+        The frame is a view into shared memory and is complete when this
+        returns. The worker may start overwriting it once it has published
+        the next frame; use `preview_is_current()` after consuming it to
+        confirm that did not happen meanwhile.
+
+        Args:
+            last_seq (int): Sequence number of the frame the caller already shows
+
+        Returns:
+            tuple: (seq, BGR frame), or (last_seq, None) if there is nothing newer
+        """
+        preview = self._preview
+        if preview is None:
+            return last_seq, None
+        seq = preview.seq
+        if seq <= last_seq:
+            return last_seq, None
+        return seq, preview.slots[seq % 2]
+
+    def preview_is_current(self, seq):
+        """True if the slot of preview frame `seq` has not been reused yet"""
+        preview = self._preview
+        return preview is not None and preview.is_intact(seq)
+
+    def stop(self):
+        """Stop the worker, the listener and release the shared memory"""
+        with self._process_lock:
+            if not self._running:
+                return
+            self._running = False
+            self._stop_worker()
+        self._wakeup.set()
+        if self._listener and self._listener is not threading.current_thread():
+            self._listener.join(timeout=2.0)
+        self._listener = None
+
+        # The worker reports its statistics as it exits
+        try:
+            while True:
+                message = self._queue.get(timeout=0.2)
+                if isinstance(message, dict) and message.get("type") == "stats":
+                    logging.info(f"Proctoring engine stats: {message}")
+        except (queue.Empty, EOFError, OSError):
+            pass
+
+        self._queue.close()
+        self._control.close()
+        self.detecting = False
+        self._preview.release()
+        self._preview = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import logging
+import datetime
+from supabase_connection import create_connection
+from write_behind import WriteBehindQueue
+
+# Event types
+CAMERA_UNCLEAR = "unclear_camera"
+FACE_MISSING = "face_not_detected"
+NOT_FACING = "not_facing_camera"
+GAZE_TIMEOUT = "gaze_timeout"
+FULLSCREEN_EXIT = "fullscreen_exit"
+FOCUS_LOST = "focus_lost"
+SCREEN_CHANGED = "screen_changed"
+ENGINE_ERROR = "engine_error"
+EXAM_TERMINATED = "exam_terminated"
+
+# Optional local stand-in for the events table: events are appended to this
+# JSON lines file instead of being inserted into Supabase (for offline tests)
+EVENT_LOG_PATH = os.getenv("PROCTORING_EVENT_LOG")
+
+
+class ProctoringEvent:
+    """
+    One proctoring event, such as a sustained violation or a fullscreen exit.
+
+    Times are Unix timestamps. Instant events have `ended_at == started_at`.
+    """
+
+    __slots__ = ('event_type', 'started_at', 'ended_at', 'confidence', 'details')
+
+    def __init__(self, event_type, started_at, ended_at=None, confidence=None, details=None):
+        """
+        Args:
+            event_type (str): One of the event type constants
+            started_at (float): When the event started
+            ended_at (float): When it ended; defaults to started_at
+            confidence (float): How sure the detector was (0-1), if known
+            details (dict): Extra JSON-serializable information
+        """
+        self.event_type = event_type
+        self.started_at = started_at
+        self.ended_at = started_at if ended_at is None else ended_at
+        self.confidence = confidence
+        self.details = details
+
+    @property
+    def duration(self):
+        """Length of the event in seconds"""
+        return max(0.0, self.ended_at - self.started_at)
+
+    def to_row(self, exam_id, student_username):
+        """
+        Convert the event to a `proctoring_events` row
+
+        Returns:
+            dict: Row ready to insert
+        """
+        return {
+            'exam_id': exam_id,
+            'student_username': student_username,
+            'event_type': self.event_type,
+            'started_at': datetime.datetime.fromtimestamp(self.started_at, datetime.timezone.utc).isoformat(),
+            'ended_at': datetime.datetime.fromtimestamp(self.ended_at, datetime.timezone.utc).isoformat(),
+            'duration_seconds': round(self.duration, 3),
+            'confidence': None if self.confidence is None else round(self.confidence, 3),
+            'details': self.details
+        }
+
+
+class SupabaseEventSink:
+    """Writes event rows to the `proctoring_events` table in one bulk insert per batch"""
+
+    def write(self, rows):
+        supabase = create_connection()
+        if not supabase:
+            raise Exception("Failed to connect to Supabase")
+
+        supabase.table('proctoring_events') \
+            .insert(rows) \
+            .execute()
+
+
+class JsonlEventSink:
+    """Local stand-in for the events table: appends event rows to a JSON lines file"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): File to append to
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+
+    def write(self, rows):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(row) + "\n" for row in rows))
+
+
+def create_event_sink(path=None):
+    """
+    Choose where events are written
+
+    Args:
+        path (str): JSON lines file to use instead of Supabase; defaults to PROCTORING_EVENT_LOG
+
+    Returns:
+        SupabaseEventSink or JsonlEventSink
+    """
+    path = path or EVENT_LOG_PATH
+    return JsonlEventSink(path) if path else SupabaseEventSink()
+
+
+class ProctoringEventQueue(WriteBehindQueue):
+    """
+    Write-behind queue of proctoring events for one exam attempt.
+
+    `record()` only appends to an in-memory list, so it is safe to call
+    from the GUI thread while a violation is being handled. A background
+    thread writes the queued events as one bulk insert every
+    `flush_interval` seconds, or as soon as `max_pending` events are
+    waiting. Failed batches are kept and retried; if the database stays
+    unreachable, at most `max_buffered` events are kept and the oldest are
+    dropped first.
+    """
+
+    item_name = "proctoring events"
+
+    def __init__(self, exam_id, student_username, sink=None, flush_interval=5.0, max_pending=50, max_buffered=1000):
+        """
+        Args:
+            exam_id (int): Exam being taken
+            student_username (str): Student taking the exam
+            sink: Object with a `write(rows)` method; defaults to create_event_sink()
+            flush_interval (float): Seconds between background flushes
+            max_pending (int): Number of queued events that triggers an early flush
+            max_buffered (int): Most events kept while writes keep failing
+        """
+        self.exam_id = exam_id
+        self.student_username = student_username
+        self.sink = sink if sink is not None else create_event_sink()
+        self.max_buffered = max_buffered
+
+        self.pending = []
+        self.events_written = 0
+        self.events_dropped = 0
+
+        super().__init__(flush_interval, max_pending)
+
+    def record(self, event):
+        """
+        Queue an event; it is written on the next flush
+
+        Args:
+            event (ProctoringEvent): Event to record
+        """
+        if self._closed:
+            logging.warning(f"Proctoring event {event.event_type} recorded after close, dropping it")
+            return
+
+        with self._lock:
+            self.pending.append(event)
+            overflow = self._trim()
+            pending_count = len(self.pending)
+
+        if overflow > 0:
+            logging.warning(f"Proctoring event buffer full, dropped {overflow} oldest events")
+        self._item_added(pending_count)
+
+    def _trim(self):
+        """Drop the oldest events beyond `max_buffered`; called with the lock held"""
+        overflow = len(self.pending) - self.max_buffered
+        if overflow > 0:
+            del self.pending[:overflow]
+            self.events_dropped += overflow
+        return overflow
+
+    def _take_batch(self):
+        if not self.pending:
+            return None
+        batch = self.pending
+        self.pending = []
+        return batch
+
+    def _write_batch(self, batch):
+        self.sink.write([event.to_row(self.exam_id, self.student_username) for event in batch])
+        self.events_written += len(batch)
+        logging.debug(f"Flushed {len(batch)} proctoring events for exam {self.exam_id}")
+
+    def _requeue(self, batch):
+        # Put the batch back in front of anything recorded meanwhile
+        self.pending = batch + self.pending
+        self._trim()
+
+
+def instant_event(event_type, details=None):
+    """Create an event that starts and ends now"""
+    return ProctoringEvent(event_type, time.time(), details=details)
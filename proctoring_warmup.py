@@ -0,0 +1,85 @@
+import atexit
+import logging
+import threading
+
+# The one warm proctoring engine of this process, waiting for an exam page to take it
+_engine = None
+_lock = threading.Lock()
+
+
+def _engine_class():
+    """ProctoringEngine, or None if the proctoring dependencies are missing"""
+    try:
+        from proctoring_engine import ProctoringEngine
+        return ProctoringEngine
+    except ImportError as e:
+        logging.error(f"Proctoring warm-up not possible: {e}")
+        return None
+
+
+def warm_up():
+    """
+    Start loading the detector models in the background
+
+    Called right after a student logs in. Returns immediately; the models
+    are loaded by the proctoring worker process while the student uses
+    the dashboard.
+    """
+    global _engine
+    with _lock:
+        if _engine is None:
+            engine_class = _engine_class()
+            if engine_class is None:
+                return
+            _engine = engine_class()
+        _engine.warm_up()
+
+
+def probe_camera():
+    """
+    Open the camera ahead of the exam
+
+    Called when the exam disclaimer is shown, so the camera is running by
+    the time the student has read it.
+    """
+    warm_up()
+    with _lock:
+        if _engine is not None:
+            _engine.probe_camera()
+
+
+def release_camera():
+    """Close the camera again (the student left the disclaimer) but stay warm"""
+    shutdown()
+    warm_up()
+
+
+def take_engine():
+    """
+    Hand the warm engine to an exam page
+
+    The caller owns the engine from then on. The next warm_up() prepares a
+    new one.
+
+    Returns:
+        ProctoringEngine: Warm (or, if warm-up never ran, cold) engine, or None if unavailable
+    """
+    global _engine
+    with _lock:
+        engine, _engine = _engine, None
+    if engine is None:
+        engine_class = _engine_class()
+        engine = engine_class() if engine_class is not None else None
+    return engine
+
+
+def shutdown():
+    """Stop the warm engine, e.g. on logout or exit"""
+    global _engine
+    with _lock:
+        engine, _engine = _engine, None
+    if engine is not None:
+        engine.stop()
+
+
+atexit.register(shutdown)
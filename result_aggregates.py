@@ -0,0 +1,129 @@
+from virtual_list import CardData
+
+# Number of percentage buckets in exam_result_stats.histogram (0-10%, ..., 90-100%)
+HISTOGRAM_BUCKETS = 10
+
+
+class ExamStats:
+    """
+    Per-exam result summary, read from the `exam_result_stats` table.
+
+    The table is kept up to date by a trigger on `exam_results`, so teacher
+    screens get counts, averages and the score distribution without
+    downloading every individual result. The median is refreshed less
+    often and can lag the other figures by about a minute while results
+    are being submitted.
+    """
+
+    def __init__(self, row):
+        """
+        Args:
+            row (dict): Row from exam_result_stats
+        """
+        self.exam_id = row.get('exam_id')
+        self.result_count = row.get('result_count') or 0
+        self.total_questions = row.get('total_questions') or 0
+        self.mean_score = row.get('mean_score')
+        self.median_score = row.get('median_score')
+        self.min_score = row.get('min_score')
+        self.max_score = row.get('max_score')
+        self.pass_rate = row.get('pass_rate')
+        self.histogram = row.get('histogram') or [0] * HISTOGRAM_BUCKETS
+
+    def histogram_text(self):
+        """Render the score distribution as a one-line bar chart"""
+        bars = " ▁▂▃▄▅▆▇█"
+        peak = max(self.histogram) if self.histogram else 0
+        if not peak:
+            return ""
+        return "".join(bars[round(count * (len(bars) - 1) / peak)] for count in self.histogram)
+
+
+def _stats_from_embed(embedded):
+    """Embedded one-to-one rows come back as an object or a one-element list"""
+    if isinstance(embedded, list):
+        embedded = embedded[0] if embedded else None
+    return ExamStats(embedded) if embedded else None
+
+
+def fetch_exam_stats(supabase, exam_ids):
+    """
+    Fetch result summaries for several exams in one query
+
+    Args:
+        supabase: Supabase client
+        exam_ids (list): Exams to summarize
+
+    Returns:
+        dict: Map of exam id to ExamStats, for exams that have a summary
+    """
+    if not exam_ids:
+        return {}
+
+    response = supabase.table('exam_result_stats') \
+        .select('*') \
+        .in_('exam_id', list(exam_ids)) \
+        .execute()
+    return {row['exam_id']: ExamStats(row) for row in response.data or []}
+
+
+def fetch_teacher_exam_stats(supabase, teacher_username):
+    """
+    Fetch a teacher's exams together with their result summaries
+
+    Args:
+        supabase: Supabase client
+        teacher_username (str): Teacher whose exams to load
+
+    Returns:
+        list: (exam_id, exam_name, ExamStats or None) tuples
+    """
+    response = supabase.table('exams') \
+        .select('id, name, exam_result_stats(*)') \
+        .eq('teacher_username', teacher_username) \
+        .order('id') \
+        .execute()
+    return [(exam['id'], exam['name'], _stats_from_embed(exam.get('exam_result_stats')))
+            for exam in response.data or []]
+
+
+def format_stats_lines(stats):
+    """
+    Describe a result summary as display lines
+
+    Args:
+        stats (ExamStats): Summary to describe, or None
+
+    Returns:
+        list: Lines of text
+    """
+    if stats is None or not stats.result_count:
+        return ["No students have submitted results yet."]
+
+    total = stats.total_questions
+    lines = [
+        f"Submissions: {stats.result_count}",
+        f"Mean: {float(stats.mean_score):.1f}/{total}   Median: {float(stats.median_score):.1f}/{total}",
+        f"Lowest: {stats.min_score}/{total}   Highest: {stats.max_score}/{total}",
+    ]
+    if stats.pass_rate is not None:
+        lines.append(f"Pass rate: {float(stats.pass_rate) * 100:.0f}%")
+
+    histogram = stats.histogram_text()
+    if histogram:
+        lines.append(f"Distribution (0-100%): {histogram}")
+    return lines
+
+
+def stats_card_data(exam_name, stats):
+    """
+    Describe one exam's result summary as a list card
+
+    Args:
+        exam_name (str): Exam name for the card title
+        stats (ExamStats): Summary to show, or None
+
+    Returns:
+        CardData: The card content
+    """
+    return CardData(f"Exam: {exam_name}", format_stats_lines(stats))
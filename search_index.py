@@ -0,0 +1,179 @@
+import os
+import logging
+from array import array
+from PyQt6 import QtCore
+
+# Rosters up to this size are cached and searched locally; larger ones are searched on the server
+ROSTER_CACHE_LIMIT = int(os.getenv("ROSTER_CACHE_LIMIT", "5000"))
+
+# Delay between the last keystroke and running the search
+SEARCH_DEBOUNCE_MS = 150
+
+
+class NgramIndex:
+    """
+    Substring index over a list of keys (e.g. usernames).
+
+    Every key is broken into its 1-, 2- and 3-character grams, and each gram
+    maps to the sorted rows containing it. A query of up to three characters
+    is a single posting lookup; longer queries intersect the postings of
+    their trigrams and check only the surviving candidates. Matching is
+    case-insensitive substring matching, the same as the old linear scan.
+    """
+
+    def __init__(self, keys, gram_size=3):
+        """
+        Args:
+            keys (list): Strings to index, one per row
+            gram_size (int): Longest gram stored in the index
+        """
+        self.gram_size = gram_size
+        self.keys = [(key or "").lower() for key in keys]
+
+        postings = {}
+        for row, key in enumerate(self.keys):
+            grams = set()
+            for size in range(1, gram_size + 1):
+                for i in range(len(key) - size + 1):
+                    grams.add(key[i:i + size])
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+
+        # Compact row lists; rows were appended in order so they are already sorted
+        self.postings = {gram: array('I', rows) for gram, rows in postings.items()}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, text, within=None):
+        """
+        Find the rows whose key contains the text
+
+        Args:
+            text (str): Search text
+            within (set): Optional rows to restrict the search to, i.e. the
+                matches of a shorter query the text extends
+
+        Returns:
+            set: Matching rows, or None if the text is empty (everything matches)
+        """
+        text = text.lower()
+        if not text:
+            return None
+
+        if within is not None:
+            # Refining an earlier result: checking its rows directly is cheapest
+            return {row for row in within if text in self.keys[row]}
+
+        if len(text) <= self.gram_size:
+            matches = set(self.postings.get(text, ()))
+        else:
+            grams = {text[i:i + self.gram_size] for i in range(len(text) - self.gram_size + 1)}
+            lists = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+            candidates = set(lists[0])
+            for rows in lists[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(rows)
+            # Trigrams can match out of order, so confirm the substring
+            matches = {row for row in candidates if text in self.keys[row]}
+        return matches
+
+
+class IndexFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """Proxy model showing only the source rows in a precomputed match set"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.matches = None
+
+    def set_matches(self, matches):
+        """
+        Args:
+            matches (set): Source rows to show, or None to show every row
+        """
+        self.matches = matches
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self.matches is None or source_row in self.matches
+
+
+def escape_like(text):
+    """Escape the wildcard characters of an ilike pattern"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class RosterSearch(QtCore.QObject):
+    """
+    Debounced search box driving a RecordListModel through a proxy model.
+
+    While the whole roster is cached locally, each search is answered from
+    an NgramIndex and applied by updating the proxy's match set; no cards
+    are rebuilt. When the roster is larger than the cache, searches go to
+    the server instead: the model is switched to paging `server_search`
+    results as the user scrolls.
+    """
+
+    def __init__(self, search_box, model, proxy, key='username', server_search=None, parent=None):
+        """
+        Args:
+            search_box (QLineEdit): Input to watch
+            model (RecordListModel): Model holding the roster
+            proxy (IndexFilterProxyModel): Proxy between the model and the view
+            key (str): Record field to search
+            server_search (callable): Optional server_search(text, offset, limit) used
+                instead of the local index when the roster is only partly cached
+            parent (QObject): Parent object
+        """
+        super().__init__(parent or search_box)
+        self.model = model
+        self.proxy = proxy
+        self.key = key
+        self.server_search = server_search
+
+        self.index = None
+        self.last_text = ""
+        self.last_matches = None
+
+        # Roster as first loaded, restored when the search box is cleared
+        self.base_records = list(model.records())
+        self.base_fetch_page = model.page_fetcher()
+
+        if server_search is None:
+            self.index = NgramIndex([record.get(key) for record in self.base_records])
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.timer.timeout.connect(lambda: self.apply(search_box.text()))
+        search_box.textChanged.connect(lambda _: self.timer.start())
+
+    def apply(self, text):
+        """
+        Filter the list by the given search text
+
+        Args:
+            text (str): Search text
+        """
+        text = text.strip()
+        if text == self.last_text:
+            return
+
+        if self.index is not None:
+            # Typing more characters can only narrow the previous matches
+            within = self.last_matches if self.last_text and text.lower().startswith(self.last_text.lower()) else None
+            matches = self.index.search(text, within)
+            if matches is not None:
+                # Matches may lie beyond the rows the list has exposed so far
+                self.model.show_all_loaded()
+            self.proxy.set_matches(matches)
+            self.last_matches = matches
+        elif text:
+            self.model.set_records([], fetch_page=lambda offset, limit: self.server_search(text, offset, limit))
+            self.model.fetchMore()
+        else:
+            self.model.set_records(self.base_records, fetch_page=self.base_fetch_page)
+
+        self.last_text = text
+        logging.debug(f"Roster search for '{text}' applied")
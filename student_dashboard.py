@@ -3,6 +3,8 @@ from styles import COMMON_STYLES
 from supabase_connection import create_connection
 from exam_taking import ExamTaking
 from exam_disclaimer import ExamDisclaimerPage
+from virtual_list import CardData, RecordListModel, RecordListView
+import proctoring_warmup
 import datetime
 import logging
 
@@ -86,6 +88,7 @@ class StudentDashboard(QtWidgets.QWidget):
         return card
 
     def logout(self):
+        proctoring_warmup.shutdown()
         self.main_window.stackedWidget.setCurrentWidget(self.main_window.login_page)
 
     def show_exams(self):
@@ -154,8 +157,8 @@ class StudentDashboard(QtWidgets.QWidget):
         self.clear_exams_container()
         
         # Get current date and time
-        current_date = datetime.date.today().isoformat()  # Convert to ISO format for Supabase
-        current_time = datetime.datetime.now().time().strftime('%H:%M:%S')  # Format time for comparison
+        now = datetime.datetime.now()
+        current_date = now.date().isoformat()  # Convert to ISO format for Supabase
         
         # Fetch exams from the database that are active and scheduled for today
         try:
@@ -166,36 +169,22 @@ class StudentDashboard(QtWidgets.QWidget):
             # Query for exams that are:
             # 1. Active
             # 2. Scheduled for today
-            # 3. Not attempted by the current student
-            
-            # First get all exams for today
+            # 3. Not completed by the current student
+            #
+            # The attempt check is an anti-join: embed this student's completed
+            # results and keep only the exams where none exist, all in one round
+            # trip. In-progress attempts (completed_at NULL) stay listed so an
+            # interrupted exam can be resumed from its saved answers
             exams_response = supabase.table('exams') \
-                .select('id, name, duration, start_time, end_time') \
+                .select('id, name, duration, start_time, end_time, exam_results(id)') \
                 .eq('status', 'active') \
                 .eq('exam_date', current_date) \
+                .eq('exam_results.student_username', self.main_window.current_user) \
+                .not_.is_('exam_results.completed_at', 'null') \
+                .is_('exam_results', 'null') \
                 .execute()
-                
-            if not exams_response.data:
-                no_exams_label = QtWidgets.QLabel("No exams scheduled for today.")
-                no_exams_label.setStyleSheet("font-size: 16px; color: #666; margin: 20px;")
-                no_exams_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-                self.exams_container_layout.addWidget(no_exams_label)
-                return
-                
-            # Now check which ones the student hasn't taken yet
-            available_exams = []
-            for exam in exams_response.data:
-                # Check if student already attempted this exam
-                result_response = supabase.table('exam_results') \
-                    .select('id') \
-                    .eq('exam_id', exam['id']) \
-                    .eq('student_username', self.main_window.current_user) \
-                    .execute()
-                    
-                if not result_response.data:  # No results found, exam is available
-                    available_exams.append(exam)
             
-            if not available_exams:
+            if not exams_response.data:
                 no_exams_label = QtWidgets.QLabel("No exams available for you today.")
                 no_exams_label.setStyleSheet("font-size: 16px; color: #666; margin: 20px;")
                 no_exams_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
@@ -213,29 +202,7 @@ class StudentDashboard(QtWidgets.QWidget):
             expired_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #6C63FF; margin-top: 20px;")
             
             # Group exams by availability
-            available_now = []
-            upcoming = []
-            expired = []
-            
-            for exam in available_exams:
-                # Convert times for comparison
-                start_time_str = exam['start_time']
-                end_time_str = exam['end_time']
-                
-                # Parse time strings
-                start_time = datetime.datetime.strptime(start_time_str, '%H:%M:%S').time()
-                end_time = datetime.datetime.strptime(end_time_str, '%H:%M:%S').time()
-                
-                # Get current time
-                current_time_obj = datetime.datetime.now().time()
-                
-                # Check if exam is currently available
-                if start_time <= current_time_obj and end_time >= current_time_obj:
-                    available_now.append((exam['id'], exam['name'], exam['duration'], start_time, end_time))
-                elif start_time > current_time_obj:
-                    upcoming.append((exam['id'], exam['name'], exam['duration'], start_time, end_time))
-                else:  # end_time < current_time
-                    expired.append((exam['id'], exam['name'], exam['duration'], start_time, end_time))
+            available_now, upcoming, expired = self.classify_exams(exams_response.data, now.time())
             
             # Create scrollable area
             scroll_area = QtWidgets.QScrollArea()
@@ -285,6 +252,35 @@ class StudentDashboard(QtWidgets.QWidget):
             msg.setIcon(QtWidgets.QMessageBox.Icon.Critical)
             msg.exec()
             
+    def classify_exams(self, exams, current_time):
+        """
+        Split exams into available now, upcoming and expired lists in a single pass
+        
+        Args:
+            exams (list): Exam rows with id, name, duration, start_time and end_time
+            current_time (datetime.time): Time to classify against
+            
+        Returns:
+            tuple: (available_now, upcoming, expired) lists of
+                   (id, name, duration, start_time, end_time) tuples
+        """
+        buckets = ([], [], [])
+        
+        for exam in exams:
+            start_time = datetime.datetime.strptime(exam['start_time'], '%H:%M:%S').time()
+            end_time = datetime.datetime.strptime(exam['end_time'], '%H:%M:%S').time()
+            
+            if start_time <= current_time <= end_time:
+                bucket = 0
+            elif start_time > current_time:
+                bucket = 1
+            else:  # end_time < current_time
+                bucket = 2
+            
+            buckets[bucket].append((exam['id'], exam['name'], exam['duration'], start_time, end_time))
+        
+        return buckets
+            
     def create_exam_card(self, exam_id, name, duration, start_time, end_time, is_available, is_expired=False):
         exam_card = QtWidgets.QWidget()
         
@@ -469,9 +465,10 @@ class StudentDashboard(QtWidgets.QWidget):
             if not supabase:
                 raise Exception("Failed to connect to Supabase")
 
-            # Fetch exam results for the current student
+            # Fetch exam results for the current student, with each exam's
+            # name, date and question count embedded in the same round trip
             results_response = supabase.table('exam_results') \
-                .select('exam_id, score, completed_at') \
+                .select('exam_id, score, completed_at, exams(name, exam_date, questions(count))') \
                 .eq('student_username', self.main_window.current_user) \
                 .execute()
 
@@ -482,13 +479,6 @@ class StudentDashboard(QtWidgets.QWidget):
                 self.results_container_layout.addWidget(no_results_label)
                 return
 
-            # Create section headers
-            completed_label = QtWidgets.QLabel("Completed Exams")
-            completed_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #6C63FF; margin-top: 10px;")
-            
-            in_progress_label = QtWidgets.QLabel("In-Progress Exams")
-            in_progress_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #FF9800; margin-top: 20px;")
-            
             # Group results by status
             completed_exams = []
             in_progress_exams = []
@@ -498,22 +488,15 @@ class StudentDashboard(QtWidgets.QWidget):
                 score = result['score']
                 completed_at = result['completed_at']
                 
-                # Fetch exam date and name from exams table
-                exam_data = supabase.table('exams') \
-                    .select('exam_date, name') \
-                    .eq('id', exam_id) \
-                    .single() \
-                    .execute()
+                # Exam date and name come from the embedded exams row
+                exam_data = result.get('exams') or {}
                 
-                exam_date = exam_data.data['exam_date'] if exam_data.data and 'exam_date' in exam_data.data else "Unknown"
-                exam_name = exam_data.data['name'] if exam_data.data and 'name' in exam_data.data else f"Exam #{exam_id}"
-
-                # Count total number of questions for the exam
-                questions_data = supabase.table('questions') \
-                    .select('id') \
-                    .eq('exam_id', exam_id) \
-                    .execute()
-                total_marks = len(questions_data.data) if questions_data.data else 0
+                exam_date = exam_data.get('exam_date') or "Unknown"
+                exam_name = exam_data.get('name') or f"Exam #{exam_id}"
+
+                # Total number of questions is counted server-side
+                question_counts = exam_data.get('questions') or []
+                total_marks = question_counts[0]['count'] if question_counts else 0
                 
                 # Log information for debugging
                 logging.debug(f"Exam result: id={exam_id}, name={exam_name}, score={score}/{total_marks}, completed={completed_at}")
@@ -526,37 +509,25 @@ class StudentDashboard(QtWidgets.QWidget):
                 else:
                     in_progress_exams.append((exam_id, exam_name, score, total_marks, exam_date))
         
-            # Add container for scrollable content
-            scroll_area = QtWidgets.QScrollArea()
-            scroll_area.setWidgetResizable(True)
-            scroll_content = QtWidgets.QWidget()
-            scroll_layout = QtWidgets.QVBoxLayout(scroll_content)
-            scroll_layout.setSpacing(10)
-            
-            # Display completed exams
+            # Results and section headers go into one virtualized list
+            records = []
             if completed_exams:
-                scroll_layout.addWidget(completed_label)
-                
+                records.append({'header': "Completed Exams", 'color': '#6C63FF'})
                 for exam_id, exam_name, score, total_marks, exam_date, completed_at in completed_exams:
-                    result_card = self.create_result_card(exam_id, exam_name, score, total_marks, exam_date, True, completed_at)
-                    scroll_layout.addWidget(result_card)
-            
-            # Display in-progress exams
+                    records.append({'exam_id': exam_id, 'exam_name': exam_name, 'score': score,
+                                    'total_marks': total_marks, 'exam_date': exam_date,
+                                    'is_completed': True, 'completed_at': completed_at})
             if in_progress_exams:
-                scroll_layout.addWidget(in_progress_label)
-                
+                records.append({'header': "In-Progress Exams", 'color': '#FF9800'})
                 for exam_id, exam_name, score, total_marks, exam_date in in_progress_exams:
-                    result_card = self.create_result_card(exam_id, exam_name, score, total_marks, exam_date, False)
-                    scroll_layout.addWidget(result_card)
+                    records.append({'exam_id': exam_id, 'exam_name': exam_name, 'score': score,
+                                    'total_marks': total_marks, 'exam_date': exam_date,
+                                    'is_completed': False, 'completed_at': None})
             
-            if not (completed_exams or in_progress_exams):
-                no_results_label = QtWidgets.QLabel("No results available.")
-                no_results_label.setStyleSheet("font-size: 16px; color: #666; margin: 20px;")
-                no_results_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-                scroll_layout.addWidget(no_results_label)
-            
-            scroll_area.setWidget(scroll_content)
-            self.results_container_layout.addWidget(scroll_area)
+            self.results_model = RecordListModel(self.result_card_data, records)
+            self.results_view = RecordListView(self.results_model)
+            self.results_view.setMinimumHeight(300)
+            self.results_container_layout.addWidget(self.results_view)
 
         except Exception as e:
             logging.error(f"Error loading results: {e}")
@@ -567,76 +538,29 @@ class StudentDashboard(QtWidgets.QWidget):
             msg.setIcon(QtWidgets.QMessageBox.Icon.Critical)
             msg.exec()
 
-    def create_result_card(self, exam_id, exam_name, score, total_marks, exam_date, is_completed, completed_at=None):
-        result_card = QtWidgets.QWidget()
-        
-        # Style based on completion status
-        if is_completed:
-            result_card.setStyleSheet('''
-                QWidget {
-                    background: #F0F8FF;
-                    border-radius: 10px;
-                    padding: 15px;
-                    margin: 5px;
-                    border: 1px solid #6C63FF;
-                }
-            ''')
-            status_text = "COMPLETED"
-            status_color = "#4CAF50"  # Green
-        else:
-            result_card.setStyleSheet('''
-                QWidget {
-                    background: #FFF8E1;
-                    border-radius: 10px;
-                    padding: 15px;
-                    margin: 5px;
-                    border: 1px solid #FF9800;
-                }
-            ''')
-            status_text = "IN PROGRESS"
-            status_color = "#FF9800"  # Orange
-        
-        card_layout = QtWidgets.QVBoxLayout(result_card)
-        
-        # Header with name and status
-        header_layout = QtWidgets.QHBoxLayout()
-        
-        name_label = QtWidgets.QLabel(exam_name)
-        name_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #333;")
-        
-        status_label = QtWidgets.QLabel(status_text)
-        status_label.setStyleSheet(f"color: {status_color}; font-weight: bold; font-size: 12px;")
-        
-        header_layout.addWidget(name_label)
-        header_layout.addStretch()
-        header_layout.addWidget(status_label)
-        
-        card_layout.addLayout(header_layout)
-        
-        # Score and date info
-        score_label = QtWidgets.QLabel(f"Score: {score}/{total_marks}")
-        score_label.setStyleSheet("font-size: 14px; color: #666;")
-        
-        date_label = QtWidgets.QLabel(f"Exam Date: {exam_date}")
-        date_label.setStyleSheet("font-size: 14px; color: #666;")
-        
-        card_layout.addWidget(score_label)
-        card_layout.addWidget(date_label)
-        
+    def result_card_data(self, record):
+        """Card content for a row of the results list"""
+        if 'header' in record:
+            return CardData(record['header'], title_color=record['color'], is_header=True)
+
+        lines = [f"Score: {record['score']}/{record['total_marks']}", f"Exam Date: {record['exam_date']}"]
+
         # Add completion time if available
-        if completed_at:
+        if record['completed_at']:
             try:
                 # Convert ISO format to readable format
-                completed_datetime = datetime.datetime.fromisoformat(completed_at)
-                formatted_time = completed_datetime.strftime("%Y-%m-%d %H:%M:%S")
-                completed_label = QtWidgets.QLabel(f"Completed: {formatted_time}")
-                completed_label.setStyleSheet("font-size: 14px; color: #666; font-style: italic;")
-                card_layout.addWidget(completed_label)
-            except:
+                completed_datetime = datetime.datetime.fromisoformat(record['completed_at'])
+                lines.append(f"Completed: {completed_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
+            except ValueError:
                 # In case of formatting errors
                 pass
-        
-        return result_card
+
+        # Style based on completion status
+        if record['is_completed']:
+            return CardData(record['exam_name'], lines, badge="COMPLETED", badge_color="#4CAF50",
+                            background="#F0F8FF", border="#6C63FF")
+        return CardData(record['exam_name'], lines, badge="IN PROGRESS", badge_color="#FF9800",
+                        background="#FFF8E1", border="#FF9800")
 
     def show_profile(self):
         # Create a new widget to display profile information
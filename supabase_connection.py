@@ -1,32 +1,128 @@
 import os
+import atexit
+import threading
 from dotenv import load_dotenv
 from supabase import create_client
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Keep-alive pool settings for the shared HTTP session
+POOL_MAX_CONNECTIONS = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", "10"))
+POOL_MAX_KEEPALIVE = int(os.getenv("SUPABASE_POOL_MAX_KEEPALIVE", "10"))
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_POOL_KEEPALIVE_EXPIRY", "60"))
+
+# Process-wide client registry. Every caller of create_connection() shares
+# the same client (and therefore the same pooled HTTP connections).
+_client = None
+_http_client = None
+_client_lock = threading.Lock()
+
+
+def _create_http_client():
+    """
+    Creates the pooled httpx session shared by all Supabase sub-clients.
+    Returns None if httpx is unavailable, in which case the Supabase
+    client falls back to its own default session.
+    """
+    try:
+        import httpx
+    except ImportError:
+        return None
+
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE,
+            keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(30.0, connect=10.0),
+    )
+
+
+def _build_client(supabase_url, supabase_key):
+    """
+    Builds a Supabase client wired to a keep-alive connection pool.
+    Older supabase releases without the httpx_client option get a plain client.
+    """
+    global _http_client
+
+    http_client = _create_http_client()
+    if http_client is not None:
+        try:
+            from supabase import ClientOptions
+            options = ClientOptions(httpx_client=http_client)
+            client = create_client(supabase_url, supabase_key, options=options)
+            _http_client = http_client
+            return client
+        except (ImportError, TypeError):
+            http_client.close()
+
+    return create_client(supabase_url, supabase_key)
+
+
 def create_connection():
     """
-    Creates and returns a connection to Supabase.
+    Returns the shared connection to Supabase, creating it on first use.
     Returns None if connection fails.
     """
-    try:
-        # Get Supabase credentials from environment variables
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_KEY")
-        
-        if not supabase_url or not supabase_key:
-            print("Error: Supabase URL or key not found in environment variables")
-            print("Make sure you have a .env file with SUPABASE_URL and SUPABASE_KEY")
+    global _client
+
+    # Fast path: the client already exists
+    client = _client
+    if client is not None:
+        return client
+
+    with _client_lock:
+        if _client is not None:
+            return _client
+
+        try:
+            # Get Supabase credentials from environment variables
+            supabase_url = os.getenv("SUPABASE_URL")
+            supabase_key = os.getenv("SUPABASE_KEY")
+
+            if not supabase_url or not supabase_key:
+                print("Error: Supabase URL or key not found in environment variables")
+                print("Make sure you have a .env file with SUPABASE_URL and SUPABASE_KEY")
+                return None
+
+            # Create Supabase client
+            _client = _build_client(supabase_url, supabase_key)
+            return _client
+
+        except Exception as e:
+            print(f"Error connecting to Supabase: {e}")
             return None
-            
-        # Create Supabase client
-        supabase = create_client(supabase_url, supabase_key)
-        return supabase
-    
-    except Exception as e:
-        print(f"Error connecting to Supabase: {e}")
-        return None
+
+
+def close_connection():
+    """
+    Shuts down the shared client and releases its pooled HTTP connections.
+    Safe to call more than once; a later create_connection() starts over.
+    """
+    global _client, _http_client
+
+    with _client_lock:
+        client, http_client = _client, _http_client
+        _client = None
+        _http_client = None
+
+    if client is not None:
+        try:
+            client.postgrest.aclose()
+        except Exception as e:
+            print(f"Error closing Supabase client: {e}")
+
+    if http_client is not None:
+        try:
+            http_client.close()
+        except Exception as e:
+            print(f"Error closing Supabase HTTP session: {e}")
+
+
+atexit.register(close_connection)
+
 
 def test_connection():
     """
@@ -48,4 +144,4 @@ def test_connection():
 
 # For direct testing of this module
 if __name__ == "__main__":
-    test_connection() 
\ No newline at end of file
+    test_connection()
@@ -2,6 +2,8 @@ from PyQt6 import QtWidgets, QtCore
 from styles import COMMON_STYLES
 from exam_creation import ExamCreation
 from supabase_connection import create_connection
+from result_aggregates import fetch_teacher_exam_stats, stats_card_data
+from virtual_list import CardData, RecordListModel, RecordListView
 class TeacherDashboard(QtWidgets.QWidget):
     def __init__(self, main_window):
         super().__init__()
@@ -286,73 +288,22 @@ class TeacherDashboard(QtWidgets.QWidget):
             if not supabase:
                 raise Exception("Failed to connect to Supabase")
             
-            # Step 1: Get exams created by the teacher
-            exams_response = supabase.table('exams') \
-                .select('id, name') \
-                .eq('teacher_username', self.main_window.current_user) \
-                .execute()
-            
-            exam_ids = [e['id'] for e in exams_response.data]
-            exam_names = {e['id']: e['name'] for e in exams_response.data}
+            # Get the teacher's exams with their precomputed result summaries
+            exam_stats = fetch_teacher_exam_stats(supabase, self.main_window.current_user)
             
-            if not exam_ids:
+            if not exam_stats:
                 no_exams_label = QtWidgets.QLabel("You haven't created any exams yet.")
                 no_exams_label.setStyleSheet("font-size: 16px; color: #666; margin: 20px;")
                 no_exams_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
                 self.results_container_layout.addWidget(no_exams_label)
                 return
             
-            # Step 2: Fetch results for those exams
-            results_response = supabase.table('exam_results') \
-                .select('exam_id, student_username, score') \
-                .in_('exam_id', exam_ids) \
-                .execute()
-            
-            if not results_response.data:
-                no_results_label = QtWidgets.QLabel("No students have submitted results yet.")
-                no_results_label.setStyleSheet("font-size: 16px; color: #666; margin: 20px;")
-                no_results_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-                self.results_container_layout.addWidget(no_results_label)
-                return
-            
-            # Create a scroll area for the results
-            scroll_area = QtWidgets.QScrollArea()
-            scroll_area.setWidgetResizable(True)
-            scroll_widget = QtWidgets.QWidget()
-            scroll_layout = QtWidgets.QVBoxLayout(scroll_widget)
-            scroll_layout.setSpacing(10)
-            
-            for result in results_response.data:
-                exam_name = exam_names.get(result['exam_id'], 'Unknown')
-                result_card = QtWidgets.QWidget()
-                result_card.setStyleSheet('''
-                    QWidget {
-                        background: white;
-                        border-radius: 10px;
-                        padding: 15px;
-                        margin: 5px;
-                        border: 1px solid #E0E0E0;
-                    }
-                ''')
-                card_layout = QtWidgets.QVBoxLayout(result_card)
-                
-                exam_label = QtWidgets.QLabel(f"Exam: {exam_name}")
-                exam_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #333;")
-                
-                student_label = QtWidgets.QLabel(f"Student: {result['student_username']}")
-                student_label.setStyleSheet("font-size: 14px; color: #666;")
-                
-                score_label = QtWidgets.QLabel(f"Score: {result['score']}")
-                score_label.setStyleSheet("font-size: 14px; color: #666;")
-                
-                card_layout.addWidget(exam_label)
-                card_layout.addWidget(student_label)
-                card_layout.addWidget(score_label)
-                
-                scroll_layout.addWidget(result_card)
-            
-            scroll_area.setWidget(scroll_widget)
-            self.results_container_layout.addWidget(scroll_area)
+            # One summary card per exam instead of one card per submission
+            self.results_model = RecordListModel(
+                lambda row: stats_card_data(row[1], row[2]), exam_stats)
+            self.results_view = RecordListView(self.results_model)
+            self.results_view.setMinimumHeight(300)
+            self.results_container_layout.addWidget(self.results_view)
             
         except Exception as e:
             error_label = QtWidgets.QLabel(f"Failed to fetch results: {str(e)}")
@@ -402,46 +353,32 @@ class TeacherDashboard(QtWidgets.QWidget):
             if not supabase:
                 raise Exception("Failed to connect to Supabase")
             
-            response = supabase.table('users') \
-                .select('username') \
-                .eq('user_type', 'Student') \
-                .execute()
+            def fetch_students(offset, limit):
+                response = supabase.table('users') \
+                    .select('username') \
+                    .eq('user_type', 'Student') \
+                    .order('username') \
+                    .range(offset, offset + limit - 1) \
+                    .execute()
+                return response.data or []
             
-            if not response.data:
+            # Only the first page is fetched up front; the list asks for more while scrolling
+            page_size = 100
+            first_page = fetch_students(0, page_size)
+            if not first_page:
                 no_students_label = QtWidgets.QLabel("No students found in the system.")
                 no_students_label.setStyleSheet("font-size: 16px; color: #666; margin: 20px;")
                 no_students_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
                 self.students_container_layout.addWidget(no_students_label)
                 return
             
-            # Create a scroll area for the students
-            scroll_area = QtWidgets.QScrollArea()
-            scroll_area.setWidgetResizable(True)
-            scroll_widget = QtWidgets.QWidget()
-            scroll_layout = QtWidgets.QVBoxLayout(scroll_widget)
-            scroll_layout.setSpacing(10)
-            
-            for user in response.data:
-                student_card = QtWidgets.QWidget()
-                student_card.setStyleSheet('''
-                    QWidget {
-                        background: white;
-                        border-radius: 10px;
-                        padding: 15px;
-                        margin: 5px;
-                        border: 1px solid #E0E0E0;
-                    }
-                ''')
-                card_layout = QtWidgets.QVBoxLayout(student_card)
-                
-                username_label = QtWidgets.QLabel(f"Username: {user['username']}")
-                username_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #333;")
-                
-                card_layout.addWidget(username_label)
-                scroll_layout.addWidget(student_card)
-            
-            scroll_area.setWidget(scroll_widget)
-            self.students_container_layout.addWidget(scroll_area)
+            more = fetch_students if len(first_page) == page_size else None
+            self.students_model = RecordListModel(
+                lambda user: CardData(f"Username: {user['username']}"),
+                first_page, fetch_page=more, page_size=page_size)
+            self.students_view = RecordListView(self.students_model, uniform_rows=True)
+            self.students_view.setMinimumHeight(300)
+            self.students_container_layout.addWidget(self.students_view)
             
         except Exception as e:
             error_label = QtWidgets.QLabel(f"Failed to fetch students: {str(e)}")
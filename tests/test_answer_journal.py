@@ -0,0 +1,245 @@
+import threading
+import answer_journal
+from answer_journal import AnswerJournal
+from answer_key import AnswerKey
+from answer_log import AnswerLog
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, client, table_name):
+        self.client = client
+        self.table_name = table_name
+        self.filters = {}
+        self.rows = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def execute(self):
+        if self.rows is not None and self.client.on_write is not None:
+            self.client.on_write()
+        if self.client.fail:
+            raise IOError("database unreachable")
+        if self.rows is not None and self.client.gate is not None:
+            # Hold the write until the test releases it
+            self.client.writing.set()
+            self.client.gate.wait(5)
+        if self.rows is None:
+            return FakeResponse([row for row in self.client.tables.get(self.table_name, [])
+                                 if all(row.get(column) == value for column, value in self.filters.items())])
+        self.client.upserts.append((self.table_name, self.rows))
+        return FakeResponse(self.rows)
+
+
+class FakeRpc:
+    def __init__(self, function, params):
+        self.function = function
+        self.params = params
+
+    def execute(self):
+        if self.function is None:
+            raise Exception("function not found")
+        return FakeResponse(self.function(self.params))
+
+
+class FakeSupabase:
+    def __init__(self, tables=None, functions=None):
+        self.tables = tables or {}
+        self.functions = functions or {}
+        self.upserts = []
+        self.fail = False
+        self.gate = None
+        self.on_write = None
+        self.writing = threading.Event()
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        return FakeRpc(self.functions.get(name), params)
+
+    def written(self, table_name):
+        return [row for name, rows in self.upserts if name == table_name for row in rows]
+
+
+def make_key():
+    return AnswerKey.from_rows([
+        {'id': 10, 'correct_answer': 'Option 2', 'option1': 'red', 'option2': 'green', 'option3': 'blue', 'option4': 'pink'},
+        {'id': 11, 'correct_answer': 'Option 3', 'option1': 'three', 'option2': 'four', 'option3': 'five', 'option4': 'six'},
+    ])
+
+
+def make_journal(monkeypatch, client, log=None, **kwargs):
+    monkeypatch.setattr(answer_journal, "create_connection", lambda: client)
+    # A long interval keeps the background thread out of the way unless woken early
+    kwargs.setdefault('flush_interval', 60)
+    return AnswerJournal(7, "amy", make_key(), log, **kwargs)
+
+
+def test_restore_queues_unsynced_log_entries_again(monkeypatch, tmp_path):
+    client = FakeSupabase({'student_answers': [
+        {'exam_id': 7, 'student_username': "amy", 'question_id': 10, 'selected_answer': "green"},
+        {'exam_id': 7, 'student_username': "amy", 'question_id': 11, 'selected_answer': "three"},
+    ]})
+    log = AnswerLog(str(tmp_path / "answer_log.db"))
+    synced_seq = log.append(7, "amy", 10, 1)
+    log.mark_synced(7, "amy", synced_seq)
+    # The app crashed before this change reached the server
+    unsynced_seq = log.append(7, "amy", 11, 2)
+
+    journal = make_journal(monkeypatch, client, log)
+    assert journal.restore() == {10: 1, 11: 2}
+    assert journal.pending == {11: 2}
+    assert journal.last_seq == unsynced_seq
+
+    assert journal.flush()
+    assert [(row['question_id'], row['selected_answer']) for row in client.written('student_answers')] == [(11, "five")]
+    assert client.written('exam_results')[0]['score'] == 2
+    assert log.replay(7, "amy")[11] == (2, True, unsynced_seq)
+    journal.close()
+    log.close()
+
+
+def test_submit_waits_for_a_background_batch_in_flight(monkeypatch):
+    client = FakeSupabase()
+    client.gate = threading.Event()
+    journal = make_journal(monkeypatch, client, max_pending=1)
+    journal.record(10, 1)
+    assert client.writing.wait(5)
+
+    submitted = threading.Thread(target=journal.submit)
+    submitted.start()
+    submitted.join(0.2)
+    # The running score is still being written, so submit() must not have run
+    assert submitted.is_alive()
+    client.gate.set()
+    submitted.join(5)
+
+    results = client.written('exam_results')
+    assert [row['completed_at'] is None for row in results] == [True, False]
+
+
+def test_changes_to_one_question_are_coalesced(monkeypatch):
+    client = FakeSupabase()
+    journal = make_journal(monkeypatch, client)
+    journal.record(10, 0)
+    journal.record(10, 2)
+    journal.record(10, 1)
+    journal.record(11, 2)
+    assert journal.flush()
+    rows = client.written('student_answers')
+    assert [(row['question_id'], row['selected_answer'], row['is_correct']) for row in rows] == \
+        [(10, "green", True), (11, "five", True)]
+    assert client.written('exam_results') == [{'exam_id': 7, 'student_username': "amy", 'score': 2, 'completed_at': None}]
+    # Nothing left to write
+    assert journal.flush()
+    assert len(client.upserts) == 2
+    journal.close()
+
+
+def test_failed_batch_is_requeued_unless_a_newer_answer_exists(monkeypatch):
+    client = FakeSupabase()
+    journal = make_journal(monkeypatch, client)
+    journal.record(10, 0)
+    journal.record(11, 0)
+    client.fail = True
+    assert not journal.flush()
+    assert journal.pending == {10: 0, 11: 0}
+
+    # The student changes an answer while the failing write is in flight;
+    # the newer answer must win over the requeued one
+    client.on_write = lambda: journal.record(10, 1)
+    assert not journal.flush()
+    assert journal.pending == {10: 1, 11: 0}
+
+    client.on_write = None
+    client.fail = False
+    assert journal.flush()
+    assert [(row['question_id'], row['selected_answer']) for row in client.written('student_answers')] == \
+        [(10, "green"), (11, "three")]
+    journal.close()
+
+
+def test_max_pending_wakes_the_background_flush(monkeypatch):
+    client = FakeSupabase()
+    client.gate = threading.Event()
+    client.gate.set()
+    journal = make_journal(monkeypatch, client, max_pending=2)
+    journal.record(10, 1)
+    journal.record(11, 2)
+    assert client.writing.wait(5)
+    journal.close()
+    assert {row['question_id'] for row in client.written('student_answers')} == {10, 11}
+
+
+def test_restore_prefers_the_server_over_synced_log_entries(monkeypatch, tmp_path):
+    client = FakeSupabase({'student_answers': [
+        {'exam_id': 7, 'student_username': "amy", 'question_id': 10, 'selected_answer': "blue"},
+        # Not a question of this exam any more
+        {'exam_id': 7, 'student_username': "amy", 'question_id': 99, 'selected_answer': "blue"},
+    ]})
+    log = AnswerLog(str(tmp_path / "answer_log.db"))
+    log.mark_synced(7, "amy", log.append(7, "amy", 10, 1))
+    log.append(7, "amy", 99, 0)
+
+    journal = make_journal(monkeypatch, client, log)
+    assert journal.restore() == {10: 2}
+    assert journal.pending == {}
+    journal.close()
+    log.close()
+
+
+def test_restore_falls_back_to_the_log_when_the_server_is_unreachable(monkeypatch, tmp_path):
+    client = FakeSupabase()
+    client.fail = True
+    log = AnswerLog(str(tmp_path / "answer_log.db"))
+    log.mark_synced(7, "amy", log.append(7, "amy", 10, 1))
+    log.append(7, "amy", 11, 3)
+
+    journal = make_journal(monkeypatch, client, log)
+    assert journal.restore() == {10: 1, 11: 3}
+    # Only the unsynced answer needs writing again
+    assert journal.pending == {11: 3}
+    journal.close(flush=False)
+    log.close()
+
+
+def test_submit_sends_all_answers_to_the_rpc(monkeypatch):
+    calls = []
+    client = FakeSupabase(functions={'submit_exam_answers': lambda params: calls.append(params) or 1})
+    journal = make_journal(monkeypatch, client)
+    journal.record(10, 1)
+    journal.record(11, 0)
+    assert journal.submit() == 1
+    assert calls == [{
+        'p_exam_id': 7,
+        'p_student_username': "amy",
+        'p_answers': [{'question_id': 10, 'option_index': 1}, {'question_id': 11, 'option_index': 0}]
+    }]
+    # Pending answers go with the submission, not through a background flush
+    assert client.upserts == []
+    assert journal.closed
+
+
+def test_submit_falls_back_to_bulk_upserts_without_the_rpc(monkeypatch):
+    client = FakeSupabase()
+    journal = make_journal(monkeypatch, client)
+    journal.record(10, 1)
+    journal.record(11, 2)
+    assert journal.submit() == 2
+    assert [row['question_id'] for row in client.written('student_answers')] == [10, 11]
+    result, = client.written('exam_results')
+    assert result['score'] == 2 and result['completed_at'] is not None
@@ -0,0 +1,57 @@
+from answer_key import AnswerKey
+
+
+def make_key():
+    return AnswerKey.from_rows([
+        {'id': 10, 'correct_answer': 'Option 2', 'option1': 'red', 'option2': 'green', 'option3': 'blue', 'option4': 'pink'},
+        # Correct answer stored as text, not "Option N"
+        {'id': 11, 'correct_answer': 'four', 'option1': 'three', 'option2': 'four', 'option3': 'five', 'option4': 'six'},
+        # Duplicate option texts are both accepted
+        {'id': 12, 'correct_answer': 'Option 1', 'option1': 'yes', 'option2': 'no', 'option3': 'yes', 'option4': 'maybe'},
+        # No option matches the correct answer
+        {'id': 13, 'correct_answer': 'Option 4', 'option1': 'a', 'option2': 'b', 'option3': 'c', 'option4': None},
+    ])
+
+
+def test_is_correct_option_format():
+    key = make_key()
+    assert key.is_correct(10, 1)
+    assert not key.is_correct(10, 0)
+
+
+def test_is_correct_text_format():
+    key = make_key()
+    assert key.is_correct(11, 1)
+    assert not key.is_correct(11, 2)
+
+
+def test_duplicate_correct_options_all_count():
+    key = make_key()
+    assert key.is_correct(12, 0)
+    assert key.is_correct(12, 2)
+    assert not key.is_correct(12, 1)
+
+
+def test_unknown_question_or_no_answer_is_wrong():
+    key = make_key()
+    assert not key.is_correct(99, 0)
+    assert not key.is_correct(10, None)
+    assert not any(key.is_correct(13, i) for i in range(4))
+
+
+def test_score_counts_correct_answers():
+    key = make_key()
+    assert key.score({}) == 0
+    assert key.score({10: 1, 11: 1, 12: 2, 13: 3}) == 3
+    assert key.score({10: 0, 11: 0, 12: 1}) == 0
+    # Answers to questions outside the exam don't count
+    assert key.score({10: 1, 99: 0}) == 1
+
+
+def test_option_lookups():
+    key = make_key()
+    assert len(key) == 4
+    assert 10 in key and 99 not in key
+    assert key.option_text(10, 2) == 'blue'
+    assert key.option_index(11, 'five') == 2
+    assert key.option_index(11, 'seven') is None
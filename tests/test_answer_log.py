@@ -0,0 +1,56 @@
+from answer_log import AnswerLog
+
+
+def make_log(tmp_path, **kwargs):
+    return AnswerLog(str(tmp_path / "logs" / "answer_log.db"), **kwargs)
+
+
+def test_append_returns_increasing_sequence_numbers(tmp_path):
+    log = make_log(tmp_path)
+    seqs = [log.append(7, "amy", question_id, 0) for question_id in (10, 11, 12)]
+    assert seqs == sorted(seqs) and len(set(seqs)) == 3
+    log.close()
+
+
+def test_replay_keeps_the_latest_event_per_question(tmp_path):
+    log = make_log(tmp_path)
+    log.append(7, "amy", 10, 0)
+    latest = log.append(7, "amy", 10, 3)
+    log.append(7, "bob", 10, 1)
+    log.append(8, "amy", 10, 2)
+    assert log.replay(7, "amy") == {10: (3, False, latest)}
+    log.close()
+
+
+def test_mark_synced_only_marks_up_to_the_sequence_number(tmp_path):
+    log = make_log(tmp_path)
+    first = log.append(7, "amy", 10, 0)
+    second = log.append(7, "amy", 11, 1)
+    log.append(7, "bob", 10, 0)
+    log.mark_synced(7, "amy", first)
+    assert log.replay(7, "amy") == {10: (0, True, first), 11: (1, False, second)}
+    assert log.replay(7, "bob")[10][1] is False
+    log.close()
+
+
+def test_clear_drops_only_one_attempt(tmp_path):
+    log = make_log(tmp_path)
+    log.append(7, "amy", 10, 0)
+    log.append(7, "bob", 10, 1)
+    log.clear(7, "amy")
+    assert log.replay(7, "amy") == {}
+    assert 10 in log.replay(7, "bob")
+    log.close()
+
+
+def test_events_survive_reopening(tmp_path):
+    log = make_log(tmp_path, sync_every=2)
+    seq = log.append(7, "amy", 10, 2)
+    log.append(7, "amy", 11, 1)
+    assert log.unsynced_events == 0
+    # Simulate a crash: the connection goes away without close()
+    log.conn.close()
+
+    reopened = make_log(tmp_path)
+    assert reopened.replay(7, "amy")[10] == (2, False, seq)
+    reopened.close()
@@ -0,0 +1,39 @@
+import datetime
+from student_dashboard import StudentDashboard
+
+
+def exam(exam_id, start, end):
+    return {'id': exam_id, 'name': f"Exam {exam_id}", 'duration': 30, 'start_time': start, 'end_time': end}
+
+
+def classify(exams, now):
+    # classify_exams doesn't use the widget, so no dashboard needs to be built
+    return StudentDashboard.classify_exams(None, exams, now)
+
+
+def test_exams_are_split_by_time():
+    exams = [exam(1, '09:00:00', '10:00:00'), exam(2, '11:00:00', '12:00:00'), exam(3, '07:00:00', '08:00:00')]
+    available, upcoming, expired = classify(exams, datetime.time(9, 30))
+    assert [e[0] for e in available] == [1]
+    assert [e[0] for e in upcoming] == [2]
+    assert [e[0] for e in expired] == [3]
+
+
+def test_window_bounds_are_inclusive():
+    exams = [exam(1, '09:00:00', '10:00:00')]
+    assert classify(exams, datetime.time(9, 0))[0]
+    assert classify(exams, datetime.time(10, 0))[0]
+    assert classify(exams, datetime.time(10, 0, 1))[2]
+
+
+def test_rows_carry_parsed_times_in_input_order():
+    exams = [exam(2, '13:00:00', '14:00:00'), exam(1, '12:00:00', '15:00:00')]
+    _, upcoming, _ = classify(exams, datetime.time(8, 0))
+    assert upcoming == [
+        (2, "Exam 2", 30, datetime.time(13, 0), datetime.time(14, 0)),
+        (1, "Exam 1", 30, datetime.time(12, 0), datetime.time(15, 0)),
+    ]
+
+
+def test_no_exams():
+    assert classify([], datetime.time(12, 0)) == ([], [], [])
@@ -0,0 +1,81 @@
+import pytest
+import cpu_governor
+from cpu_governor import CpuGovernor
+
+CALM = {"violation_type": None, "is_timeout": False}
+ALERT = {"violation_type": "not_facing_camera", "is_timeout": False}
+
+
+class FakeProcessClock:
+    """Stands in for time.process_time so process CPU share is under test control"""
+
+    def __init__(self):
+        self.cpu = 0.0
+
+    def __call__(self):
+        return self.cpu
+
+
+@pytest.fixture
+def process_clock(monkeypatch):
+    clock = FakeProcessClock()
+    monkeypatch.setattr(cpu_governor.time, "process_time", clock)
+    return clock
+
+
+def run(governor, clock, seconds, share, result=CALM, start=0.0, frame_cost=0.001):
+    """Feed frames at the governor's own pace while the process uses `share` of a core"""
+    now = start
+    while now < start + seconds:
+        interval = governor.update(result, frame_cost, now)
+        clock.cpu += share * interval
+        now += interval
+    return now
+
+
+def test_interval_follows_proctoring_state(process_clock):
+    governor = CpuGovernor(budget=0.15, relax_after=30)
+    assert governor.update(CALM, 0.001, 0.0) == pytest.approx(governor.normal_interval)
+    assert governor.update(ALERT, 0.001, 1.0) == pytest.approx(governor.alert_interval)
+    assert governor.update(CALM, 0.001, 2.0) == pytest.approx(governor.normal_interval)
+    assert governor.update(CALM, 0.001, 40.0) == pytest.approx(governor.relaxed_interval)
+
+
+def test_expensive_frames_stretch_the_interval(process_clock):
+    governor = CpuGovernor(budget=0.1)
+    # 50 ms per detection at a 10% budget allows one detection every 0.5 s
+    assert governor.update(CALM, 0.05, 0.0) == pytest.approx(0.5)
+    # A violation doubles the budget
+    assert governor.update(ALERT, 0.05, 0.5) == pytest.approx(0.25)
+
+
+def test_process_over_budget_backs_off_then_lowers_resolution(process_clock):
+    governor = CpuGovernor(budget=0.1, window=2.0)
+    now = run(governor, process_clock, 20, share=0.5)
+    assert governor.windows_over_budget > 0
+    assert governor.interval == pytest.approx(governor.max_interval)
+    assert governor.scale < 1.0
+
+    # Once usage drops, resolution and interval recover
+    run(governor, process_clock, 60, share=0.01, start=now)
+    assert governor.scale == 1.0
+    assert governor.backoff == 1.0
+    # Compliant for over relax_after seconds by now
+    assert governor.interval == pytest.approx(governor.relaxed_interval)
+
+
+def test_within_budget_keeps_full_resolution(process_clock):
+    governor = CpuGovernor(budget=0.15, window=2.0)
+    run(governor, process_clock, 30, share=0.05)
+    assert governor.scale == 1.0
+    assert governor.backoff == 1.0
+    assert governor.windows > 0 and governor.windows_over_budget == 0
+
+
+def test_stats(process_clock):
+    governor = CpuGovernor()
+    governor.update(ALERT, 0.002, 0.0)
+    stats = governor.stats()
+    assert stats["frames"] == 1 and stats["alert_frames"] == 1
+    assert stats["frame_cost_ms"] == 2.0
+    assert stats["scale"] == 1.0
@@ -0,0 +1,112 @@
+import time
+import cv2
+import numpy as np
+from evidence_buffer import EvidenceRing, EvidenceRecorder, encode_strip
+
+
+def frame(value):
+    return np.full((480, 640), value, dtype=np.uint8)
+
+
+def test_push_samples_about_fps_frames_per_second():
+    ring = EvidenceRing(seconds=2, fps=5, width=16, height=12)
+    stored = [ring.push(frame(i), now=i * 0.1) for i in range(10)]
+    assert stored == [True, False] * 5
+    assert ring.count == 5
+
+
+def test_push_tolerates_jitter_at_the_sampling_rate():
+    # Detection runs at the evidence rate; a frame slightly early must not be skipped
+    ring = EvidenceRing(seconds=2, fps=5, width=16, height=12)
+    times = np.cumsum([0.0, 0.199, 0.201, 0.195, 0.205, 0.19])
+    assert all(ring.push(frame(1), now=t) for t in times)
+    assert not ring.push(frame(1), now=times[-1] + 0.1)
+
+
+def test_push_downscales_into_the_ring():
+    ring = EvidenceRing(seconds=1, fps=2, width=16, height=12)
+    ring.push(frame(77), now=0.0)
+    frames, timestamps = ring.snapshot()
+    assert frames.shape == (1, 12, 16)
+    assert (frames == 77).all()
+    assert list(timestamps) == [0.0]
+
+
+def test_snapshot_is_oldest_first_after_wrapping():
+    ring = EvidenceRing(seconds=1, fps=4, width=8, height=6)
+    assert ring.capacity == 4
+    for i in range(7):
+        ring.push(frame(i * 10), now=i * 0.25)
+    frames, timestamps = ring.snapshot()
+    assert list(timestamps) == [0.75, 1.0, 1.25, 1.5]
+    assert [int(f[0, 0]) for f in frames] == [30, 40, 50, 60]
+
+
+def test_snapshot_since_and_copies():
+    ring = EvidenceRing(seconds=1, fps=4, width=8, height=6)
+    for i in range(4):
+        ring.push(frame(i), now=i * 0.25)
+    frames, timestamps = ring.snapshot(since=0.5)
+    assert list(timestamps) == [0.5, 0.75]
+    frames[:] = 255
+    assert int(ring.snapshot()[0][2, 0, 0]) == 2
+
+
+def test_clear():
+    ring = EvidenceRing(seconds=1, fps=4, width=8, height=6)
+    ring.push(frame(1), now=0.0)
+    ring.clear()
+    assert len(ring.snapshot()[0]) == 0
+    # The sampling interval restarts too
+    assert ring.push(frame(1), now=0.01)
+
+
+def test_encode_strip_lays_out_keyframes():
+    ring = EvidenceRing(seconds=4, fps=5, width=32, height=24)
+    for i in range(20):
+        ring.push(frame(i * 10), now=1000.0 + i * 0.2)
+    data = encode_strip(*ring.snapshot(), max_frames=8, columns=4)
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+    assert image.shape == (2 * 24, 4 * 32)
+
+
+def test_encode_strip_with_fewer_frames_than_cells():
+    ring = EvidenceRing(seconds=1, fps=5, width=32, height=24)
+    for i in range(3):
+        ring.push(frame(100), now=i * 0.2)
+    image = cv2.imdecode(np.frombuffer(encode_strip(*ring.snapshot()), np.uint8), cv2.IMREAD_GRAYSCALE)
+    assert image.shape == (24, 4 * 32)
+
+
+class SlowStore:
+    def __init__(self, delay):
+        self.delay = delay
+        self.saved = []
+
+    def save(self, path, data, content_type):
+        time.sleep(self.delay)
+        self.saved.append(path)
+
+
+def make_recorder(store):
+    ring = EvidenceRing(seconds=1, fps=5, width=16, height=12)
+    recorder = EvidenceRecorder("7/amy", store=store, ring=ring)
+    recorder.push(frame(1), now=0.0)
+    return recorder
+
+
+def test_close_waits_for_a_pending_upload():
+    store = SlowStore(0.3)
+    recorder = make_recorder(store)
+    path = recorder.capture("not_facing", now=1.0)
+    recorder.close(timeout=5.0)
+    assert store.saved == [path]
+    assert recorder.stats()["captures_saved"] == 1
+
+
+def test_close_timeout_bounds_the_total_wait():
+    recorder = make_recorder(SlowStore(2.0))
+    recorder.capture("not_facing", now=1.0)
+    started = time.monotonic()
+    recorder.close(timeout=0.3)
+    assert time.monotonic() - started < 1.0
@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+import pytest
+from frame_pipeline import FramePipeline
+from gaze_backends import GazeBackend
+from gaze_detection import GazeDetection
+
+
+class FixedBackend(GazeBackend):
+    name = "fixed"
+
+    def detect(self, context):
+        return None, False
+
+
+def textured_frame(seed=0, blur=0):
+    """640x480 BGR frame with fine detail, optionally blurred"""
+    rng = np.random.default_rng(seed)
+    gray = cv2.resize(rng.integers(0, 256, (120, 160), dtype=np.uint8), (640, 480), interpolation=cv2.INTER_CUBIC)
+    frame = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+    if blur:
+        frame = cv2.GaussianBlur(frame, (0, 0), blur)
+    return frame
+
+
+def reference_clarity(frame):
+    """The full-resolution measure the quality threshold was calibrated on"""
+    return cv2.Laplacian(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), cv2.CV_64F).var()
+
+
+@pytest.mark.parametrize("blur", [0, 1.5, 4])
+def test_clarity_matches_full_resolution_laplacian(blur):
+    frame = textured_frame(blur=blur)
+    context = FramePipeline().prepare(frame)
+    assert context.clarity == pytest.approx(reference_clarity(frame), rel=1e-9)
+
+
+def test_clarity_and_brightness_ignore_detection_scale():
+    frame = textured_frame(seed=3)
+    full = FramePipeline().prepare(frame)
+    clarity, brightness = full.clarity, full.brightness
+    scaled = FramePipeline(detection_scale=0.6).prepare(frame)
+    assert scaled.clarity == pytest.approx(clarity)
+    assert scaled.brightness == pytest.approx(brightness)
+    assert scaled.gray.shape == (288, 384)
+    assert scaled.frame_gray.shape == (480, 640)
+    assert scaled.scale == 0.6
+
+
+def test_brightness_is_mean_of_gray():
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    assert FramePipeline().prepare(frame).brightness == pytest.approx(90)
+
+
+def test_quality_check_passes_sharp_and_rejects_blurred_frames():
+    detector = GazeDetection(backend=FixedBackend())
+    sharp = textured_frame(seed=1)
+    blurred = textured_frame(seed=1, blur=4)
+    assert reference_clarity(sharp) > detector.CLARITY_THRESHOLD > reference_clarity(blurred)
+    assert detector.check_image_quality(sharp)
+    assert not detector.check_image_quality(blurred)
+
+
+def test_quality_check_rejects_dark_frames():
+    detector = GazeDetection(backend=FixedBackend())
+    dark = (textured_frame(seed=2) // 10).astype(np.uint8)
+    assert not detector.check_image_quality(dark)
+
+
+def test_buffers_follow_frame_size_changes():
+    pipeline = FramePipeline()
+    pipeline.prepare(textured_frame())
+    small = cv2.resize(textured_frame(), (320, 240))
+    context = pipeline.prepare(small)
+    assert context.frame_gray.shape == (240, 320)
+    assert context.clarity == pytest.approx(reference_clarity(small))
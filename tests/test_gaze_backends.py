@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+import gaze_backends
+from frame_pipeline import FramePipeline
+from gaze_backends import GazeBackend, HaarBackend, scale_box
+
+# Where the fake face sits, in camera frame coordinates
+FACE = (200, 100, 200, 200)
+
+
+class FakeCascade:
+    """Finds FACE (face cascade) or two level eyes (eye cascade) in whatever image it is given"""
+
+    def __init__(self, path):
+        self.is_eye = "eye" in path
+        self.calls = []
+        self.scale = 1.0
+        self.offset = (0, 0)
+
+    def detectMultiScale(self, image, **kwargs):
+        self.calls.append((image.shape, kwargs["minSize"]))
+        if self.is_eye:
+            return np.array([[20, 40, 40, 40], [130, 42, 40, 40]])
+        x, y, w, h = scale_box(FACE, self.scale)
+        return np.array([[x - self.offset[0], y - self.offset[1], w, h]])
+
+
+@pytest.fixture
+def haar(monkeypatch):
+    monkeypatch.setattr(gaze_backends.os.path, "exists", lambda path: True)
+    # raising=False: some OpenCV builds ship without the cascade module
+    monkeypatch.setattr(gaze_backends.cv2, "CascadeClassifier", FakeCascade, raising=False)
+    return HaarBackend()
+
+
+def frame():
+    return np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+def test_backend_must_implement_detect():
+    with pytest.raises(TypeError):
+        GazeBackend()
+
+
+def test_scale_box():
+    assert scale_box((100, 50, 30, 30), 0.6) == (60, 30, 18, 18)
+    assert scale_box(scale_box(FACE, 0.6), 1 / 0.6) == FACE
+
+
+@pytest.mark.parametrize("scale", [1.0, 0.75, 0.6])
+def test_full_scan_reports_frame_coordinates(haar, scale):
+    haar.face_cascade.scale = scale
+    context = FramePipeline(detection_scale=scale).prepare(frame())
+    face, facing = haar.detect(context)
+    assert face == FACE
+    assert facing
+
+    # The face search ran on the detection image with a scaled minimum size
+    (shape, min_size), = haar.face_cascade.calls
+    assert shape == context.gray.shape
+    assert min_size[0] == round(HaarBackend.MIN_FACE_SIZE * scale)
+
+    # The eye check ran on the full-resolution face region with its usual minimum
+    (eye_shape, eye_min), = haar.eye_check.eye_cascade.calls
+    assert eye_shape == (int(FACE[3] * haar.eye_check.EYE_REGION_HEIGHT), FACE[2])
+    assert eye_min == (20, 20)
+
+
+def test_track_survives_a_detection_scale_change(haar):
+    haar.detect(FramePipeline().prepare(frame()))
+    assert haar.last_face == FACE
+
+    pipeline = FramePipeline(detection_scale=0.6)
+    haar.face_cascade.scale = 0.6
+    # The tracked search gets a region around the last face, in detection image coordinates
+    x, y, w, h = scale_box(FACE, 0.6)
+    pad = int(haar.TRACK_PADDING * max(w, h))
+    haar.face_cascade.offset = (x - pad, y - pad)
+
+    face, _ = haar.detect(pipeline.prepare(frame()))
+    assert face == FACE
+    assert haar.tracked_scans == 1 and haar.full_scans == 1
+
+
+def test_detection_frame_is_scaled_color_frame(haar):
+    image = frame()
+    assert haar.detection_frame(FramePipeline().prepare(image)) is image
+    scaled = haar.detection_frame(FramePipeline(detection_scale=0.5).prepare(image))
+    assert scaled.shape == (240, 320, 3)
@@ -0,0 +1,49 @@
+from gaze_status import GazeStatus, StatusThrottle
+
+
+def status(text="Properly facing camera", **kwargs):
+    return GazeStatus(text, is_camera_clear=True, is_face_detected=True, **kwargs)
+
+
+def test_same_state_ignores_capture_latency():
+    assert status(capture_latency_ms=12.0).same_state(status(capture_latency_ms=80.0))
+    assert not status().same_state(status(violation_seconds=1))
+    assert not status().same_state(None)
+
+
+def test_unchanged_status_is_sent_once():
+    throttle = StatusThrottle(max_rate=5)
+    assert throttle.should_send(status(), now=0.0)
+    assert not throttle.should_send(status(), now=1.0)
+    assert throttle.stats() == {"statuses_seen": 2, "statuses_sent": 1}
+
+
+def test_changes_are_capped_and_sent_once_the_cap_allows():
+    throttle = StatusThrottle(max_rate=5)
+    assert throttle.should_send(status("a"), now=0.0)
+    assert not throttle.should_send(status("b"), now=0.1)
+    # The held back change goes out on the next frame after the interval
+    assert throttle.should_send(status("b"), now=0.2)
+    assert not throttle.should_send(status("c"), now=0.3)
+
+
+def test_events_are_always_sent():
+    throttle = StatusThrottle(max_rate=5)
+    assert throttle.should_send(status(), now=0.0)
+    assert throttle.should_send(status(violation_triggered=True), now=0.01)
+    assert throttle.should_send(status(violation_triggered=True), now=0.02)
+    assert throttle.should_send(GazeStatus.error("Camera not available"), now=0.03)
+    assert throttle.should_send(status(is_timeout=True), now=0.04)
+
+
+def test_keepalive_after_silence():
+    throttle = StatusThrottle(keepalive=2.0)
+    throttle.should_send(status(), now=10.0)
+    assert not throttle.needs_keepalive(now=11.9)
+    assert throttle.needs_keepalive(now=12.0)
+    throttle.mark_keepalive(now=12.0)
+    assert not throttle.needs_keepalive(now=13.0)
+    # Any sent status also counts as a message
+    throttle.should_send(status("changed"), now=13.5)
+    assert not throttle.needs_keepalive(now=15.0)
+    assert throttle.needs_keepalive(now=15.5)
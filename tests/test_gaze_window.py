@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from gaze_window import FeatureWindow, Hysteresis
+
+
+def push(window, now, face=True, facing=True, clear=True, clarity=150.0, brightness=100.0, box=None):
+    window.push(now, face, facing, clear, clarity, brightness, box)
+
+
+def test_fractions_over_the_time_window():
+    window = FeatureWindow(capacity=16)
+    for i in range(10):
+        push(window, i * 0.2, facing=i >= 5)
+    # The window start is inclusive, so the last 0.9 s holds 1.0 .. 1.8, all facing
+    assert window.fraction('facing', 0.9, now=1.8) == 1.0
+    assert window.fraction('facing', 2.0, now=1.8) == pytest.approx(5 / 10)
+    fractions = window.fractions(2.0, now=1.8)
+    assert fractions == {'face': 1.0, 'facing': pytest.approx(0.5), 'clear': 1.0}
+
+
+def test_slow_frames_widen_to_min_frames():
+    window = FeatureWindow(capacity=16)
+    push(window, 0.0, facing=False)
+    push(window, 5.0, facing=True)
+    push(window, 10.0, facing=True)
+    # Only one frame in the last second; the newest three are used instead
+    assert window.fraction('facing', 1.0, now=10.0, min_frames=3) == pytest.approx(2 / 3)
+
+
+def test_empty_window():
+    window = FeatureWindow()
+    assert window.fraction('face', 1.0, now=0.0) is None
+    assert window.fractions(1.0, now=0.0) == {}
+    assert window.mean('clarity', 1.0, now=0.0) is None
+
+
+def test_ring_overwrites_oldest_frames():
+    window = FeatureWindow(capacity=4)
+    for i in range(6):
+        push(window, float(i), face=i >= 2)
+    assert window.count == 4
+    assert window.fraction('face', 100.0, now=5.0) == 1.0
+
+
+def test_mean_and_face_boxes_oldest_first():
+    window = FeatureWindow(capacity=4)
+    push(window, 0.0, clarity=100.0, box=(1, 1, 10, 10))
+    push(window, 0.1, face=False, clarity=200.0)
+    push(window, 0.2, clarity=300.0, box=(3, 3, 10, 10))
+    push(window, 0.3, clarity=400.0, box=(4, 4, 10, 10))
+    push(window, 0.4, clarity=500.0, box=(5, 5, 10, 10))
+    assert window.mean('clarity', 1.0, now=0.4) == pytest.approx(350.0)
+    boxes = window.face_boxes(1.0, now=0.4)
+    assert boxes[:, 0].tolist() == [3, 4, 5]
+
+
+def test_clear():
+    window = FeatureWindow()
+    push(window, 0.0)
+    window.clear()
+    assert window.count == 0
+    assert window.fraction('face', 1.0, now=0.0) is None
+
+
+def test_hysteresis_only_flips_past_the_thresholds():
+    state = Hysteresis(initial=True, low=0.3, high=0.7)
+    assert state.update(0.5) is True
+    assert state.update(0.31) is True
+    assert state.update(0.29) is False
+    assert state.update(0.69) is False
+    assert state.update(None) is False
+    assert state.update(0.71) is True
+    state.update(0.0)
+    state.reset()
+    assert state.state is True
+
+
+def test_single_flickering_frame_does_not_flip_the_state():
+    window = FeatureWindow(capacity=16)
+    facing = Hysteresis(initial=False)
+    states = []
+    for i in range(15):
+        # Steadily facing except for one dropped detection
+        push(window, i * 0.2, facing=i != 8)
+        states.append(facing.update(window.fraction('facing', 1.0, now=i * 0.2)))
+    assert states[0] is True
+    assert all(states)
+    assert np.count_nonzero(window.flags['facing']) == 14
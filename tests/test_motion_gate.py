@@ -0,0 +1,69 @@
+import numpy as np
+from motion_gate import MotionGate
+
+
+def still(value=100):
+    return np.full((240, 320), value, dtype=np.uint8)
+
+
+def evaluate(gate, image, now):
+    """Run the gate the way GazeDetection does; returns whether detection ran"""
+    if gate.should_evaluate(image, now):
+        gate.mark_evaluated(0.01, now)
+        return True
+    return False
+
+
+def test_first_frame_is_evaluated():
+    assert MotionGate().should_evaluate(still(), now=0.0)
+
+
+def test_unchanged_frames_reuse_the_verdict():
+    gate = MotionGate(max_stale_frames=100, max_stale_seconds=100)
+    evaluate(gate, still(), 0.0)
+    assert [evaluate(gate, still(), 0.1 * i) for i in range(1, 6)] == [False] * 5
+    assert gate.frames_skipped == 5
+
+
+def test_motion_forces_evaluation():
+    gate = MotionGate(threshold=4.0, max_stale_frames=100, max_stale_seconds=100)
+    evaluate(gate, still(100), 0.0)
+    assert not evaluate(gate, still(102), 0.1)
+    assert evaluate(gate, still(110), 0.2)
+
+
+def test_slow_drift_adds_up():
+    gate = MotionGate(threshold=4.0, max_stale_frames=100, max_stale_seconds=100)
+    evaluate(gate, still(100), 0.0)
+    # Each frame differs from the previous by 1, but from the last evaluated one by more
+    results = [evaluate(gate, still(100 + i), 0.1 * i) for i in range(1, 7)]
+    assert results == [False, False, False, False, True, False]
+
+
+def test_stale_limits_force_evaluation():
+    gate = MotionGate(max_stale_frames=3, max_stale_seconds=100)
+    evaluate(gate, still(), 0.0)
+    assert [evaluate(gate, still(), 0.1 * i) for i in range(1, 5)] == [False, False, False, True]
+
+    gate = MotionGate(max_stale_frames=100, max_stale_seconds=1.0)
+    evaluate(gate, still(), 0.0)
+    assert not evaluate(gate, still(), 0.5)
+    assert evaluate(gate, still(), 1.0)
+
+
+def test_reset_forces_evaluation():
+    gate = MotionGate(max_stale_frames=100, max_stale_seconds=100)
+    evaluate(gate, still(), 0.0)
+    gate.reset()
+    assert evaluate(gate, still(), 0.1)
+
+
+def test_stats():
+    gate = MotionGate(max_stale_frames=100, max_stale_seconds=100)
+    for i in range(4):
+        evaluate(gate, still(), 0.1 * i)
+    stats = gate.stats()
+    assert stats["frames_seen"] == 4
+    assert stats["frames_skipped"] == 3
+    assert stats["skip_rate"] == 0.75
+    assert stats["cpu_saved_seconds"] >= 0.0
@@ -0,0 +1,97 @@
+import json
+import threading
+import proctoring_events
+from proctoring_events import ProctoringEvent, ProctoringEventQueue, JsonlEventSink, instant_event
+
+
+class ListSink:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.rows = []
+        self.written = threading.Event()
+
+    def write(self, rows):
+        if self.fail:
+            raise IOError("database unreachable")
+        self.rows.extend(rows)
+        self.written.set()
+
+
+def make_queue(sink, **kwargs):
+    # A long interval keeps the background thread out of the way unless woken early
+    kwargs.setdefault('flush_interval', 60)
+    return ProctoringEventQueue(7, "amy", sink=sink, **kwargs)
+
+
+def test_to_row():
+    event = ProctoringEvent(proctoring_events.NOT_FACING, 100.0, 112.5, confidence=0.8234, details={"a": 1})
+    row = event.to_row(7, "amy")
+    assert row['exam_id'] == 7 and row['student_username'] == "amy"
+    assert row['event_type'] == "not_facing_camera"
+    assert row['duration_seconds'] == 12.5
+    assert row['confidence'] == 0.823
+    assert row['started_at'].startswith("1970-01-01T00:01:40")
+    assert instant_event(proctoring_events.FOCUS_LOST).duration == 0.0
+
+
+def test_events_are_written_in_one_batch_on_flush():
+    sink = ListSink()
+    events = make_queue(sink)
+    for i in range(3):
+        events.record(instant_event(proctoring_events.SCREEN_CHANGED, {"i": i}))
+    assert sink.rows == []
+    assert events.flush()
+    assert [row['details']['i'] for row in sink.rows] == [0, 1, 2]
+    assert events.events_written == 3
+    events.close()
+
+
+def test_max_pending_wakes_the_background_flush():
+    sink = ListSink()
+    events = make_queue(sink, max_pending=2)
+    events.record(instant_event(proctoring_events.FOCUS_LOST))
+    events.record(instant_event(proctoring_events.FOCUS_LOST))
+    assert sink.written.wait(5)
+    events.close()
+
+
+def test_failed_batches_are_kept_and_retried_in_order():
+    sink = ListSink(fail=True)
+    events = make_queue(sink)
+    events.record(instant_event(proctoring_events.FOCUS_LOST, {"i": 0}))
+    assert not events.flush()
+    events.record(instant_event(proctoring_events.FOCUS_LOST, {"i": 1}))
+    sink.fail = False
+    assert events.flush()
+    assert [row['details']['i'] for row in sink.rows] == [0, 1]
+
+
+def test_buffer_drops_oldest_events_beyond_its_limit():
+    sink = ListSink(fail=True)
+    events = make_queue(sink, max_buffered=3)
+    for i in range(5):
+        events.record(instant_event(proctoring_events.FOCUS_LOST, {"i": i}))
+    assert not events.flush()
+    assert events.events_dropped == 2
+    sink.fail = False
+    assert events.close()
+    assert [row['details']['i'] for row in sink.rows] == [2, 3, 4]
+
+
+def test_close_without_flush_discards_and_rejects_later_events():
+    sink = ListSink()
+    events = make_queue(sink)
+    events.record(instant_event(proctoring_events.FOCUS_LOST))
+    assert events.close(flush=False)
+    assert events.closed
+    events.record(instant_event(proctoring_events.FOCUS_LOST))
+    assert events.flush()
+    assert sink.rows == []
+
+
+def test_jsonl_sink_appends_rows(tmp_path):
+    path = tmp_path / "log" / "events.jsonl"
+    sink = JsonlEventSink(str(path))
+    sink.write([{"a": 1}])
+    sink.write([{"b": 2}, {"c": 3}])
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [{"a": 1}, {"b": 2}, {"c": 3}]
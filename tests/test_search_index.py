@@ -0,0 +1,52 @@
+import random
+import string
+from search_index import NgramIndex, escape_like
+
+USERNAMES = ["alice", "Bob", "charlie", "alicia", "malik", None, "ALI", "bobby_tables", "li", "x"]
+
+
+def linear_scan(keys, text):
+    text = text.lower()
+    return {row for row, key in enumerate(keys) if text in (key or "").lower()}
+
+
+def test_empty_query_matches_everything():
+    assert NgramIndex(USERNAMES).search("") is None
+
+
+def test_short_queries_use_single_postings():
+    index = NgramIndex(USERNAMES)
+    assert index.search("li") == linear_scan(USERNAMES, "li")
+    assert index.search("B") == linear_scan(USERNAMES, "b")
+    assert index.search("q") == set()
+
+
+def test_long_queries_confirm_the_substring():
+    index = NgramIndex(["abcxbcd", "abcd"])
+    # Both keys contain the trigrams "abc" and "bcd"; only one contains "abcd"
+    assert index.search("abcd") == {1}
+
+
+def test_matches_linear_scan_on_random_keys():
+    rng = random.Random(7)
+    keys = ["".join(rng.choice("abc_") for _ in range(rng.randint(0, 8))) for _ in range(300)]
+    index = NgramIndex(keys)
+    for _ in range(200):
+        text = "".join(rng.choice("abc_") for _ in range(rng.randint(1, 6)))
+        assert index.search(text) == linear_scan(keys, text), text
+
+
+def test_refining_within_previous_matches():
+    index = NgramIndex(USERNAMES)
+    first = index.search("al")
+    assert index.search("ali", within=first) == linear_scan(USERNAMES, "ali")
+    assert index.search("alic", within=first) == linear_scan(USERNAMES, "alic")
+
+
+def test_len():
+    assert len(NgramIndex(USERNAMES)) == len(USERNAMES)
+
+
+def test_escape_like():
+    assert escape_like("50%_off\\") == "50\\%\\_off\\\\"
+    assert escape_like(string.ascii_letters) == string.ascii_letters
@@ -0,0 +1,53 @@
+import numpy as np
+from proctoring_engine import SharedPreview
+
+
+def make_preview(width=8, height=6):
+    return SharedPreview(bytearray(SharedPreview.size(width, height)), width, height)
+
+
+def frame(value, width=8, height=6):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_frames_alternate_between_the_two_slots():
+    preview = make_preview()
+    assert preview.seq == 0
+    assert preview.write(frame(1)) == 1
+    assert preview.write(frame(2)) == 2
+    assert preview.seq == 2
+    assert (preview.slots[1] == 1).all()
+    assert (preview.slots[0] == 2).all()
+
+
+def test_write_downscales_larger_frames():
+    preview = make_preview()
+    preview.write(frame(50, width=32, height=24))
+    assert (preview.slots[1] == 50).all()
+
+
+def test_frame_stays_intact_until_its_slot_is_reused():
+    preview = make_preview()
+    seq = preview.write(frame(1))
+    assert preview.is_intact(seq)
+    preview.write(frame(2))
+    assert preview.is_intact(seq)
+
+    # The writer marks the slot of frame seq + 2 before touching it
+    preview.header[0] = 2 * (seq + 2) - 1
+    assert not preview.is_intact(seq)
+    # While the slot is being written, the newest complete frame is still seq + 1
+    assert preview.seq == seq + 1
+    assert preview.is_intact(seq + 1)
+
+
+def test_reused_slot_is_detected_after_the_copy():
+    preview = make_preview()
+    preview.write(frame(1))
+    seq = preview.seq
+    copied = preview.slots[seq % 2].copy()
+    preview.write(frame(2))
+    preview.write(frame(3))
+    # Frame 3 reused the slot of frame 1 after the copy was taken
+    assert not preview.is_intact(seq)
+    assert (copied == 1).all()
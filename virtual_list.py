@@ -0,0 +1,330 @@
+import logging
+from PyQt6 import QtWidgets, QtCore, QtGui
+
+# Custom item data roles
+RecordRole = QtCore.Qt.ItemDataRole.UserRole + 1
+CardRole = QtCore.Qt.ItemDataRole.UserRole + 2
+
+
+class CardData:
+    """Display content of one card row, produced on demand by a formatter"""
+
+    __slots__ = ('title', 'lines', 'badge', 'badge_color', 'title_color', 'background', 'border', 'is_header')
+
+    def __init__(self, title, lines=(), badge=None, badge_color='#666666', title_color='#333333',
+                 background='#FFFFFF', border='#E0E0E0', is_header=False):
+        """
+        Args:
+            title (str): Bold first line of the card
+            lines (list): Secondary lines shown under the title
+            badge (str): Optional status text shown in the top right corner
+            badge_color (str): Badge text color
+            title_color (str): Title text color
+            background (str): Card background color
+            border (str): Card border color
+            is_header (bool): Draw as a section header instead of a card
+        """
+        self.title = title
+        self.lines = tuple(lines)
+        self.badge = badge
+        self.badge_color = badge_color
+        self.title_color = title_color
+        self.background = background
+        self.border = border
+        self.is_header = is_header
+
+
+class ListAction:
+    """A button drawn on every card of a list, e.g. Edit or Remove"""
+
+    __slots__ = ('label', 'callback', 'background', 'foreground')
+
+    def __init__(self, label, callback, background='#FFFFFF', foreground='#6C63FF'):
+        """
+        Args:
+            label (str): Button text
+            callback (callable): Called with the row's record when clicked
+            background (str): Button fill color
+            foreground (str): Button text and border color
+        """
+        self.label = label
+        self.callback = callback
+        self.background = background
+        self.foreground = foreground
+
+
+class RecordListModel(QtCore.QAbstractListModel):
+    """
+    List model over plain record dicts.
+
+    Records stay as the dicts returned by Supabase; the card text for a row
+    is only built when the view asks for it, so memory does not grow with
+    one widget tree per row. Rows are exposed to the view a page at a time
+    through canFetchMore()/fetchMore(). If `fetch_page` is given, further
+    pages are requested from it once the local records run out.
+    """
+
+    def __init__(self, formatter, records=None, fetch_page=None, page_size=100, parent=None):
+        """
+        Args:
+            formatter (callable): Maps a record to its CardData
+            records (list): Initial records
+            fetch_page (callable): Optional fetch_page(offset, limit) returning more records
+            page_size (int): Number of rows added per fetchMore()
+            parent (QObject): Parent object
+        """
+        super().__init__(parent)
+        self.formatter = formatter
+        self.page_size = page_size
+        self._records = []
+        self._visible = 0
+        self._fetch_page = None
+        self._exhausted = True
+        self.set_records(records or [], fetch_page)
+
+    def set_records(self, records, fetch_page=None):
+        """
+        Replace the records shown by the model
+
+        Args:
+            records (list): New records
+            fetch_page (callable): Optional fetch_page(offset, limit) returning more records
+        """
+        self.beginResetModel()
+        self._records = list(records)
+        self._visible = min(len(self._records), self.page_size)
+        self._fetch_page = fetch_page
+        self._exhausted = fetch_page is None
+        self.endResetModel()
+
+    def records(self):
+        """Return every record loaded so far"""
+        return self._records
+
+    def record(self, row):
+        """Return the record at a row"""
+        return self._records[row]
+
+    def page_fetcher(self):
+        """Return the callable used to fetch further pages, or None"""
+        return self._fetch_page
+
+    def show_all_loaded(self):
+        """Expose every record loaded so far, without fetching from the server"""
+        if self._visible < len(self._records):
+            self.beginInsertRows(QtCore.QModelIndex(), self._visible, len(self._records) - 1)
+            self._visible = len(self._records)
+            self.endInsertRows()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._visible
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self._visible:
+            return None
+
+        record = self._records[index.row()]
+        if role == RecordRole:
+            return record
+        if role == CardRole:
+            return self.formatter(record)
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return self.formatter(record).title
+        return None
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._visible < len(self._records) or not self._exhausted
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return
+
+        if self._visible >= len(self._records) and not self._exhausted:
+            try:
+                page = self._fetch_page(len(self._records), self.page_size) or []
+            except Exception as e:
+                logging.error(f"Error fetching more records: {e}")
+                page = []
+            # A short page means the server has nothing more to give
+            if len(page) < self.page_size:
+                self._exhausted = True
+            self._records.extend(page)
+
+        new_visible = min(len(self._records), self._visible + self.page_size)
+        if new_visible > self._visible:
+            self.beginInsertRows(QtCore.QModelIndex(), self._visible, new_visible - 1)
+            self._visible = new_visible
+            self.endInsertRows()
+
+
+class CardDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Paints a record as a rounded card, matching the card widgets used
+    elsewhere in the app, with optional action buttons on the right.
+    """
+
+    MARGIN = 5
+    PADDING = 15
+    TITLE_HEIGHT = 24
+    LINE_HEIGHT = 20
+    HEADER_HEIGHT = 44
+    ACTION_HEIGHT = 32
+    ACTION_SPACING = 8
+
+    def __init__(self, actions=None, parent=None):
+        """
+        Args:
+            actions (list): ListAction buttons drawn on every card
+            parent (QObject): Parent object
+        """
+        super().__init__(parent)
+        self.actions = list(actions or [])
+
+        self.title_font = QtGui.QFont()
+        self.title_font.setPixelSize(16)
+        self.title_font.setBold(True)
+        self.header_font = QtGui.QFont()
+        self.header_font.setPixelSize(18)
+        self.header_font.setBold(True)
+        self.line_font = QtGui.QFont()
+        self.line_font.setPixelSize(14)
+        self.badge_font = QtGui.QFont()
+        self.badge_font.setPixelSize(14)
+        self.badge_font.setBold(True)
+        self.action_font = QtGui.QFont()
+        self.action_font.setPixelSize(14)
+        self.action_font.setBold(True)
+
+    def sizeHint(self, option, index):
+        card = index.data(CardRole)
+        width = option.rect.width()
+        if card is None:
+            return QtCore.QSize(width, 0)
+        if card.is_header:
+            return QtCore.QSize(width, self.HEADER_HEIGHT)
+
+        content = self.TITLE_HEIGHT + self.LINE_HEIGHT * len(card.lines)
+        if self.actions:
+            content = max(content, self.ACTION_HEIGHT)
+        return QtCore.QSize(width, content + 2 * (self.MARGIN + self.PADDING))
+
+    def _card_rect(self, rect):
+        return rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+
+    def _action_rects(self, rect):
+        """Rectangles of the action buttons, right-aligned and vertically centered"""
+        card_rect = self._card_rect(rect)
+        metrics = QtGui.QFontMetrics(self.action_font)
+        right = card_rect.right() - self.PADDING
+        top = card_rect.center().y() - self.ACTION_HEIGHT // 2
+
+        rects = []
+        for action in reversed(self.actions):
+            width = metrics.horizontalAdvance(action.label) + 24
+            rects.append(QtCore.QRect(right - width, top, width, self.ACTION_HEIGHT))
+            right -= width + self.ACTION_SPACING
+        rects.reverse()
+        return rects
+
+    def paint(self, painter, option, index):
+        card = index.data(CardRole)
+        if card is None:
+            return
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+
+        if card.is_header:
+            painter.setFont(self.header_font)
+            painter.setPen(QtGui.QColor(card.title_color))
+            text_rect = option.rect.adjusted(self.MARGIN, 0, -self.MARGIN, 0)
+            painter.drawText(text_rect, QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignBottom,
+                             card.title)
+            painter.restore()
+            return
+
+        card_rect = self._card_rect(option.rect)
+        hovered = bool(option.state & QtWidgets.QStyle.StateFlag.State_MouseOver)
+        background = '#F5F5F5' if hovered and self.actions else card.background
+        painter.setPen(QtGui.QPen(QtGui.QColor(card.border)))
+        painter.setBrush(QtGui.QColor(background))
+        painter.drawRoundedRect(QtCore.QRectF(card_rect), 10, 10)
+
+        action_rects = self._action_rects(option.rect) if self.actions else []
+        content_right = action_rects[0].left() - self.PADDING if action_rects else card_rect.right() - self.PADDING
+        text_right = content_right
+        x = card_rect.left() + self.PADDING
+        y = card_rect.top() + self.PADDING
+
+        # Status badge in the top right corner
+        if card.badge:
+            painter.setFont(self.badge_font)
+            painter.setPen(QtGui.QColor(card.badge_color))
+            badge_width = QtGui.QFontMetrics(self.badge_font).horizontalAdvance(card.badge)
+            painter.drawText(QtCore.QRect(text_right - badge_width, y, badge_width, self.TITLE_HEIGHT),
+                             QtCore.Qt.AlignmentFlag.AlignVCenter, card.badge)
+            text_right -= badge_width + self.PADDING
+
+        width = max(0, text_right - x)
+        painter.setFont(self.title_font)
+        painter.setPen(QtGui.QColor(card.title_color))
+        title = QtGui.QFontMetrics(self.title_font).elidedText(card.title, QtCore.Qt.TextElideMode.ElideRight, width)
+        painter.drawText(QtCore.QRect(x, y, width, self.TITLE_HEIGHT), QtCore.Qt.AlignmentFlag.AlignVCenter, title)
+        y += self.TITLE_HEIGHT
+
+        painter.setFont(self.line_font)
+        painter.setPen(QtGui.QColor('#666666'))
+        line_width = max(0, content_right - x)
+        for line in card.lines:
+            painter.drawText(QtCore.QRect(x, y, line_width, self.LINE_HEIGHT), QtCore.Qt.AlignmentFlag.AlignVCenter, line)
+            y += self.LINE_HEIGHT
+
+        painter.setFont(self.action_font)
+        for rect, action in zip(action_rects, self.actions):
+            painter.setPen(QtGui.QPen(QtGui.QColor(action.foreground)))
+            painter.setBrush(QtGui.QColor(action.background))
+            painter.drawRoundedRect(QtCore.QRectF(rect), 5, 5)
+            painter.drawText(rect, QtCore.Qt.AlignmentFlag.AlignCenter, action.label)
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (self.actions and event.type() == QtCore.QEvent.Type.MouseButtonRelease
+                and event.button() == QtCore.Qt.MouseButton.LeftButton):
+            position = event.position().toPoint()
+            for rect, action in zip(self._action_rects(option.rect), self.actions):
+                if rect.contains(position):
+                    action.callback(index.data(RecordRole))
+                    return True
+        return super().editorEvent(event, model, option, index)
+
+
+class RecordListView(QtWidgets.QListView):
+    """
+    Scrolling list of cards backed by a RecordListModel.
+
+    Only the rows in the viewport are painted, so long rosters and result
+    lists scroll smoothly and use constant memory regardless of their size.
+    """
+
+    def __init__(self, model, delegate=None, uniform_rows=False, parent=None):
+        """
+        Args:
+            model (RecordListModel): Records to show
+            delegate (CardDelegate): Delegate painting the rows
+            uniform_rows (bool): All rows have the same height, which makes layout cheaper
+            parent (QWidget): Parent widget
+        """
+        super().__init__(parent)
+        self.delegate = delegate or CardDelegate(parent=self)
+        self.setModel(model)
+        self.setItemDelegate(self.delegate)
+        self.setUniformItemSizes(uniform_rows)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setFocusPolicy(QtCore.Qt.FocusPolicy.NoFocus)
+        self.setMouseTracking(True)
+        self.setStyleSheet("QListView { border: none; background: transparent; }")
@@ -0,0 +1,127 @@
+import abc
+import threading
+import logging
+
+
+class WriteBehindQueue(abc.ABC):
+    """
+    Base class for buffers that write to the database behind the UI.
+
+    Callers add items to `pending` under `_lock` and call `_item_added()`.
+    A background thread flushes the pending items as one batch every
+    `flush_interval` seconds, or as soon as `max_pending` items are waiting.
+    A batch whose write fails is handed back through `_requeue()` and
+    retried on the next flush.
+
+    Subclasses set `pending` to an empty container and implement
+    `_take_batch()`, `_write_batch()` and `_requeue()`. They call
+    `super().__init__()` last, since it starts the background thread.
+    """
+
+    # Name of the buffered items in log messages
+    item_name = "items"
+
+    def __init__(self, flush_interval, max_pending):
+        """
+        Args:
+            flush_interval (float): Seconds between background flushes
+            max_pending (int): Number of pending items that triggers an early flush
+        """
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._flush_worker, daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self):
+        """True once close() was called"""
+        return self._closed
+
+    def _item_added(self, pending_count):
+        """Wake the background thread early once enough items are waiting"""
+        if pending_count >= self.max_pending:
+            self._wakeup.set()
+
+    def _flush_worker(self):
+        """Background loop that flushes on a timer or when woken early"""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._closed:
+                break
+            if self.pending:
+                self.flush()
+            self._after_cycle()
+
+    def _after_cycle(self):
+        """Called by the background thread after each flush cycle"""
+
+    @abc.abstractmethod
+    def _take_batch(self):
+        """
+        Move the pending items into a batch; called with `_lock` held
+
+        Returns:
+            The batch to write, or None if nothing is pending
+        """
+
+    @abc.abstractmethod
+    def _write_batch(self, batch):
+        """Write a batch to the database; raise on failure"""
+
+    @abc.abstractmethod
+    def _requeue(self, batch):
+        """Put a batch that failed to write back into `pending`; called with `_lock` held"""
+
+    def flush(self):
+        """
+        Write all pending items
+
+        Returns:
+            bool: True if everything pending was written
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = self._take_batch()
+            if batch is None:
+                return True
+
+            try:
+                self._write_batch(batch)
+                return True
+            except Exception as e:
+                logging.error(f"Error flushing {self.item_name}: {e}")
+                with self._lock:
+                    self._requeue(batch)
+                return False
+
+    def close(self, flush=True):
+        """
+        Stop the background thread
+
+        Waits for a batch the thread is already writing, however long the
+        request takes, so no background write can land after anything the
+        caller writes once this returns.
+
+        Args:
+            flush (bool): Write any pending items before returning
+
+        Returns:
+            bool: True if nothing is left unwritten
+        """
+        self._closed = True
+        self._wakeup.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+        if not flush:
+            with self._lock:
+                self.pending.clear()
+            return True
+        return self.flush()